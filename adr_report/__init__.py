@@ -0,0 +1,5 @@
+"""
+Builds, checks and queries the ADR governance report; see `adr-report --help`.
+"""
+
+__version__ = '0.1.0'
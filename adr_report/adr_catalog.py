@@ -0,0 +1,306 @@
+import json
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+from .status_timeline import StatusTimeline
+
+# Bump whenever the tables change; an older catalog is rebuilt on the next
+# build --catalog (queries refuse it instead)
+CATALOG_SCHEMA_VERSION = 2
+
+TABLES = [
+    # Foundational and deprecated ADRs. fingerprint is the record as stored,
+    # so a later run only rewrites the ADRs that changed. due_date is ISO
+    # (yyyy-mm-dd), or NULL when the approval date can't be used.
+    'CREATE TABLE services ('
+    'id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, file_type TEXT NOT NULL, fingerprint TEXT NOT NULL, '
+    'name TEXT NOT NULL, service_status TEXT, document_status TEXT, approval_date TEXT, due_date TEXT)',
+    'CREATE INDEX services_name ON services (name COLLATE NOCASE)',
+    'CREATE INDEX services_due_date ON services (due_date)',
+
+    'CREATE TABLE owners ('
+    'service_id INTEGER NOT NULL REFERENCES services (id) ON DELETE CASCADE, '
+    'position INTEGER NOT NULL, name TEXT, email TEXT)',
+    'CREATE INDEX owners_service ON owners (service_id)',
+    'CREATE INDEX owners_name ON owners (name COLLATE NOCASE)',
+    'CREATE INDEX owners_email ON owners (email COLLATE NOCASE)',
+
+    'CREATE TABLE authors ('
+    'service_id INTEGER NOT NULL REFERENCES services (id) ON DELETE CASCADE, '
+    'position INTEGER NOT NULL, name TEXT)',
+    'CREATE INDEX authors_service ON authors (service_id)',
+    'CREATE INDEX authors_name ON authors (name COLLATE NOCASE)',
+
+    'CREATE TABLE capabilities ('
+    'service_id INTEGER NOT NULL REFERENCES services (id) ON DELETE CASCADE, '
+    'position INTEGER NOT NULL, level0 TEXT, level1 TEXT, level2 TEXT)',
+    'CREATE INDEX capabilities_service ON capabilities (service_id)',
+    'CREATE INDEX capabilities_levels ON capabilities (level0 COLLATE NOCASE, level1 COLLATE NOCASE, level2 COLLATE NOCASE)',
+
+    'CREATE TABLE data_classifications ('
+    'service_id INTEGER NOT NULL REFERENCES services (id) ON DELETE CASCADE, '
+    'classification TEXT, risk_rating TEXT)',
+    'CREATE INDEX data_classifications_service ON data_classifications (service_id)',
+    'CREATE INDEX data_classifications_rating ON data_classifications (classification COLLATE NOCASE, risk_rating COLLATE NOCASE)',
+
+    # Document Status log rows, as listed in the ADR
+    'CREATE TABLE status_history ('
+    'service_id INTEGER NOT NULL REFERENCES services (id) ON DELETE CASCADE, '
+    'position INTEGER NOT NULL, document_status TEXT, forum TEXT, approval_date TEXT, change_summary TEXT)',
+    'CREATE INDEX status_history_service ON status_history (service_id)',
+
+    # Service ADRs; joined to services by name
+    'CREATE TABLE sadr_statuses ('
+    'id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, fingerprint TEXT NOT NULL, '
+    'service_name TEXT NOT NULL, document_status TEXT, service_status TEXT, approval_date TEXT)',
+    'CREATE INDEX sadr_statuses_name ON sadr_statuses (service_name COLLATE NOCASE)',
+]
+
+
+def fingerprint(record):
+    return json.dumps(record.to_json())
+
+
+class Catalog:
+    """
+    Normalised SQLite copy of the parsed ADR records, for answering questions
+    without parsing any markdown. update() brings it in line with a run's
+    records in place, touching only the ADRs that changed. Opened
+    read_only, for queries, a catalog of another schema version is an
+    error rather than dropped and recreated empty.
+    """
+
+    def __init__(self, path, read_only=False):
+        if read_only:
+            self.connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            except sqlite3.DatabaseError:
+                row = None  # not a catalog at all
+            if row is None or row[0] != str(CATALOG_SCHEMA_VERSION):
+                self.connection.close()
+                raise ValueError(f"'{path}' was written by a different version of the report; "
+                                 "rebuild it with adr-report build --catalog")
+            return
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or row[0] != str(CATALOG_SCHEMA_VERSION):
+            for table in ('status_history', 'data_classifications', 'capabilities', 'authors', 'owners',
+                          'services', 'sadr_statuses'):
+                self.connection.execute(f'DROP TABLE IF EXISTS {table}')
+            for statement in TABLES:
+                self.connection.execute(statement)
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(CATALOG_SCHEMA_VERSION),))
+            self.connection.commit()
+
+    def update(self, records):
+        """
+        Makes the catalog match records, which maps every file path to its
+        (file_type, record), with None for files that failed to parse.
+        Returns (written, removed) counts.
+        """
+        stored = dict(self.connection.execute('SELECT path, fingerprint FROM services'))
+        stored.update(self.connection.execute('SELECT path, fingerprint FROM sadr_statuses'))
+
+        changed = []
+        for file_path, (file_type, record) in records.items():
+            if record is not None:
+                record_fingerprint = fingerprint(record)
+                if stored.get(file_path) != record_fingerprint:
+                    changed.append((file_path, file_type, record, record_fingerprint))
+        gone = [file_path for file_path in stored
+                if file_path not in records or records[file_path][1] is None]
+
+        due_dates = {}
+        approval_dates = [record.approval_date for _, file_type, record, _ in changed if file_type != 'service']
+        if approval_dates:
+            # Only needed when something changed, and pulls in pandas
+            import pandas as pd
+            from .recert_dates import recertify_due_dates
+            _, due, _ = recertify_due_dates(approval_dates)
+            due_dates = {approval_date: None if pd.isna(due_date) else due_date.strftime('%Y-%m-%d')
+                         for approval_date, due_date in zip(approval_dates, due)}
+
+        with self.connection:
+            for file_path in gone + [file_path for file_path, _, _, _ in changed]:
+                self.connection.execute('DELETE FROM services WHERE path = ?', (file_path,))
+                self.connection.execute('DELETE FROM sadr_statuses WHERE path = ?', (file_path,))
+            for file_path, file_type, record, record_fingerprint in changed:
+                if file_type == 'service':
+                    self.connection.execute(
+                        'INSERT INTO sadr_statuses (path, fingerprint, service_name, document_status, service_status, approval_date) '
+                        'VALUES (?, ?, ?, ?, ?, ?)',
+                        (file_path, record_fingerprint, record.service_name, record.document_status,
+                         record.service_status, record.approval_date)
+                    )
+                    continue
+                service_id = self.connection.execute(
+                    'INSERT INTO services (path, file_type, fingerprint, name, service_status, document_status, approval_date, due_date) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (file_path, file_type, record_fingerprint, record.service_name, record.service_status,
+                     record.document_status, record.approval_date, due_dates.get(record.approval_date))
+                ).lastrowid
+                self.connection.executemany(
+                    'INSERT INTO owners VALUES (?, ?, ?, ?)',
+                    [(service_id, position, name, email)
+                     for position, (name, email) in enumerate(zip(record.owners, record.owner_ids))]
+                )
+                self.connection.executemany(
+                    'INSERT INTO authors VALUES (?, ?, ?)',
+                    [(service_id, position, name) for position, name in enumerate(record.authors)]
+                )
+                self.connection.executemany(
+                    'INSERT INTO capabilities VALUES (?, ?, ?, ?, ?)',
+                    [(service_id, position) + capability for position, capability in enumerate(record.capabilities)]
+                )
+                self.connection.executemany(
+                    'INSERT INTO data_classifications VALUES (?, ?, ?)',
+                    [(service_id,) + pair for pair in record.data_classification]
+                )
+                self.connection.executemany(
+                    'INSERT INTO status_history VALUES (?, ?, ?, ?, ?, ?)',
+                    [(service_id, position) + entry for position, entry in enumerate(record.status_log)]
+                )
+        return len(changed), len(gone)
+
+    def status_timeline(self):
+        """
+        Loads the StatusTimeline of every service in one query.
+        """
+        return StatusTimeline(self.connection.execute(
+            'SELECT s.name, h.document_status, h.forum, h.approval_date, h.change_summary '
+            'FROM status_history h JOIN services s ON s.id = h.service_id ORDER BY h.service_id, h.position'
+        ))
+
+    def query(self, sql, parameters=()):
+        cursor = self.connection.execute(sql, parameters)
+        return [column[0] for column in cursor.description], cursor.fetchall()
+
+    def close(self):
+        self.connection.close()
+
+
+# Columns every service listing shows
+SERVICE_COLUMNS = (
+    'SELECT s.name AS "Service Name", s.file_type AS "Type", s.service_status AS "Service Status", '
+    's.document_status AS "ADR Document Status", s.approval_date AS "Latest Approval date", '
+    's.due_date AS "Re-certify Due Date", '
+    "(SELECT group_concat(o.name, ', ') FROM owners o WHERE o.service_id = s.id) AS \"Service Owner\" "
+    'FROM services s '
+)
+
+
+def due_window(days):
+    today = date.today()
+    return today.isoformat(), (today + timedelta(days=days)).isoformat()
+
+
+def owner_query(args):
+    sql = SERVICE_COLUMNS + (
+        'WHERE s.id IN (SELECT service_id FROM owners WHERE name = ? COLLATE NOCASE OR email = ? COLLATE NOCASE)'
+    )
+    parameters = [args.owner, args.owner]
+    if args.due_within is not None:
+        sql += ' AND s.due_date BETWEEN ? AND ?'
+        parameters += due_window(args.due_within)
+    return sql + ' ORDER BY s.due_date IS NULL, s.due_date, s.name', parameters
+
+
+def capability_query(args):
+    sql = SERVICE_COLUMNS + 'WHERE s.id IN (SELECT service_id FROM capabilities WHERE level0 = ? COLLATE NOCASE'
+    parameters = [args.levels[0]]
+    for column, level in zip(('level1', 'level2'), args.levels[1:]):
+        sql += f' AND {column} = ? COLLATE NOCASE'
+        parameters.append(level)
+    return sql + ') ORDER BY s.name', parameters
+
+
+def due_query(args):
+    if args.overdue:
+        return SERVICE_COLUMNS + 'WHERE s.due_date < ? ORDER BY s.due_date, s.name', [date.today().isoformat()]
+    return SERVICE_COLUMNS + 'WHERE s.due_date BETWEEN ? AND ? ORDER BY s.due_date, s.name', list(due_window(args.within))
+
+
+def rating_query(args):
+    classification = args.classification if args.classification.startswith('DC-') else f"DC-{args.classification}"
+    sql = SERVICE_COLUMNS + (
+        'WHERE s.id IN (SELECT service_id FROM data_classifications '
+        'WHERE classification = ? COLLATE NOCASE AND risk_rating = ? COLLATE NOCASE) ORDER BY s.name'
+    )
+    return sql, [classification, args.rating]
+
+
+def service_query(args):
+    sql = (
+        'SELECT s.name AS "Service Name", s.file_type AS "Type", s.service_status AS "Service Status", '
+        's.document_status AS "ADR Document Status", s.approval_date AS "Latest Approval date", '
+        's.due_date AS "Re-certify Due Date", a.document_status AS "S-ADR Document Status", '
+        'a.service_status AS "S-ADR Service Status", a.approval_date AS "S-ADR Approval Date", s.path AS "Path" '
+        'FROM services s LEFT JOIN sadr_statuses a ON a.service_name = s.name '
+        'WHERE s.name = ? COLLATE NOCASE'
+    )
+    return sql, [args.name]
+
+
+def status_as_of(catalog, args):
+    statuses = catalog.status_timeline().status_as_of(args.date)
+    columns = ['Service Name', 'Document Status', 'Forum', 'Date', 'Change Summary']
+    rows = [(service_name, status, forum, day.strftime('%d-%m-%Y'), change_summary)
+            for service_name, (status, forum, day, change_summary) in sorted(statuses.items())]
+    return columns, rows
+
+
+def approvals(catalog, args):
+    columns = ['Forum', 'Month', 'Approvals']
+    return columns, catalog.status_timeline().approvals_per_forum_month(args.forum, args.first_month, args.last_month)
+
+
+def history(catalog, args):
+    timeline = catalog.status_timeline()
+    columns = ['Service Name', 'Document Status', 'Forum', 'Date', 'Change Summary']
+    rows = [(service_name, status, forum, day.strftime('%d-%m-%Y'), change_summary)
+            for service_name in timeline.entries if service_name.lower() == args.name.lower()
+            for status, forum, day, change_summary in timeline.history(service_name)]
+    return columns, rows
+
+
+# What each query command runs: a function giving the SQL (and its
+# parameters) to run on the catalog, or one answering from the catalog
+QUERY_BUILDERS = {
+    'owner': owner_query,
+    'capability': capability_query,
+    'due': due_query,
+    'rating': rating_query,
+    'service': service_query,
+}
+QUERY_RUNNERS = {
+    'status-as-of': status_as_of,
+    'approvals': approvals,
+    'history': history,
+}
+
+
+def print_table(columns, rows):
+    print('\t'.join(columns))
+    for row in rows:
+        print('\t'.join('' if value is None else str(value) for value in row))
+    print(f"{len(rows)} rows", file=sys.stderr)
+
+
+def run(args):
+    """
+    Prints the answer to `adr-report query` as tab-separated lines.
+    """
+    catalog = Catalog(args.catalog, read_only=True)
+    try:
+        if args.query in QUERY_RUNNERS:
+            columns, rows = QUERY_RUNNERS[args.query](catalog, args)
+        else:
+            columns, rows = catalog.query(*QUERY_BUILDERS[args.query](args))
+    finally:
+        catalog.close()
+    print_table(columns, rows)
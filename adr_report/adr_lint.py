@@ -0,0 +1,338 @@
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import lru_cache
+
+from .adr_template import INLINE_COMMENT, OWNER_ENTRY, RISK_RATINGS, ROW_TABLES, SECTION_TABLES, SECTIONS
+from .config import rule_for
+
+# Kept free of pandas (and of build, which imports it) so a pre-commit
+# hook over thousands of ADRs starts in a fraction of a second
+
+DATE_FORMAT = '%d-%m-%Y'
+
+# Approval dates the templates use to mean "not approved yet"
+PLACEHOLDER_DATES = {'TBD', 'dd-mm-yyyy', ''}
+
+# Sections whose absence the report tolerates (only the catalog reads it)
+OPTIONAL_SECTIONS = {'Document Status log'}
+
+
+@dataclass
+class Diagnostic:
+    path: str
+    line: int
+    column: int
+    severity: str  # 'error': the report will show a blank or wrong value
+    code: str
+    message: str
+
+    def __str__(self):
+        return f"{self.path}:{self.line}:{self.column}: {self.severity} [{self.code}] {self.message}"
+
+
+@dataclass(frozen=True)
+class FileSchema:
+    """
+    The checks for one file type, compiled once from adr_template: the
+    sections and the depth that closes each, one regex for their heading
+    lines, and the fixed-layout table each one starts with.
+    """
+    sections: dict
+    headings: re.Pattern
+    tables: dict
+    row_patterns: dict
+
+
+def compile_schemas():
+    schemas = {}
+    for file_type, sections in SECTIONS.items():
+        tables = SECTION_TABLES.get(file_type, {})
+        schemas[file_type] = FileSchema(
+            sections=sections,
+            headings=re.compile(r'##+[^\S\n]*(' + '|'.join(map(re.escape, sections)) + r')[^\S\n]*$'),
+            tables=tables,
+            row_patterns={heading: re.compile(r'\|' + r'\|'.join([r'([^\|]+)'] * len(layout.columns)) + r'\|')
+                          for heading, layout in tables.items()},
+        )
+    return schemas
+
+
+SCHEMAS = compile_schemas()
+
+
+def blank_comments(content):
+    """
+    Removes comments the way the report does, but keeps their line breaks
+    so line numbers still match the file.
+    """
+    if '[' in content:
+        content = INLINE_COMMENT.sub('', content)
+    pieces = []
+    pos = 0
+    start = content.find('<!--')
+    while start != -1:
+        end = content.find('-->', start + 4)
+        if end == -1:
+            break  # left as it is, like the report does
+        pieces.append(content[pos:start])
+        pieces.append('\n' * content.count('\n', start, end))
+        pos = end + 3
+        start = content.find('<!--', pos)
+    pieces.append(content[pos:])
+    return ''.join(pieces)
+
+
+def cells(line):
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+@lru_cache(maxsize=4096)
+def valid_date(value):
+    if value in PLACEHOLDER_DATES:
+        return True
+    try:
+        datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        return False
+    return True
+
+
+def first_difference(found, expected):
+    # 1-based column of the first character that differs
+    return len(os.path.commonprefix([found, expected])) + 1
+
+
+class FileLinter:
+    """
+    Checks one ADR against its file type's schema, collecting diagnostics.
+    """
+
+    def __init__(self, path, file_type):
+        self.path = path
+        self.file_type = file_type
+        self.schema = SCHEMAS[file_type]
+        self.diagnostics = []
+
+    def report(self, line, severity, code, message, column=1):
+        self.diagnostics.append(Diagnostic(self.path, line, column, severity, code, message))
+
+    def run(self):
+        try:
+            with open(self.path, 'rb') as file:
+                content = file.read().decode('utf-8')
+        except OSError as e:
+            self.report(0, 'error', 'unreadable', str(e))
+            return self.diagnostics
+        except UnicodeDecodeError as e:
+            self.report(0, 'error', 'not-utf8', f"the report reads ADRs as UTF-8: {e}")
+            return self.diagnostics
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        lines = blank_comments(content).split('\n')
+
+        self.check_title(lines)
+        for heading, (line_number, body) in self.find_sections(lines).items():
+            if line_number is None:
+                severity = 'warning' if heading in OPTIONAL_SECTIONS else 'error'
+                self.report(1, severity, 'missing-section', f"no '## {heading}' section")
+            elif heading in self.schema.tables:
+                self.check_table(heading, line_number, body)
+            elif heading in ROW_TABLES:
+                self.check_rows(heading, line_number, body)
+            elif heading == 'Document Owner':
+                self.check_owners(line_number, body)
+        self.diagnostics.sort(key=lambda diagnostic: diagnostic.line)
+        return self.diagnostics
+
+    def check_title(self, lines):
+        if lines[0] != '---' or len(lines) < 2 or not lines[1].startswith('title:'):
+            self.report(1, 'error', 'missing-title', "the file doesn't start with '---' and a 'title:' line")
+            return
+        if '---' not in (line[:3] for line in lines[2:]):
+            self.report(1, 'error', 'unclosed-front-matter', "no '---' line closes the front matter")
+        elif not lines[1][len('title:'):].strip():
+            self.report(2, 'error', 'missing-title', "the title is empty")
+
+    def find_sections(self, lines):
+        """
+        {heading: (line number, body lines)} for every section of the
+        schema, with None for the missing ones; like the report, only the
+        first of repeated headings counts.
+        """
+        found = dict.fromkeys(self.schema.sections, (None, []))
+        headings = [number for number, line in enumerate(lines) if line.startswith('##')]
+        for position, number in enumerate(headings):
+            match = self.schema.headings.match(lines[number])
+            if match is None:
+                continue
+            heading = match.group(1)
+            if found[heading][0] is not None:
+                self.report(number + 1, 'warning', 'duplicate-section',
+                            f"'{heading}' already started on line {found[heading][0]}; this one is ignored")
+                continue
+            closing = '#' * self.schema.sections[heading]
+            end = next((other for other in headings[position + 1:] if lines[other].startswith(closing)), len(lines))
+            found[heading] = (number + 1, [(other + 1, lines[other]) for other in range(number + 1, end)])
+        return found
+
+    def check_table(self, heading, line_number, body):
+        layout = self.schema.tables[heading]
+        # Blank lines may separate the table's lines, as in the report's regex
+        table = [(number, line) for number, line in body if line.strip()]
+        if not table or not table[0][1].startswith('|'):
+            self.report(line_number, 'error', 'missing-table',
+                        f"'{heading}' should start with the table '{layout.header_line}'")
+            return
+
+        number, header = table[0]
+        if header.rstrip() != layout.header_line:
+            found = cells(header)
+            if found == list(layout.columns):
+                self.report(number, 'error', 'table-header-spacing',
+                            f"header must be written exactly '{layout.header_line}'",
+                            first_difference(header, layout.header_line))
+            elif len(found) != len(layout.columns):
+                self.report(number, 'error', 'table-header',
+                            f"header has {len(found)} columns, expected '{layout.header_line}'")
+            else:
+                for position, (cell, expected) in enumerate(zip(found, layout.columns), start=1):
+                    if cell != expected:
+                        self.report(number, 'error', 'table-header',
+                                    f"column {position} is '{cell}', expected '{expected}'",
+                                    first_difference(header, layout.header_line))
+
+        if len(table) < 2:
+            self.report(number, 'error', 'table-separator', f"no separator line '{layout.separator_line}'")
+            return
+        number, separator = table[1]
+        if separator.rstrip() != layout.separator_line:
+            self.report(number, 'error', 'table-separator',
+                        f"separator is '{separator.strip()}', expected '{layout.separator_line}'",
+                        first_difference(separator, layout.separator_line))
+
+        if not layout.rows:
+            self.check_ratings(table[2:])
+            return
+        if len(table) < 3 or not self.schema.row_patterns[heading].match(table[2][1]):
+            self.report(number, 'error', 'missing-row',
+                        f"'{heading}' needs a row of {len(layout.columns)} cells below the separator")
+            return
+        number, row = table[2]
+        values = cells(row)
+        for position, value in enumerate(values[:len(layout.columns)]):
+            if not value:
+                self.report(number, 'error', 'empty-cell',
+                            f"'{layout.columns[position]}' is empty; the report shows a placeholder")
+        if layout.date_column is not None and not valid_date(values[layout.date_column]):
+            self.report(number, 'error', 'bad-date',
+                        f"'{values[layout.date_column]}' is not a dd-mm-yyyy date")
+
+    def check_ratings(self, rows):
+        ratings = {rating.lower() for rating in RISK_RATINGS}
+        for number, row in rows:
+            if not row.startswith('|'):
+                break
+            values = cells(row)
+            if len(values) < 2:
+                continue
+            if values[1].lower() not in ratings:
+                self.report(number, 'warning', 'unknown-rating',
+                            f"'{values[1]}' for '{values[0]}' is not one of {', '.join(RISK_RATINGS)}")
+
+    def check_rows(self, heading, line_number, body):
+        least_cells, date_column = ROW_TABLES[heading]
+        rows = [(number, line) for number, line in body if line.strip().startswith('|')]
+        data = 0
+        for number, row in rows[1:]:  # the header
+            values = cells(row)
+            if all(set(value) <= set(':-') for value in values):
+                continue  # separator
+            if len(values) < least_cells:
+                self.report(number, 'warning', 'short-row',
+                            f"row has {len(values)} cells, at least {least_cells} are needed; it is skipped")
+                continue
+            data += 1
+            if not all(values[:least_cells]):
+                self.report(number, 'warning', 'empty-cell', "row has empty cells; the report shows a placeholder")
+            if date_column is not None and not valid_date(values[date_column]):
+                self.report(number, 'warning', 'bad-date', f"'{values[date_column]}' is not a dd-mm-yyyy date")
+        if not data:
+            self.report(line_number, 'warning', 'missing-row', f"'{heading}' has no rows")
+
+    def check_owners(self, line_number, body):
+        owners = 0
+        for number, line in body:
+            entry = line.strip().lstrip('-').strip()
+            if not entry:
+                continue
+            if OWNER_ENTRY.match(entry):
+                owners += 1
+            else:
+                self.report(number, 'error', 'owner-format',
+                            f"'{entry}' is not 'Name <email>'; the report leaves it out")
+        if not owners:
+            self.report(line_number, 'error', 'missing-owner', "no owner listed as 'Name <email>'")
+
+
+def collect_files(paths, rules, file_type=None):
+    """
+    (path, file_type) for every ADR among paths, folders listed one level
+    deep like the report does, or in the folders of rules if there are no
+    paths. Types come from the rules (config.rule_for) unless given.
+    """
+    files = []
+    for path in paths or [rule.path for rule in rules]:
+        if os.path.isdir(path):
+            for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+                rule = rule_for(entry.path, rules)
+                if rule.accepts(entry.name) and entry.is_file():
+                    files.append((entry.path, file_type or rule.file_type))
+        else:
+            files.append((path, file_type or rule_for(path, rules).file_type))
+    return files
+
+
+def lint_chunk(chunk):
+    return [diagnostic for path, file_type in chunk for diagnostic in FileLinter(path, file_type).run()]
+
+
+def lint_files(files, workers=1):
+    """
+    Diagnostics for every (path, file_type), in file order. With more than
+    one worker the files are spread over a process pool.
+    """
+    if workers <= 1 or len(files) < 64:
+        return lint_chunk(files)
+    from concurrent.futures import ProcessPoolExecutor
+    chunk_size = max(1, len(files) // (workers * 4))
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [diagnostic for diagnostics in executor.map(lint_chunk, chunks) for diagnostic in diagnostics]
+
+
+def run(args):
+    """
+    Lints for the parsed command line of `adr-report lint`; exits with 1 on
+    errors (or warnings, with --strict).
+    """
+    start = time.perf_counter()
+    files = collect_files(args.paths, args.folder_rules, args.file_type)
+    diagnostics = lint_files(files, workers=args.workers)
+    errors = sum(1 for diagnostic in diagnostics if diagnostic.severity == 'error')
+    warnings = len(diagnostics) - errors
+
+    if args.format == 'json':
+        json.dump({'files': len(files), 'errors': errors, 'warnings': warnings,
+                   'diagnostics': [asdict(diagnostic) for diagnostic in diagnostics]}, sys.stdout, indent=1)
+        print()
+    else:
+        for diagnostic in diagnostics:
+            print(diagnostic)
+        print(f"{len(files)} files checked in {time.perf_counter() - start:.2f}s: "
+              f"{errors} errors, {warnings} warnings", file=sys.stderr)
+    sys.exit(1 if errors or (args.strict and warnings) else 0)
@@ -0,0 +1,164 @@
+import sys
+from dataclasses import dataclass
+
+# Placeholder for report cells the ADR left empty
+MISSING_VALUE = "Check with CPA team"
+
+# One shared copy of each capability and classification tuple; reports
+# repeat a small set of them across thousands of files. Tuples can't be
+# weakly referenced, so the table is emptied with forget_shared_tuples
+# whenever the records it was built for may have gone
+_shared_tuples = {}
+
+
+def interned(values):
+    return tuple(sys.intern(value) for value in values)
+
+
+def shared_tuple(values):
+    values = interned(values)
+    return _shared_tuples.setdefault(values, values)
+
+
+def forget_shared_tuples():
+    """
+    Empties the shared tuple table, so tuples only dropped records still
+    used can be freed; records made afterwards share a fresh set. Called
+    between --max-memory batches and --watch updates.
+    """
+    _shared_tuples.clear()
+
+
+@dataclass(slots=True)
+class FoundationalRecord:
+    """
+    What the report reads from a foundational ADR. Repeated values (names,
+    statuses, capability levels, ratings) are interned so thousands of
+    records share one copy of each. Capabilities are (level 0, level 1,
+    level 2) tuples and the data classification is (DC-name, rating) pairs
+    in the order the ADR lists them. status_log is the Document Status log
+    as (status, forum, approval date, change summary) rows, as listed; the
+    rows are almost always unique to their file, so only their strings
+    are interned.
+    """
+    service_name: str = ''
+    owners: tuple = ()
+    owner_ids: tuple = ()
+    service_status: str = ''
+    authors: tuple = ()
+    document_status: str = ''
+    approval_date: str = ''
+    capabilities: tuple = ()
+    data_classification: tuple = ()
+    status_log: tuple = ()
+
+    def __post_init__(self):
+        self.service_name = sys.intern(self.service_name)
+        self.owners = interned(self.owners)
+        self.owner_ids = interned(self.owner_ids)
+        self.service_status = sys.intern(self.service_status)
+        self.authors = interned(self.authors)
+        self.document_status = sys.intern(self.document_status)
+        self.approval_date = sys.intern(self.approval_date)
+        self.capabilities = tuple(shared_tuple(capability) for capability in self.capabilities)
+        self.data_classification = tuple(shared_tuple(pair) for pair in self.data_classification)
+        self.status_log = tuple(interned(entry) for entry in self.status_log)
+
+    def __reduce__(self):
+        # Rebuilt through __init__ so records from worker processes are
+        # interned in the process that keeps them
+        return type(self), self.to_json()
+
+    def to_json(self):
+        # __match_args__ holds every field name in order, subclasses included
+        return tuple(getattr(self, name) for name in self.__match_args__)
+
+    @classmethod
+    def from_json(cls, values):
+        return cls(*values)
+
+    def to_rows(self):
+        """
+        Flat report rows, one per capability mapping (or a single row without
+        any). Build the report table from the rows of every file with
+        build_f_adr_frame, which also works out the dates.
+        """
+        def filled(value):
+            return value if value != "" else MISSING_VALUE
+
+        row = {
+            'Service Name': filled(self.service_name),
+            'Service Owner': filled(', '.join(self.owners)),
+            'Service Owner Id': filled(', '.join(self.owner_ids)),
+            'Service Status': filled(self.service_status),
+            'ADR Authors': filled('; '.join(self.authors)),
+            'ADR Document Status': filled(self.document_status),
+            # Kept as written in the ADR until build_f_adr_frame converts it
+            'Latest Approval date': self.approval_date
+        }
+        rows = [dict(row, **{'Cap-Map Level 0': filled(level0),
+                             'Cap-Map Level 1': filled(level1),
+                             'Cap-Map Level 2': filled(level2)})
+                for level0, level1, level2 in self.capabilities] or [row]
+
+        # Data classification is reported on the first row only; the rest of
+        # the rows just get the placeholder
+        for classification, risk_rating in self.data_classification:
+            rows[0][classification] = filled(risk_rating)
+            for other_row in rows[1:]:
+                other_row[classification] = MISSING_VALUE
+
+        return rows
+
+
+@dataclass(slots=True)
+class DeprecatedRecord(FoundationalRecord):
+    """
+    A foundational ADR from the deprecated folder; reported the same way.
+    """
+
+
+@dataclass(slots=True)
+class ServiceRecord:
+    """
+    What the report reads from a service ADR: its title and the first row of
+    its Document Status table.
+    """
+    service_name: str = ''
+    document_status: str = ''
+    service_status: str = ''
+    approval_date: str = ''
+
+    def __post_init__(self):
+        self.service_name = sys.intern(self.service_name)
+        self.document_status = sys.intern(self.document_status)
+        self.service_status = sys.intern(self.service_status)
+        self.approval_date = sys.intern(self.approval_date)
+
+    def __reduce__(self):
+        return type(self), self.to_json()
+
+    def to_json(self):
+        return tuple(getattr(self, name) for name in self.__match_args__)
+
+    @classmethod
+    def from_json(cls, values):
+        return cls(*values)
+
+    def to_row(self):
+        """
+        The S-ADR columns merge_sadr_data joins onto the report.
+        """
+        return {
+            'S-ADR Service Name': self.service_name,
+            'S-ADR Document Status': self.document_status,
+            'S-ADR Service Status': self.service_status,
+            'S-ADR Approval Date': self.approval_date
+        }
+
+
+RECORD_TYPES = {
+    'foundational': FoundationalRecord,
+    'deprecated': DeprecatedRecord,
+    'service': ServiceRecord,
+}
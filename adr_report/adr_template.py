@@ -0,0 +1,104 @@
+import re
+from dataclasses import dataclass
+
+# What the ADR templates must look like for the report to read them. Kept
+# free of pandas so adr_lint can check files without importing it.
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    """
+    A table the report reads right below a section heading: the exact
+    header and separator lines, then (with rows) the first data row.
+    date_column is the position of the column holding a dd-mm-yyyy date.
+    """
+    columns: tuple
+    separator: str
+    rows: bool = True
+    date_column: int = None
+
+    @property
+    def header_line(self):
+        return '| ' + ' | '.join(self.columns) + ' |'
+
+    @property
+    def separator_line(self):
+        return '|' + '|'.join([self.separator] * len(self.columns)) + '|'
+
+    def pattern(self):
+        """
+        The regex the report matches a section body against; with rows,
+        one group per cell of the first data row.
+        """
+        pattern = (r'(?:\s*\n)?' + re.escape(self.header_line) + r'\s*\n'
+                   + re.escape(self.separator_line) + r'\s*\n')
+        if self.rows:
+            pattern += r'\|' + r'\|'.join([r'([^\|]+)'] * len(self.columns)) + r'\|'
+        return re.compile(pattern)
+
+
+DOC_STATUS_LAYOUT = TableLayout(('Document Status', 'Forum', 'Date'), ':--', date_column=2)
+SADR_DOC_STATUS_LAYOUT = TableLayout(('Document Status', 'Service Status', 'Forum', 'Approval Date'), ':--',
+                                     date_column=3)
+DATA_CLASSIFICATION_LAYOUT = TableLayout(('Data Classification', 'Risk Rating'), ':-', rows=False)
+SERVICE_STATUS_LAYOUT = TableLayout(('Service Status',), '---')
+
+# Table layouts expected right below each section heading. Each pattern is
+# matched against the (small) body of its own section only.
+DOC_STATUS_TABLE = DOC_STATUS_LAYOUT.pattern()
+SADR_DOC_STATUS_TABLE = SADR_DOC_STATUS_LAYOUT.pattern()
+DATA_CLASSIFICATION_TABLE = DATA_CLASSIFICATION_LAYOUT.pattern()
+SERVICE_STATUS_TABLE = SERVICE_STATUS_LAYOUT.pattern()
+TABLE_ROW_3 = re.compile(r'\|([^\|]+)\|([^\|]+)\|([^\|]+)\|')
+TABLE_ROW_2 = re.compile(r'\|([^\|]+)\|([^\|]+)\|')
+OWNER_ENTRY = re.compile(r'(.+?)\s<(.+?)>')
+INLINE_COMMENT = re.compile(r'\[comment\]: <> \(.*?\)', re.IGNORECASE)
+
+# Sections collected for each file type, with the heading depth that closes
+# them: 2 means the next '##' (or deeper) heading, 3 the next '###' heading.
+SECTIONS = {
+    'foundational': {
+        'Document Owner': 2,
+        'Author/Contributors': 2,
+        'Document Status': 2,
+        # Closed by the next heading of any level, like the level 2 sections
+        'Document Status log': 2,
+        '1. Capability Mapping Hierarchy': 2,
+        '2.2 Data Classification': 3,
+        'Service Status': 2,
+    },
+    'service': {
+        'Document Status': 2,
+    },
+}
+SECTIONS['deprecated'] = SECTIONS['foundational']
+CLOSING_HEADING = {2: '\n##', 3: '\n###'}
+
+# One scan per file finds every wanted heading line
+SECTION_HEADINGS = {
+    file_type: re.compile(r'\n##+[^\S\n]*(' + '|'.join(map(re.escape, sections)) + r')[^\S\n]*(?=\n|$)')
+    for file_type, sections in SECTIONS.items()
+}
+
+# The fixed-layout table each section starts with
+SECTION_TABLES = {
+    'foundational': {
+        'Document Status': DOC_STATUS_LAYOUT,
+        '2.2 Data Classification': DATA_CLASSIFICATION_LAYOUT,
+        'Service Status': SERVICE_STATUS_LAYOUT,
+    },
+    'service': {
+        'Document Status': SADR_DOC_STATUS_LAYOUT,
+    },
+}
+SECTION_TABLES['deprecated'] = SECTION_TABLES['foundational']
+
+# Tables read more loosely, by their rows: the least number of cells a row
+# needs to be read and, if any, the column holding a dd-mm-yyyy date
+ROW_TABLES = {
+    'Document Status log': (3, 2),
+    '1. Capability Mapping Hierarchy': (3, None),
+}
+
+# Data classification ratings from lowest to highest risk
+RISK_RATINGS = ['Green', 'Amber', 'Red']
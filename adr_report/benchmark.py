@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from itertools import chain
+import tempfile
+import time
+
+from . import build as report
+from .config import folder_rules
+from .generate_corpus import generate
+from .report_writers import write_xlsx
+from .rollups import build_rollups
+
+
+# Command lines whose start-up time --cold-start tracks; {corpus} is the
+# smallest generated corpus and {output} a scratch path
+COLD_START_COMMANDS = {
+    'help': ['--help'],
+    'build --help': ['build', '--help'],
+    'query --help': ['query', '--help'],
+    'lint': ['lint', '--root', '{corpus}', '--workers', '1'],
+    'diff --help': ['diff', '--help'],
+    'build': ['build', '--root', '{corpus}', '--no-cache', '--no-rollups', '--format', 'csv', '--output', '{output}'],
+}
+
+# Imports that dominate start-up; only commands working on tables need them
+HEAVY_MODULES = {'pandas', 'numpy', 'dateutil', 'pyarrow'}
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_once(rules, output_dir):
+    """
+    Runs the report pipeline over a corpus, timing each stage on its own.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    files = report.discover_files(rules)
+    timings['discovery'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed = [(file_type, report.parse_markdown(file_path, file_type=file_type))
+              for file_name, file_path, file_type in files]
+    timings['parsing'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    f_adr_rows = []
+    sadr_data = {}
+    for file_type, record in parsed:
+        if file_type == 'service':
+            sadr_data[record.service_name] = record.to_row()
+        else:
+            f_adr_rows.extend(report.process_f_adr(record))
+    final_df, date_errors = report.build_f_adr_frame(f_adr_rows)
+    timings['shaping'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    final_df = report.merge_sadr_data(final_df, sadr_data)
+    timings['sadr_merge'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    final_df.index += 1
+    final_df.index.name = "SL No."
+    rollups = build_rollups(final_df)
+    timings['rollups'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_xlsx(final_df, os.path.join(output_dir, 'Governance_Data.xlsx'), sheet_name='F-ADR', extra_sheets=rollups)
+    timings['excel'] = time.perf_counter() - start
+
+    return timings, {'files': len(files), 'rows': len(final_df)}, parsed
+
+
+def cold_start(argv, repeat):
+    """
+    Times `python -m adr_report argv` from a fresh interpreter, as a CI job
+    would start it: the fastest and median of repeat runs, and the heavy
+    modules the command imported (from -X importtime).
+    """
+    command = [sys.executable, '-m', 'adr_report', *argv]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PACKAGE_ROOT, os.environ.get('PYTHONPATH')])))
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, env=env)
+        seconds.append(time.perf_counter() - start)
+    importtime = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:], capture_output=True,
+                                text=True, env=env).stderr
+    imported = {line.rsplit('|', 1)[-1].strip().split('.')[0]
+                for line in importtime.splitlines() if line.startswith('import time:')}
+    return {'fastest': min(seconds), 'median': statistics.median(seconds),
+            'heavy_imports': sorted(imported & HEAVY_MODULES)}
+
+
+def legacy_parsed_data(record, file_type):
+    """
+    The 13-key dict parse_markdown returned for a file before records.
+    """
+    service = file_type == 'service'
+    return {
+        'Service Name': '' if service else record.service_name,
+        'Service Owner': [] if service else list(record.owners),
+        'Service Owner Id': [] if service else list(record.owner_ids),
+        'Service Status': '' if service else record.service_status,
+        'ADR Authors': [] if service else list(record.authors),
+        'ADR Document Status': '' if service else record.document_status,
+        'Latest Approval date': '' if service else record.approval_date,
+        'Capability Mapping Hierarchy': [] if service else [
+            {'Cap-Map Level 0': level0, 'Cap-Map Level 1': level1, 'Cap-Map Level 2': level2}
+            for level0, level1, level2 in record.capabilities],
+        'Data Classification': {} if service else dict(record.data_classification),
+        'S-ADR Service Name': record.service_name if service else '',
+        'S-ADR Document Status': record.document_status if service else '',
+        'S-ADR Service Status': record.service_status if service else '',
+        'S-ADR Approval Date': record.approval_date if service else '',
+    }
+
+
+def deep_size(objects):
+    """
+    Bytes taken by the objects and everything they reference, counting each
+    shared object (an interned string, say) once.
+    """
+    seen = set()
+    size = 0
+    pending = list(objects)
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(chain(obj.keys(), obj.values()))
+        elif isinstance(obj, (list, tuple)):
+            pending.extend(obj)
+        elif hasattr(type(obj), '__match_args__'):
+            pending.extend(getattr(obj, name) for name in obj.__match_args__)
+    return size
+
+
+def record_memory(parsed):
+    """
+    Bytes per file held by records against the parsed_data dicts they
+    replaced, both loaded from JSON the way the parse cache loads them.
+    """
+    records = [type(record).from_json(json.loads(json.dumps(record.to_json()))) for _, record in parsed]
+    dicts = [json.loads(json.dumps(legacy_parsed_data(record, file_type))) for file_type, record in parsed]
+    record_bytes = deep_size(records) / len(records)
+    dict_bytes = deep_size(dicts) / len(dicts)
+    return {'record_bytes': record_bytes, 'parsed_data_bytes': dict_bytes, 'reduction': 1 - record_bytes / dict_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the ADR report on a synthetic corpus.")
+    parser.add_argument('--files', type=int, nargs='+', default=[1000],
+                        help="corpus sizes to benchmark, e.g. 1000 10000 100000 (default: 1000)")
+    parser.add_argument('--corpus-dir', help="keep generated corpora here instead of a temporary directory")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per size; the fastest is kept (default: 3)")
+    parser.add_argument('--seed', type=int, default=0, help="corpus random seed (default: 0)")
+    parser.add_argument('--memory', action='store_true',
+                        help="also measure the memory each parsed record takes against the old parsed_data dict")
+    parser.add_argument('--cold-start', action='store_true',
+                        help="also time how long each adr-report command takes to start from a fresh interpreter")
+    parser.add_argument('--output', default='benchmark.json', help="where to write the results (default: benchmark.json)")
+    args = parser.parse_args()
+
+    results = {
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for files in args.files:
+            corpus_dir = os.path.join(args.corpus_dir or scratch, f"corpus-{files}-{args.seed}")
+            if not os.path.isdir(corpus_dir):
+                generate(corpus_dir, files, seed=args.seed)
+            rules = folder_rules([corpus_dir])
+
+            best = None
+            for _ in range(args.repeat):
+                timings, counts, parsed = run_once(rules, scratch)
+                if best is None or sum(timings.values()) < sum(best.values()):
+                    best = timings
+            run = dict(counts, stages=best, total=sum(best.values()))
+            print(f"{files} files: " + ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in best.items()),
+                  file=sys.stderr)
+            if args.memory:
+                run['memory'] = record_memory(parsed)
+                print(f"{files} files: {run['memory']['record_bytes']:.0f} bytes per record, "
+                      f"{run['memory']['parsed_data_bytes']:.0f} per parsed_data dict "
+                      f"({run['memory']['reduction']:.0%} less)", file=sys.stderr)
+            results['runs'].append(run)
+
+        if args.cold_start:
+            corpus_dir = os.path.join(args.corpus_dir or scratch, f"corpus-{min(args.files)}-{args.seed}")
+            results['cold_start'] = {}
+            for name, argv in COLD_START_COMMANDS.items():
+                argv = [arg.format(corpus=corpus_dir, output=os.path.join(scratch, 'cold-start')) for arg in argv]
+                timing = results['cold_start'][name] = cold_start(argv, args.repeat)
+                print(f"cold start of {name}: {timing['fastest']:.3f}s (median {timing['median']:.3f}s), "
+                      f"imports {', '.join(timing['heavy_imports']) or 'no heavy modules'}", file=sys.stderr)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
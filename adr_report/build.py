@@ -0,0 +1,1071 @@
+import collections
+import functools
+import os
+import subprocess
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from .adr_catalog import Catalog
+from .adr_records import MISSING_VALUE, RECORD_TYPES, ServiceRecord, forget_shared_tuples
+from .adr_template import (CLOSING_HEADING, DATA_CLASSIFICATION_TABLE, DOC_STATUS_TABLE, INLINE_COMMENT,
+                           OWNER_ENTRY, SADR_DOC_STATUS_TABLE, SECTION_HEADINGS, SECTIONS, SERVICE_STATUS_TABLE,
+                           TABLE_ROW_2, TABLE_ROW_3)
+from .capability_tree import CapabilityTree
+from .due_index import add_due_windows
+from .metrics import Metrics, NullMetrics
+from .parse_cache import ParseCache, content_hash
+from .people import PeopleIndex
+from .report_writers import stream_report, write_report
+from .rollups import build_rollups
+from .service_matching import DEFAULT_THRESHOLD, ServiceMatcher
+from .spill import SpillDir
+from .watcher import open_watcher
+from .recert_dates import recertification_columns
+
+
+def remove_comments(content):
+    """
+    Removes markdown comments of the format:
+    [comment]: <> (This is a comment)
+    <!-- This is a comment -->
+    Most files have none, so the content is only copied when one is found.
+    """
+    if '[' in content and INLINE_COMMENT.search(content):
+        content = INLINE_COMMENT.sub('', content)  # Remove inline comments
+    start = content.find('<!--')
+    if start == -1:
+        return content
+    # Remove HTML comments; an unterminated <!-- is left as it is
+    pieces = []
+    pos = 0
+    while start != -1:
+        end = content.find('-->', start + 4)
+        if end == -1:
+            break
+        pieces.append(content[pos:start])
+        pos = end + 3
+        start = content.find('<!--', pos)
+    pieces.append(content[pos:])
+    return ''.join(pieces)
+
+
+def clean_text(content):
+    """
+    Normalises newlines (the rare \r\n files) and removes comments.
+    """
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return remove_comments(content)
+
+
+def find_sections(content, file_type):
+    """
+    Returns (title, bodies) for cleaned markdown text, where bodies maps each
+    heading in SECTIONS[file_type] to the text of its first occurrence.
+    """
+    # Front matter title: ---\ntitle: ...\n---
+    title = None
+    if content.startswith('---\ntitle:'):
+        end = content.find('\n---', 10)
+        if end != -1:
+            title = content[10:end].strip()
+
+    # Jump from one wanted heading to the next; each body then runs up to
+    # the heading that closes it
+    bodies = {}
+    wanted = SECTIONS.get(file_type, {})
+    if not wanted:
+        return title, bodies
+    if content.startswith('##'):
+        content = '\n' + content  # so a leading heading matches like the rest
+    for heading_match in SECTION_HEADINGS[file_type].finditer(content):
+        heading = heading_match.group(1)
+        if heading in bodies:
+            continue
+        start = heading_match.end()
+        end = content.find(CLOSING_HEADING[wanted[heading]], start)
+        bodies[heading] = content[start:] if end == -1 else content[start:end]
+        if len(bodies) == len(wanted):
+            break
+
+    return title, bodies
+
+
+def fingerprint(stat, data, hashed):
+    """
+    (mtime, size, content hash) of the file data was read from, for the
+    parse cache; the hash is None when data isn't the whole file. None
+    unless hashed.
+    """
+    if not hashed:
+        return None
+    return stat.st_mtime_ns, stat.st_size, content_hash(data) if len(data) == stat.st_size else None
+
+
+def read_sections(file_path, file_type, hashed=False):
+    """
+    Reads a markdown file once and returns (title, bodies, bytes_read,
+    fingerprint), the fingerprint only when hashed. Service ADRs are read
+    through read_service_sections instead.
+    """
+    if file_type == 'service':
+        return read_service_sections(file_path, hashed)
+    # Binary read skips the text-layer overhead
+    with open(file_path, 'rb') as file:
+        stat = os.fstat(file.fileno())
+        data = file.read()
+    return find_sections(clean_text(data.decode('utf-8')), file_type) + (len(data), fingerprint(stat, data, hashed))
+
+
+# First read of a service ADR; the title and status table sit at the top,
+# within the first few hundred bytes of the template
+SERVICE_READ_BLOCK = 1024
+
+
+def read_service_sections(file_path, hashed=False):
+    """
+    Reads a service ADR only as far as its title and Document Status row,
+    a block at a time (each twice the last), and falls back to the whole
+    file when they can't be settled from the start of it. Returns the same
+    (title, bodies, bytes_read, fingerprint) as reading the whole file
+    would, except that the fingerprint has no hash when the read stopped
+    early.
+    """
+    with open(file_path, 'rb') as file:
+        stat = os.fstat(file.fileno())
+        data = b''
+        block = SERVICE_READ_BLOCK
+        while True:
+            chunk = file.read(block)
+            if not chunk:
+                break
+            data += chunk
+            block *= 2
+            # Only complete lines, so a heading or row isn't judged by half
+            # of it; '\n' never occurs inside a multi-byte UTF-8 character
+            end = data.rfind(b'\n')
+            if end == -1:
+                continue
+            content = clean_text(data[:end + 1].decode('utf-8'))
+            if '<!--' in content:
+                continue  # a comment that may hide what follows
+            title, bodies = find_sections(content, 'service')
+            if title is None and content.startswith('---\ntitle:'):
+                continue  # front matter not closed yet
+            body = bodies.get('Document Status')
+            if body is None:
+                continue
+            # Settled once the section is closed by the next heading or its
+            # status row is complete
+            if not content.endswith(body) or SADR_DOC_STATUS_TABLE.match(body):
+                return title, bodies, len(data), fingerprint(stat, data, hashed)
+    return find_sections(clean_text(data.decode('utf-8')), 'service') + (len(data), fingerprint(stat, data, hashed))
+
+
+def parse_markdown(file_path, file_type='foundational', io_stats=None, hashed=False):
+    """
+    Reads what the report needs from one ADR into a FoundationalRecord,
+    DeprecatedRecord or ServiceRecord, depending on file_type. io_stats, if
+    given, gets the bytes read and, when hashed, the fingerprint of the
+    file as parsed (see read_sections).
+    """
+    title, sections, bytes_read, file_fingerprint = read_sections(file_path, file_type, hashed)
+    if io_stats is not None:
+        io_stats['bytes_read'] = bytes_read
+        io_stats['fingerprint'] = file_fingerprint
+
+    if file_type == 'service':
+        # For service-adr files, extract title and Document Status section
+        record = {'service_name': title or ''}
+
+        # Extract Document Status Table
+        doc_status_match = SADR_DOC_STATUS_TABLE.match(sections.get('Document Status', ''))
+        if doc_status_match:
+            record['document_status'] = doc_status_match.group(1).strip()
+            record['service_status'] = doc_status_match.group(2).strip()
+            record['approval_date'] = doc_status_match.group(4).strip()
+        return ServiceRecord(**record)
+
+    record = {'service_name': title or ''}
+
+    # Extract document owner and contributors
+    if 'Document Owner' in sections:
+        owners = []
+        owner_ids = []
+        for owner in sections['Document Owner'].strip().split('\n'):
+            owner = owner.lstrip('-').strip()
+            match = OWNER_ENTRY.match(owner)
+            if match:
+                owners.append(match.group(1))
+                owner_ids.append(match.group(2))
+        record['owners'] = owners
+        record['owner_ids'] = owner_ids
+
+    if 'Author/Contributors' in sections:
+        authors = sections['Author/Contributors'].strip().split('\n')
+        record['authors'] = [author.lstrip('-').strip() for author in authors]
+
+    # Extract document status and approval date
+    doc_status_match = DOC_STATUS_TABLE.match(sections.get('Document Status', ''))
+    if doc_status_match:
+        record['document_status'] = doc_status_match.group(1).strip()
+        record['approval_date'] = doc_status_match.group(3).strip()
+
+    # Extract the document status history, in the order the log lists it
+    if 'Document Status log' in sections:
+        status_log = []
+        table_rows = [line.strip() for line in sections['Document Status log'].split('\n') if line.strip().startswith('|')]
+        for table_row in table_rows[1:]:  # Skip the header row
+            cells = [cell.strip() for cell in table_row.strip('|').split('|')]
+            if len(cells) < 3 or all(set(cell) <= set(':-') for cell in cells):
+                continue  # separator or broken row
+            status_log.append((cells[0], cells[1], cells[2], cells[3] if len(cells) > 3 else ''))
+        record['status_log'] = status_log
+
+    # Extract capability mapping hierarchy
+    if '1. Capability Mapping Hierarchy' in sections:
+        capability_table_rows = TABLE_ROW_3.findall(sections['1. Capability Mapping Hierarchy'])
+        capability_table_rows = capability_table_rows[1:]  # Skip the header row
+        record['capabilities'] = [(row[0].strip(), row[1].strip(), row[2].strip())
+                                  for row in capability_table_rows if not any(":--" in col for col in row)]
+
+    # Extract data classification; a repeated classification keeps its
+    # first position and its last rating
+    data_classification_body = sections.get('2.2 Data Classification', '')
+    data_classification_header = DATA_CLASSIFICATION_TABLE.match(data_classification_body)
+    if data_classification_header:
+        data_classification = {}
+        for row in TABLE_ROW_2.findall(data_classification_body, data_classification_header.end()):
+            data_classification[f"DC-{row[0].strip()}"] = row[1].strip()
+        record['data_classification'] = data_classification.items()
+
+    # Extract service status
+    service_status_section = SERVICE_STATUS_TABLE.match(sections.get('Service Status', ''))
+    if service_status_section:
+        record['service_status'] = service_status_section.group(1).strip()
+
+    return RECORD_TYPES[file_type](**record)
+
+
+def process_f_adr(record):
+    """
+    Shapes a FoundationalRecord (or DeprecatedRecord) into flat report rows;
+    see FoundationalRecord.to_rows.
+    """
+    return record.to_rows()
+
+
+def build_f_adr_frame(rows, today=None):
+    """
+    Builds the F-ADR report table from process_f_adr rows in one go. Columns
+    appear in the order they are first seen; cells a file has no column for
+    (a capability or DC-* rating it doesn't list) are left empty. Returns
+    the table and the per-row errors from working out the due dates.
+    """
+    columns = {}
+    for row in rows:
+        if not columns.keys() >= row.keys():
+            columns.update(dict.fromkeys(row))
+    df = pd.DataFrame.from_records(rows, columns=list(columns))
+
+    # Dates for the whole table at once; the new columns go right after
+    # the first file's own columns, where per-file frames used to put them
+    date_columns, date_errors = recertification_columns(df['Latest Approval date'], today=today)
+    df['Latest Approval date'] = date_columns['Latest Approval date']
+    position = len(rows[0]) if rows else len(df.columns)
+    for offset, column in enumerate(['Re-certify Due Date', 'Re-certify Due Month', 'Upcoming Recertification']):
+        df.insert(position + offset, column, date_columns[column])
+    return df, date_errors
+
+
+def iter_files(rules):
+    """
+    Yields the markdown files to process as (file_name, file_path,
+    file_type) tuples, in the order the report has always used, without
+    listing a whole folder up front. rules are config.FolderRule objects.
+    """
+    for rule in rules:
+        for entry in os.scandir(rule.path):
+            if rule.accepts(entry.name):
+                yield entry.name, os.path.join(rule.path, entry.name), rule.file_type
+
+
+def discover_files(rules):
+    """
+    Lists the markdown files to process as (file_name, file_path, file_type)
+    tuples, in the order the report has always used.
+    """
+    return list(iter_files(rules))
+
+
+GIT_STATUSES = {'A': 'added', 'C': 'added', 'M': 'modified', 'T': 'modified', 'U': 'modified',
+                'R': 'renamed', 'D': 'deleted'}
+
+
+def git_changes(folder_paths, rev):
+    """
+    Asks git which markdown files in the folders differ between rev and the
+    working tree; files git doesn't track count as added. Returns (changes,
+    removed): {file_path: status} with status one of 'added', 'modified',
+    'renamed' (under the new name) or 'deleted', and the set of paths that
+    are gone, old names of renamed files included. Raises OSError or
+    CalledProcessError if git can't answer.
+    """
+    changes = {}
+    removed = set()
+    for folder_path in folder_paths:
+        output = subprocess.run(
+            ['git', '-C', folder_path, 'diff', '--name-status', '-z', '--relative', rev, '--', '.'],
+            capture_output=True, check=True
+        ).stdout.decode('utf-8', errors='surrogateescape')
+        fields = iter(output.split('\0'))
+        for letter in fields:
+            if not letter:
+                continue
+            status = GIT_STATUSES.get(letter[0], 'modified')
+            paths = [next(fields)]
+            if letter[0] in 'RC':
+                paths.append(next(fields))  # old name, then new name
+            if status == 'renamed':
+                removed.add(os.path.join(folder_path, paths[0]))
+            file_path = os.path.join(folder_path, paths[-1])
+            if file_path.endswith('.md'):
+                changes[file_path] = status
+                if status == 'deleted':
+                    removed.add(file_path)
+        # git diff never mentions untracked (or ignored) files
+        output = subprocess.run(
+            ['git', '-C', folder_path, 'ls-files', '--others', '-z', '--', '.'], capture_output=True, check=True
+        ).stdout.decode('utf-8', errors='surrogateescape')
+        for path in output.split('\0'):
+            if path.endswith('.md'):
+                changes.setdefault(os.path.join(folder_path, path), 'added')
+    return changes, removed
+
+
+def git_commit(folder_path, rev):
+    """
+    The full commit hash rev names in the repository holding folder_path.
+    Raises OSError or CalledProcessError if git can't answer.
+    """
+    return subprocess.run(
+        ['git', '-C', folder_path, 'rev-parse', '--verify', '--quiet', f"{rev}^{{commit}}"],
+        capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def clean_revision(folder_paths):
+    """
+    The HEAD commit the tracked files of every folder match, or None if the
+    folders aren't in git, sit at different commits or have uncommitted
+    edits. Untracked files don't count; git_changes always lists them.
+    """
+    revisions = set()
+    try:
+        for folder_path in folder_paths:
+            revisions.add(git_commit(folder_path, 'HEAD'))
+            if subprocess.run(['git', '-C', folder_path, 'diff', '--quiet', 'HEAD', '--', '.'],
+                              capture_output=True).returncode != 0:
+                return None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revisions.pop() if len(revisions) == 1 else None
+
+
+def process_chunk(chunk, timed=False, hashed=False):
+    """
+    Parses a chunk of discovered files into records, unless already parsed.
+    Failures and warnings are returned with the file they belong to rather
+    than printed, so the caller can report them in file order whichever
+    process did the work. Fresh parses are returned too, for the cache, as
+    (record, fingerprint) with the fingerprint worked out from the bytes
+    the parse read when hashed, so the cache never reads a file itself.
+    When timed, each result also carries the file's latency, size, the bytes
+    actually read to parse it, whether it came from the cache and the stage
+    it failed in; otherwise that slot is None.
+    """
+    results = []
+    for file_name, file_path, file_type, record in chunk:
+        messages = []
+        fresh = None
+        cached = record is not None
+        io_stats = {'bytes_read': 0, 'fingerprint': None}
+        stage = None
+        if timed:
+            start = time.perf_counter()
+        if record is None:
+            try:
+                # Parse the markdown file into its record
+                record = parse_markdown(file_path, file_type=file_type, io_stats=io_stats, hashed=hashed)
+                fresh = (record, io_stats['fingerprint'])
+            except Exception as e:
+                stage = 'parse'
+                messages.append(f"Error while processing the file {file_name}: {e}")
+        stats = None
+        if timed:
+            seconds = time.perf_counter() - start
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                size = None
+            stats = {'seconds': seconds, 'bytes': size, 'bytes_read': io_stats['bytes_read'],
+                     'cached': cached, 'failed': stage}
+        results.append((file_name, file_path, file_type, record, messages, fresh, stats))
+    return results
+
+
+def run_files(files, workers=1, timed=False, hashed=False):
+    """
+    Yields process_chunk results for every file, in discovery order. With more
+    than one worker the chunks are spread over a process pool.
+    """
+    if workers <= 1 or len(files) < 2:
+        yield from process_chunk(files, timed, hashed)
+        return
+
+    # A few chunks per worker keeps them all busy without paying the
+    # pickling cost of one task per file
+    chunk_size = max(1, len(files) // (workers * 4))
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() hands results back in submission order
+        for results in executor.map(functools.partial(process_chunk, timed=timed, hashed=hashed), chunks):
+            yield from results
+
+
+def lookup_cached(discovered, cache, changes=None, metrics=None):
+    """
+    (file_name, file_path, file_type, record) for every discovered file,
+    with the cached record of those that need no parse and None for the
+    rest. Files git reports as unchanged (changes from git_changes) are
+    taken from the cache as they are, so changes must only be given when
+    the cache was written at the revision they are relative to.
+    """
+    metrics = metrics or NullMetrics()
+    files = []
+    for file_name, file_path, file_type in discovered:
+        record = None
+        if cache is not None:
+            try:
+                if changes is not None and file_path not in changes:
+                    record = cache.load(file_path, file_type)
+                if record is None:
+                    record = cache.lookup(file_path, file_type)
+            except OSError:
+                metrics.count_error('cache_lookup')  # the parse reports it
+        files.append((file_name, file_path, file_type, record))
+    return files
+
+
+def parse_files(files, cache=None, workers=1, metrics=None):
+    """
+    Runs lookup_cached's files through run_files, printing their messages,
+    recording their metrics and caching fresh parses, and yields
+    (file_path, file_type, record) in discovery order.
+    """
+    metrics = metrics or NullMetrics()
+    for file_name, file_path, file_type, record, messages, fresh, stats in run_files(
+            files, workers=workers, timed=metrics.enabled, hashed=cache is not None):
+        for message in messages:
+            print(message)
+        if stats is not None:
+            metrics.record_file(file_path, file_type, stats['seconds'], stats['bytes'],
+                                bytes_read=stats['bytes_read'], cached=stats['cached'])
+            if stats['failed']:
+                metrics.count_error(stats['failed'])
+        if fresh is not None and cache is not None:
+            cache.store(file_path, file_type, *fresh)
+        yield file_path, file_type, record
+
+
+def print_changes(since, changes, unchanged):
+    counts = collections.Counter(changes.values())
+    print(f"Changes since {since}: {counts['added']} added, {counts['modified']} modified, "
+          f"{counts['renamed']} renamed, {counts['deleted']} deleted; {unchanged} files unchanged")
+
+
+SADR_COLUMNS = ['S-ADR Document Status', 'S-ADR Service Status', 'S-ADR Approval Date']
+MATCH_COLUMNS = ['S-ADR Service Name', 'S-ADR Match', 'S-ADR Match Confidence']
+
+
+def match_sadr_data(service_names, sadr_data, match_threshold=DEFAULT_THRESHOLD, matches=None):
+    """
+    Pairs S-ADR titles with F-ADR service names exactly where possible, then
+    by normalized name and then by similarity (see service_matching), unless
+    the pairs are given as matches (ServiceMatcher.match_all of the titles).
+    Returns the S-ADR columns (plus the S-ADR title, how it matched and the
+    confidence) indexed by the service each S-ADR was paired with, or None
+    if none was, and the S-ADR data of the titles left unpaired.
+    """
+    sadr_df = pd.DataFrame.from_dict(sadr_data, orient='index')
+    if matches is None:
+        matches = ServiceMatcher(service_names).match_all(sadr_df.index, match_threshold)
+    unmatched = sadr_df[~sadr_df.index.isin(list(matches))]
+    if not matches:
+        return None, unmatched
+
+    titles = list(matches)
+    by_service = sadr_df.loc[titles].set_axis([matches[title][0] for title in titles])
+    by_service['S-ADR Match'] = [matches[title][2] for title in titles]
+    by_service['S-ADR Match Confidence'] = [round(matches[title][1], 3) for title in titles]
+    return by_service, unmatched
+
+
+def add_sadr_columns(df, by_service):
+    # One keyed lookup per column instead of a scan per service
+    matched = df['Service Name'].isin(by_service.index)
+    for column in SADR_COLUMNS + MATCH_COLUMNS:
+        df[column] = df['Service Name'].map(by_service[column]).where(matched)
+
+
+def no_f_adr_rows(unmatched, today=None, person_ids=False):
+    """
+    Rows for services that only have an S-ADR, with default values; their
+    dates come from the S-ADR approval date, worked out like the F-ADR ones.
+    With person_ids the owner and author columns are those of use_person_ids.
+    """
+    date_columns, _ = recertification_columns(unmatched['S-ADR Approval Date'], today=today)
+    owners = {'Owner IDs': 'NA'} if person_ids else {'Service Owner': 'NA', 'Service Owner Id': 'NA'}
+    authors = {'Author IDs': 'NA'} if person_ids else {'ADR Authors': 'NA'}
+    return pd.DataFrame({
+        'Service Name': unmatched.index,
+        **owners,
+        'Service Status': unmatched['S-ADR Service Status'].to_numpy(),
+        **authors,
+        'ADR Document Status': 'No f-adr',
+        'Latest Approval date': date_columns['Latest Approval date'].to_numpy(),
+        'Capability Mapping Hierarchy': 'NA',
+        'Data Classification': 'NA',
+        'S-ADR Document Status': unmatched['S-ADR Document Status'].to_numpy(),
+        'S-ADR Service Status': unmatched['S-ADR Service Status'].to_numpy(),
+        'S-ADR Approval Date': unmatched['S-ADR Approval Date'].to_numpy(),
+        'Re-certify Due Date': date_columns['Re-certify Due Date'].to_numpy(),
+        'Re-certify Due Month': date_columns['Re-certify Due Month'].to_numpy(),
+        'Upcoming Recertification': date_columns['Upcoming Recertification'].to_numpy()
+    })
+
+
+def merge_sadr_data(final_df, sadr_data, today=None, match_threshold=DEFAULT_THRESHOLD, person_ids=False,
+                    matches=None):
+    """
+    Joins S-ADR data onto the F-ADR table by Service Name, as matched by
+    match_sadr_data. Every F-ADR row of a matching service gets the S-ADR
+    columns; S-ADRs with no F-ADR are added as "No f-adr" rows in one batch
+    at the end, dated by their S-ADR approval.
+    """
+    if not sadr_data:
+        return final_df
+    # A corpus without F-ADRs has no columns at all, let alone Service Name
+    service_names = final_df['Service Name'] if len(final_df.columns) else []
+    by_service, unmatched = match_sadr_data(service_names, sadr_data, match_threshold, matches)
+    if by_service is not None:
+        add_sadr_columns(final_df, by_service)
+    if unmatched.empty:
+        return final_df
+    extra_rows = no_f_adr_rows(unmatched, today=today, person_ids=person_ids)
+    if not len(final_df.columns):
+        return extra_rows
+    return pd.concat([final_df, extra_rows], ignore_index=True)
+
+
+# Columns --person-ids swaps for the people index's ids; the owners' emails
+# (Service Owner Id) go with their names
+PERSON_ID_COLUMNS = {'Service Owner': 'Owner IDs', 'ADR Authors': 'Author IDs'}
+
+
+def use_person_ids(df, people, file_paths, starts):
+    """
+    Replaces the joined owner names and emails and author names of an F-ADR
+    table with the Person IDs (see people.PeopleIndex, which must hold every
+    file) of its owners and authors, so each row carries a few digits per
+    person instead of their names. The rows from starts[i] on are those of
+    file_paths[i].
+    """
+    row_counts = [end - start for start, end in zip(starts, starts[1:] + [len(df)])]
+    file_people = [people.service_people[people.service_ids[file_path]] for file_path in file_paths]
+    for role, column in enumerate(PERSON_ID_COLUMNS):
+        ids = pd.Series([', '.join(map(str, person_ids[role])) or MISSING_VALUE for person_ids in file_people],
+                        dtype=object)
+        df[column] = ids.repeat(row_counts).to_numpy()
+    df.drop(columns='Service Owner Id', inplace=True)
+    df.rename(columns=PERSON_ID_COLUMNS, inplace=True)
+
+
+def f_adr_table(records, sadr_data, metrics=None, people=None):
+    """
+    Builds the F-ADR table of the foundational and deprecated records, given
+    as (file_path, file_type, record) in discovery order with None for
+    failed files; S-ADR rows are collected into sadr_data on the way.
+    Owners and authors are given by Person ID when a people index holding
+    the records is passed (see use_person_ids). Returns the table and
+    (file_path, message) for every approval date that could not be used.
+    """
+    metrics = metrics or NullMetrics()
+
+    # Initialize an empty list to hold the F-ADR report rows of every file,
+    # and where each file's rows start
+    f_adr_rows = []
+    f_adr_starts = []
+    f_adr_paths = []
+
+    for file_path, file_type, record in records:
+        if record is None:
+            continue
+        if file_type == 'service':
+            sadr_data[record.service_name] = record.to_row()
+        else:
+            f_adr_starts.append(len(f_adr_rows))
+            f_adr_paths.append(file_path)
+            f_adr_rows.extend(process_f_adr(record))
+    if not f_adr_rows:
+        return pd.DataFrame(), []
+
+    # Build the F-ADR table in one go
+    with metrics.stage('build_table'):
+        df, date_errors = build_f_adr_frame(f_adr_rows)
+        date_errors = [(file_path, message) for file_path, message
+                       in zip(f_adr_paths, date_errors.iloc[f_adr_starts]) if isinstance(message, str)]
+        if people is not None:
+            use_person_ids(df, people, f_adr_paths, f_adr_starts)
+    metrics.count_error('dates', len(date_errors))
+    return df, date_errors
+
+
+def build_report(records, metrics=None, due_windows=(), match_threshold=DEFAULT_THRESHOLD, people=None):
+    """
+    Builds the full report table from records, given as (file_path,
+    file_type, record) in discovery order with None for failed files, plus
+    a 0/1 column per due_window (see due_index.due_window). S-ADRs are
+    matched to services down to match_threshold similarity. With a people
+    index of the records, owners and authors are given by Person ID.
+    Returns the table, (file_path, message) for every approval date that
+    could not be used, and the number of rows in each due window.
+    """
+    metrics = metrics or NullMetrics()
+
+    # Initialize an empty dictionary to store S-ADR data
+    sadr_data = {}
+    final_df, date_errors = f_adr_table(records, sadr_data, metrics, people)
+    final_df, window_counts = join_report(final_df, sadr_data, metrics, due_windows, match_threshold,
+                                          person_ids=people is not None)
+    return final_df, date_errors, window_counts
+
+
+def join_report(final_df, sadr_data, metrics=None, due_windows=(), match_threshold=DEFAULT_THRESHOLD,
+                person_ids=False, matches=None):
+    """
+    The rest of build_report once the F-ADR table is built: joins the S-ADR
+    data (as in merge_sadr_data, which matches may spare the matching),
+    numbers the rows and adds the due windows. Returns the table and the
+    number of rows in each due window.
+    """
+    metrics = metrics or NullMetrics()
+
+    # Add S-ADR data to final_df by matching the Service Name
+    with metrics.stage('sadr_merge'):
+        final_df = merge_sadr_data(final_df, sadr_data, match_threshold=match_threshold,
+                                   person_ids=person_ids, matches=matches)
+
+    # Modify the DataFrame as per the requirements
+    final_df.reset_index(inplace=True, drop=True)
+    final_df.index += 1
+    final_df.index.name = "SL No."
+
+    # Every requested window from one sorted pass over the due dates
+    window_counts = {}
+    if due_windows:
+        with metrics.stage('due_windows'):
+            window_counts = add_due_windows(final_df, due_windows)
+    return final_df, window_counts
+
+
+def save_capability_tree(capability_tree, args, metrics=None):
+    """
+    Saves the capability tree index next to the report as JSON. Returns the
+    tree as a sheet for the report, or None with --no-rollups.
+    """
+    metrics = metrics or NullMetrics()
+    path = f"{args.output}-capability-tree.json"
+    with metrics.stage('capability_tree'):
+        capability_tree.write_json(path)
+        sheet = None if args.no_rollups else capability_tree.to_frame()
+    print(f"Capability tree saved to '{path}'")
+    return sheet
+
+
+def save_people_index(people, args, metrics=None):
+    """
+    Saves the people index next to the report as JSON (for adr-report query
+    person). Returns the people sheet for the report, or None with
+    --no-rollups.
+    """
+    metrics = metrics or NullMetrics()
+    path = f"{args.output}-people.json"
+    with metrics.stage('people_index'):
+        people.write_json(path)
+        sheet = None if args.no_rollups else people.to_frame()
+    print(f"People index saved to '{path}': {len(people.people)} people")
+    return sheet
+
+
+def save_report(final_df, args, metrics=None, capability_tree=None, people=None):
+    metrics = metrics or NullMetrics()
+
+    # Summary tables next to the report, so nobody has to pivot it by hand
+    rollups = {}
+    if not args.no_rollups:
+        with metrics.stage('rollups'):
+            rollups = build_rollups(final_df)
+    if capability_tree is not None:
+        sheet = save_capability_tree(capability_tree, args, metrics)
+        if sheet is not None:
+            rollups['Capability Tree'] = sheet
+    if people is not None:
+        sheet = save_people_index(people, args, metrics)
+        if sheet is not None:
+            rollups['People'] = sheet
+
+    # Save the final dataframe in every requested format
+    for path in write_report(final_df, args.output, args.format, sheet_name='F-ADR', metrics=metrics,
+                             extra_sheets=rollups):
+        if path.endswith('.xlsx'):
+            print(f"Output saved to '{path}' with sheet name 'F-ADR'")
+        else:
+            print(f"Output saved to '{path}'")
+    if rollups:
+        print(f"Rollups saved: {', '.join(rollups)}")
+
+
+def print_matches(methods):
+    # methods: S-ADR match method -> number of services
+    print(f"S-ADR matches: {methods.get('exact', 0)} exact, {methods.get('normalized', 0)} normalized, "
+          f"{methods.get('fuzzy', 0)} fuzzy")
+
+
+# Rough peak memory of a batch per byte of markdown in it, from parsed
+# records to the shaped table; measured on the sample corpus
+BATCH_MEMORY_PER_BYTE = 4
+
+
+def batched_files(discovered, batch_bytes):
+    """
+    Groups discovered files into lists holding about batch_bytes of
+    markdown each.
+    """
+    batch = []
+    size = 0
+    for file_name, file_path, file_type in discovered:
+        try:
+            size += os.path.getsize(file_path)
+        except OSError:
+            pass  # the parse reports it
+        batch.append((file_name, file_path, file_type))
+        if size >= batch_bytes:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+def chunked_report(discovered, args, cache=None, changes=None, metrics=None, trust_changes=False):
+    """
+    Builds and writes the report for --max-memory, in batches of files
+    taking about args.max_memory MB each. Files are parsed and shaped a
+    batch at a time and each batch's F-ADR table is spilled to disk; only
+    service names, S-ADR data, the capability tree and the people index
+    stay in memory. A final pass streams the spilled batches through the
+    S-ADR join and due windows into the report writers, giving the same
+    report as the in-memory path (less the rollups other than the
+    capability tree and people sheets, which need the whole table).
+    Unchanged files are taken from the cache as they are only with
+    trust_changes (see lookup_cached).
+    """
+    metrics = metrics or NullMetrics()
+    batch_bytes = max(1, args.max_memory * 2**20 // BATCH_MEMORY_PER_BYTE)
+    capability_tree = CapabilityTree()
+    people = PeopleIndex()
+    service_names = {}
+    sadr_data = {}
+    unchanged = 0
+
+    with SpillDir(args.spill_dir) as spill:
+        for batch in batched_files(discovered, batch_bytes):
+            with metrics.stage('cache_lookup'):
+                files = lookup_cached(batch, cache, changes if trust_changes else None, metrics)
+            if changes is not None:
+                unchanged += sum(1 for _, file_path, _ in batch if file_path not in changes)
+            with metrics.stage('parse_and_shape'):
+                records = list(parse_files(files, cache, args.workers, metrics))
+            if cache is not None:
+                cache.flush()
+            for file_path, file_type, record in records:
+                if record is not None and file_type != 'service':
+                    capability_tree.add(file_path, record)
+                    people.add(file_path, record)
+
+            df, date_errors = f_adr_table(records, sadr_data, metrics, people if args.person_ids else None)
+            for _, message in date_errors:
+                print(message)
+            if len(df):
+                service_names.update(dict.fromkeys(df['Service Name']))
+                with metrics.stage('spill'):
+                    spill.write(df)
+            del records, df
+            forget_shared_tuples()
+
+        if changes is not None:
+            print_changes(args.since, changes, unchanged)
+        if cache is not None:
+            print(f"Parse cache: {cache.hits} hits, {cache.misses} misses")
+
+        with metrics.stage('sadr_merge'):
+            by_service = None
+            extra_rows = []
+            if sadr_data:
+                by_service, unmatched = match_sadr_data(service_names, sadr_data, args.match_threshold)
+                if not unmatched.empty:
+                    extra_rows.append(no_f_adr_rows(unmatched, person_ids=args.person_ids))
+            del service_names, sadr_data
+
+        # Columns come out as pd.concat orders them in build_report
+        columns = list(spill.columns)
+        if by_service is not None:
+            columns += [column for column in SADR_COLUMNS + MATCH_COLUMNS if column not in columns]
+        for df in extra_rows:
+            columns += [column for column in df.columns if column not in columns]
+        columns += [name for name, _, _ in args.due_window]
+
+        window_counts = collections.Counter()
+        first_row = 1
+
+        def finished(df):
+            nonlocal first_row
+            if args.due_window:
+                with metrics.stage('due_windows'):
+                    window_counts.update(add_due_windows(df, args.due_window))
+            df = df.reindex(columns=columns)
+            df.index = pd.RangeIndex(first_row, first_row + len(df), name="SL No.")
+            first_row += len(df)
+            # Every batch needs the same dtypes for Parquet; a column with
+            # nothing in this batch would otherwise come out float
+            for column in df.columns:
+                if column == 'S-ADR Match Confidence':
+                    df[column] = df[column].astype(float)
+                elif df[column].dtype == float and df[column].isna().all():
+                    df[column] = df[column].astype(object)
+            return df
+
+        def final_batches():
+            for df in spill.batches():
+                if by_service is not None:
+                    with metrics.stage('sadr_merge'):
+                        add_sadr_columns(df, by_service)
+                yield finished(df)
+            for df in extra_rows:
+                yield finished(df)
+
+        extra_sheets = {'Capability Tree': save_capability_tree(capability_tree, args, metrics),
+                        'People': save_people_index(people, args, metrics)}
+        extra_sheets = {name: sheet for name, sheet in extra_sheets.items() if sheet is not None}
+        for path in stream_report(final_batches(), args.output, args.format, columns, sheet_name='F-ADR',
+                                  index_name="SL No.", metrics=metrics, extra_sheets=extra_sheets):
+            if path.endswith('.xlsx'):
+                print(f"Output saved to '{path}' with sheet name 'F-ADR'")
+            else:
+                print(f"Output saved to '{path}'")
+
+    for name, _, _ in args.due_window:
+        print(f"{name}: {window_counts[name]} rows")
+    if by_service is not None:
+        print_matches(by_service['S-ADR Match'].value_counts())
+    print(f"Report built in {len(spill.paths)} batches of up to {batch_bytes // 1024} KB of markdown; "
+          "rollups other than the capability tree and people are not written in --max-memory mode")
+
+
+def update_catalog(path, records, metrics=None):
+    metrics = metrics or NullMetrics()
+    with metrics.stage('catalog'):
+        catalog = Catalog(path)
+        try:
+            written, removed = catalog.update(records)
+        finally:
+            catalog.close()
+    print(f"Catalog '{path}' updated: {written} ADRs written, {removed} removed")
+
+
+def watch(rules, records, args, cache=None):
+    """
+    Keeps the report up to date until interrupted. records maps every file
+    path to its (file_type, record) and is updated in place: only files
+    that changed are parsed again. Once changes have settled for
+    args.debounce seconds a live_report.LiveReport swaps the changed files'
+    rows into the table and pairs again only the S-ADRs they could affect,
+    and a ReportWriter writes the outputs in the background while the next
+    changes are awaited. The report still waiting is written on Ctrl+C.
+    """
+    from .live_report import LiveReport, ReportWriter
+
+    report = LiveReport(args.due_window, args.match_threshold, args.person_ids)
+    report.update(records)  # the report just written
+    watcher = open_watcher([rule.path for rule in rules], poll_interval=args.poll_interval)
+    writer = ReportWriter(args)
+    print(f"Watching {len(rules)} folders for changes ({watcher.name}); press Ctrl+C to stop")
+    try:
+        while True:
+            changed = watcher.wait()
+            # Editors and git checkouts touch files in bursts; wait for them
+            # to settle so the report is written once per burst
+            while True:
+                more = watcher.wait(args.debounce)
+                if not more:
+                    break
+                changed |= more
+
+            start = time.perf_counter()
+            # Edited files' old tuples go with their records
+            forget_shared_tuples()
+            discovered = discover_files(rules)
+            files = []
+            for file_name, file_path, file_type in discovered:
+                if file_path not in changed and file_path in records:
+                    continue
+                record = None
+                if cache is not None:
+                    try:
+                        # A file saved without edits is still a hit
+                        record = cache.lookup(file_path, file_type)
+                    except OSError:
+                        pass  # the parse reports it
+                files.append((file_name, file_path, file_type, record))
+            parsed = {}
+            for file_name, file_path, file_type, record, messages, fresh, _ in process_chunk(
+                    files, hashed=cache is not None):
+                for message in messages:
+                    print(message)
+                if fresh is not None and cache is not None:
+                    cache.store(file_path, file_type, *fresh)
+                parsed[file_path] = (file_type, record)
+            if cache is not None:
+                if files:
+                    cache.set_revision(None)  # edits made since the run's commit
+                cache.flush()
+
+            # Rebuild the record order from the listing, dropping removed files
+            removed = records.keys() - {file_path for _, file_path, _ in discovered}
+            if cache is not None:
+                for file_path in removed:
+                    cache.forget(file_path)
+            updated = {file_path: parsed.get(file_path) or records[file_path]
+                       for _, file_path, _ in discovered}
+            records.clear()
+            records.update(updated)
+            if not files and not removed:
+                continue  # a file the report doesn't read
+
+            try:
+                final_df, date_errors, f_adrs_changed = report.update(records, parsed.keys() | removed)
+            except Exception as e:
+                print(f"Error while updating the report: {e}")
+                # Its state may be half updated; a new one builds it all
+                report = LiveReport(args.due_window, args.match_threshold, args.person_ids)
+                continue
+            for file_path, message in date_errors:
+                if file_path in parsed:
+                    print(message)
+            print(f"Updated the report for {len(files)} changed and {len(removed)} removed files in "
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms")
+            writer.submit(final_df, records, report.people, f_adrs_changed)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        writer.close()
+
+
+def run(args):
+    """
+    Builds the report for the parsed command line of `adr-report build`.
+    """
+    metrics = Metrics(args.slowest) if args.metrics or args.prometheus else NullMetrics()
+    rules = args.folder_rules
+
+    # Record of every file by path, in discovery order
+    records = {}
+
+    # In --max-memory mode files are listed as they are processed instead
+    if not args.max_memory:
+        with metrics.stage('discovery'):
+            discovered = discover_files(rules)
+
+    cache = None if args.no_cache else ParseCache(args.cache_dir)
+    folder_paths = [rule.path for rule in rules]
+    # The commit the cache matches once this run has stored its parses
+    revision = clean_revision(folder_paths) if cache is not None else None
+
+    # With --since, git says which files changed; the rest are taken from
+    # the last run's parses as they are if that run was at the same commit,
+    # and checked against the cache like any other run if not
+    changes = None
+    trust_changes = False
+    if args.since:
+        with metrics.stage('git_diff'):
+            try:
+                changes, _ = git_changes(folder_paths, args.since)
+                trust_changes = cache.revision == git_commit(folder_paths[0], args.since)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"Error while asking git for changes since {args.since}: {e}; checking every file instead")
+                metrics.count_error('git_diff')
+        if changes is not None and not trust_changes:
+            print(f"The parse cache wasn't written at {args.since}; checking unchanged files against it")
+
+    if args.max_memory:
+        chunked_report(iter_files(rules), args, cache, changes, metrics, trust_changes)
+        if cache is not None:
+            cache.retain(file_path for _, file_path, _ in iter_files(rules))
+    else:
+        # Reuse earlier parses of unchanged files
+        with metrics.stage('cache_lookup'):
+            files = lookup_cached(discovered, cache, changes if trust_changes else None, metrics)
+            if cache is not None:
+                cache.retain(file_path for _, file_path, _ in discovered)
+            if changes is not None:
+                print_changes(args.since, changes,
+                              sum(1 for _, file_path, _ in discovered if file_path not in changes))
+
+        with metrics.stage('parse_and_shape'):
+            for file_path, file_type, record in parse_files(files, cache, args.workers, metrics):
+                records[file_path] = (file_type, record)
+            if cache is not None:
+                cache.flush()
+                print(f"Parse cache: {cache.hits} hits, {cache.misses} misses")
+
+        people = PeopleIndex.from_records(records)
+        final_df, date_errors, window_counts = build_report(
+            ((file_path, file_type, record) for file_path, (file_type, record) in records.items()), metrics,
+            due_windows=args.due_window, match_threshold=args.match_threshold,
+            people=people if args.person_ids else None)
+        for _, message in date_errors:
+            print(message)
+        for name, count in window_counts.items():
+            print(f"{name}: {count} rows")
+        if 'S-ADR Match' in final_df.columns:
+            print_matches(final_df.drop_duplicates('Service Name')['S-ADR Match'].value_counts())
+
+        save_report(final_df, args, metrics, CapabilityTree.from_records(records), people)
+        if args.catalog:
+            update_catalog(args.catalog, records, metrics)
+
+    if args.metrics:
+        metrics.write_json(args.metrics)
+        print(f"Metrics saved to '{args.metrics}'")
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
+
+    if cache is not None:
+        cache.set_revision(revision)
+    if args.watch:
+        watch(rules, records, args, cache)
+    if cache is not None:
+        cache.close()
@@ -0,0 +1,209 @@
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .adr_records import MISSING_VALUE
+from .rollups import NOT_RATED, RISK_RATINGS
+
+LEVEL_COLUMNS = ['Cap-Map Level 0', 'Cap-Map Level 1', 'Cap-Map Level 2']
+
+
+def highest_rating(data_classification):
+    """
+    The highest risk rating among a record's (DC-name, rating) pairs, as
+    rollups.by_risk_rating ranks them, or NOT_RATED.
+    """
+    rank = {rating.lower(): number for number, rating in enumerate(RISK_RATINGS, start=1)}
+    best = max((rank.get(rating.strip().lower(), 0) for _, rating in data_classification), default=0)
+    return RISK_RATINGS[best - 1] if best else NOT_RATED
+
+
+@dataclass(slots=True)
+class CapabilityNode:
+    """
+    One capability in the tree, with the services mapped anywhere below it
+    (as ids into CapabilityTree.services) and how many of them have each
+    service status and highest risk rating, kept up to date as services are
+    added.
+    """
+    name: str
+    level: int
+    children: dict = field(default_factory=dict)
+    service_ids: set = field(default_factory=set)
+    statuses: Counter = field(default_factory=Counter)
+    risk_ratings: Counter = field(default_factory=Counter)
+
+    def to_json(self):
+        return {
+            'name': self.name,
+            'level': self.level,
+            'service_count': len(self.service_ids),
+            'statuses': dict(sorted(self.statuses.items())),
+            'risk_ratings': {rating: self.risk_ratings[rating]
+                             for rating in [NOT_RATED] + RISK_RATINGS if self.risk_ratings[rating]},
+            'services': sorted(self.service_ids),
+            'children': [child.to_json() for _, child in sorted(self.children.items())],
+        }
+
+
+class CapabilityTree:
+    """
+    Prefix tree over the Level 0 -> 1 -> 2 capability mappings of the
+    foundational (and deprecated) ADRs. Each node holds its subtree's
+    services and their counts by status and risk rating, so any subtree is
+    a walk of at most three dict lookups instead of a scan of the report.
+    Every ADR is a service of its own, keyed by its file path, with its
+    name only shown: two ADRs with the same title, or with none, are two
+    services with their own status and rating. A service mapped twice under
+    one capability counts once there.
+    """
+
+    def __init__(self):
+        self.root = CapabilityNode('', -1)
+        self.services = []  # (file path, service name, status, highest risk rating) by id
+        self.service_ids = {}  # file path -> id
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds the tree from a {file_path: (file_type, record)} dict; service
+        ADRs and failed files are skipped.
+        """
+        tree = cls()
+        for file_path, (file_type, record) in records.items():
+            if record is not None and file_type != 'service':
+                tree.add(file_path, record)
+        return tree
+
+    def add(self, file_path, record):
+        if not record.capabilities:
+            return
+        service_id = self.service_ids.get(file_path)
+        if service_id is None:
+            service_id = self.service_ids[file_path] = len(self.services)
+            self.services.append((file_path, record.service_name or MISSING_VALUE,
+                                  record.service_status or MISSING_VALUE, highest_rating(record.data_classification)))
+        _, _, status, rating = self.services[service_id]
+
+        for capability in record.capabilities:
+            node = self.root
+            path = [node]
+            for level, name in enumerate(capability):
+                name = name or MISSING_VALUE
+                child = node.children.get(name)
+                if child is None:
+                    child = node.children[name] = CapabilityNode(name, level)
+                node = child
+                path.append(node)
+            for node in path:
+                if service_id not in node.service_ids:
+                    node.service_ids.add(service_id)
+                    node.statuses[status] += 1
+                    node.risk_ratings[rating] += 1
+
+    def node(self, *path):
+        """
+        The node at a (level 0[, level 1[, level 2]]) path, or None; no
+        path gives the root, covering every mapped service.
+        """
+        node = self.root
+        for name in path:
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+    def services_under(self, *path):
+        """
+        Names of the services mapped anywhere under a capability path, once
+        per ADR.
+        """
+        node = self.node(*path)
+        return sorted(self.services[service_id][1] for service_id in node.service_ids) if node else []
+
+    def leaves(self):
+        """
+        ((level 0, level 1, level 2), node) for every deepest capability.
+        """
+        stack = [((), self.root)]
+        while stack:
+            path, node = stack.pop()
+            if not node.children and path:
+                yield path, node
+            for name, child in node.children.items():
+                stack.append((path + (name,), child))
+
+    def leaves_without(self, status):
+        """
+        Paths of the deepest capabilities none of whose services has the
+        given status (case-insensitive), e.g. 'Approved for Prod'.
+        """
+        status = status.lower()
+        return sorted(path for path, node in self.leaves()
+                      if not any(count for name, count in node.statuses.items() if name.lower() == status))
+
+    def to_json(self):
+        return {
+            'services': [{'path': file_path, 'name': name, 'status': status, 'risk_rating': rating}
+                         for file_path, name, status, rating in self.services],
+            'capabilities': self.root.to_json()['children'],
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Loads a tree saved with write_json, for lookups without the ADRs.
+        """
+        tree = cls()
+        tree.services = [(service['path'], service['name'], service['status'], service['risk_rating'])
+                         for service in data['services']]
+        tree.service_ids = {file_path: service_id for service_id, (file_path, _, _, _) in enumerate(tree.services)}
+
+        def load(parent, nodes):
+            for values in nodes:
+                node = CapabilityNode(values['name'], values['level'], service_ids=set(values['services']),
+                                      statuses=Counter(values['statuses']),
+                                      risk_ratings=Counter(values['risk_ratings']))
+                parent.children[node.name] = node
+                load(node, values['children'])
+
+        load(tree.root, data['capabilities'])
+        # The root covers every mapped service
+        for service_id, (_, _, status, rating) in enumerate(tree.services):
+            tree.root.service_ids.add(service_id)
+            tree.root.statuses[status] += 1
+            tree.root.risk_ratings[rating] += 1
+        return tree
+
+    @classmethod
+    def read_json(cls, path):
+        with open(path, encoding='utf-8') as file:
+            return cls.from_json(json.load(file))
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_json(), file, indent=1, ensure_ascii=False)
+
+    def to_frame(self):
+        """
+        The tree as a browsable sheet: one row per node in depth-first order,
+        with its name in its level's column (the levels above it left blank
+        after their own row), the service count and the counts per status
+        and risk rating.
+        """
+        statuses = sorted(self.root.statuses)
+        ratings = [rating for rating in [NOT_RATED] + RISK_RATINGS if self.root.risk_ratings[rating]]
+        rows = []
+        stack = [child for _, child in sorted(self.root.children.items(), reverse=True)]
+        while stack:
+            node = stack.pop()
+            row = dict.fromkeys(LEVEL_COLUMNS, '')
+            row[LEVEL_COLUMNS[node.level]] = node.name
+            row['Services'] = len(node.service_ids)
+            row.update((status, node.statuses[status]) for status in statuses)
+            row.update((rating, node.risk_ratings[rating]) for rating in ratings)
+            rows.append(row)
+            stack.extend(child for _, child in sorted(node.children.items(), reverse=True))
+        return pd.DataFrame(rows, columns=LEVEL_COLUMNS + ['Services'] + statuses + ratings)
@@ -0,0 +1,230 @@
+import argparse
+import importlib
+import os
+from datetime import datetime
+
+from .config import DEFAULT_FOLDERS, DEFAULT_PREFIXES, FILE_TYPES, folder_rules
+from .report_writers import WRITERS
+from .service_matching import DEFAULT_THRESHOLD
+
+# Nothing above imports pandas or dateutil: a command's module is only
+# imported once the command line is parsed, so lint, query and --help
+# don't pay for them
+COMMAND_MODULES = {
+    'build': 'build',
+    'query': 'adr_catalog',
+    'lint': 'adr_lint',
+    'diff': 'report_diff',
+    'person': 'people',  # query person reads the people index, not the catalog
+}
+
+
+def due_window_argument(spec):
+    from .due_index import due_window
+    try:
+        return due_window(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def day_argument(value):
+    try:
+        return datetime.strptime(value, '%d-%m-%Y').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a dd-mm-yyyy date, got '{value}'")
+
+
+def type_setting(value):
+    file_type, separator, setting = value.partition('=')
+    if not separator or file_type not in FILE_TYPES:
+        raise argparse.ArgumentTypeError(f"expected TYPE=VALUE with TYPE one of {', '.join(FILE_TYPES)}, "
+                                         f"got '{value}'")
+    return file_type, setting
+
+
+def add_folder_arguments(parser):
+    parser.add_argument('--root', nargs='+', default=['.'], metavar='DIR',
+                        help="folders holding the ADR folders (default: the current folder)")
+    parser.add_argument('--folder', action='append', type=type_setting, default=[], metavar='TYPE=PATH',
+                        help="folder of one type of ADR, relative to each root, e.g. service=sadr; defaults: "
+                             + ', '.join(f"{file_type}={folder}" for file_type, folder in DEFAULT_FOLDERS.items()))
+    parser.add_argument('--prefix', action='append', type=type_setting, default=[], metavar='TYPE=PREFIX',
+                        help="what the file names of one type of ADR start with, e.g. service=sadr-; defaults: "
+                             + ', '.join(f"{file_type}={prefix}" for file_type, prefix in DEFAULT_PREFIXES.items()))
+
+
+def add_build_arguments(parser):
+    add_folder_arguments(parser)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes used to parse ADR files (default: 1)")
+    parser.add_argument('--cache-dir', default='.adr-cache',
+                        help="where parsed ADRs are cached between runs (default: .adr-cache)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="parse every file even if it is unchanged since the last run")
+    parser.add_argument('--format', nargs='+', choices=sorted(WRITERS), default=['xlsx'],
+                        help="report formats to write, e.g. --format xlsx csv parquet (default: xlsx)")
+    parser.add_argument('--output', default='Governance_Data',
+                        help="report file name without extension (default: Governance_Data)")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="write stage timings, per-file latencies and error counts to this JSON file")
+    parser.add_argument('--prometheus', metavar='PATH',
+                        help="also write the metrics as a Prometheus textfile")
+    parser.add_argument('--slowest', type=int, default=10,
+                        help="number of slowest files listed in the metrics (default: 10)")
+    parser.add_argument('--no-rollups', action='store_true',
+                        help="leave out the summary sheets (by capability, status, due month, owner and risk rating)")
+    parser.add_argument('--due-window', nargs='+', type=due_window_argument, default=[], metavar='WINDOW',
+                        help="add a 0/1 column per re-certification window: overdue, next-30d, next-3m, "
+                             "2025-Q3, 2025-07 or dd-mm-yyyy:dd-mm-yyyy")
+    parser.add_argument('--match-threshold', type=float, default=DEFAULT_THRESHOLD, metavar='SCORE',
+                        help="lowest similarity (0-1) at which an S-ADR title is matched to an F-ADR service "
+                             f"it doesn't name exactly; above 1 only case and punctuation may differ "
+                             f"(default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--person-ids', action='store_true',
+                        help="give owners and authors on the F-ADR sheet as Person IDs from the people sheet "
+                             "(Owner IDs, Author IDs) instead of their names and emails")
+    parser.add_argument('--catalog', metavar='PATH',
+                        help="also keep a queryable SQLite catalog of the parsed ADRs here, updated in place "
+                             "(look things up with adr-report query)")
+    parser.add_argument('--since', metavar='REV',
+                        help="only re-parse ADRs git reports as changed since this commit; "
+                             "the rest come from the previous run's parse cache")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and update the report whenever an ADR changes: only the changed "
+                             "files are parsed again and their rows replaced, and the outputs are written in "
+                             "the background")
+    parser.add_argument('--debounce', type=float, default=0.5,
+                        help="seconds without changes before the report is rewritten in --watch mode (default: 0.5)")
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                        help="seconds between folder scans when inotify is unavailable (default: 1.0)")
+    parser.add_argument('--max-memory', type=int, metavar='MB',
+                        help="build the report in batches of ADRs taking about this much memory each (on top "
+                             "of what pandas itself needs), spilled to disk in between; for corpora too big "
+                             "to hold at once")
+    parser.add_argument('--spill-dir', metavar='DIR',
+                        help="where --max-memory keeps its batches (default: the system temporary folder)")
+
+
+def add_query_arguments(parser):
+    parser.add_argument('--catalog', default='adr-catalog.sqlite3',
+                        help="catalog file written by build --catalog (default: adr-catalog.sqlite3)")
+    queries = parser.add_subparsers(dest='query', required=True)
+
+    owner = queries.add_parser('owner', help="services owned by a person (name or email)")
+    owner.add_argument('owner')
+    owner.add_argument('--due-within', type=int, metavar='DAYS',
+                       help="only services due for re-certification in the next DAYS days")
+
+    capability = queries.add_parser('capability', help="services mapped to a capability, e.g. 'Data Services' Analytics")
+    capability.add_argument('levels', nargs='+', metavar='LEVEL', help="level 0, then optionally level 1 and level 2")
+
+    due = queries.add_parser('due', help="services due for re-certification")
+    due.add_argument('--within', type=int, default=90, metavar='DAYS', help="days ahead to look (default: 90)")
+    due.add_argument('--overdue', action='store_true', help="services past their due date instead")
+
+    rating = queries.add_parser('rating', help="services with a data classification rating, e.g. Confidential Red")
+    rating.add_argument('classification')
+    rating.add_argument('rating')
+
+    service = queries.add_parser('service', help="one service with its S-ADR status")
+    service.add_argument('name')
+
+    as_of = queries.add_parser('status-as-of', help="every service's Document Status log entry in effect on a date")
+    as_of.add_argument('date', type=day_argument, help="dd-mm-yyyy")
+
+    approvals = queries.add_parser('approvals', help="approvals per forum per month, from the status logs")
+    approvals.add_argument('--forum')
+    approvals.add_argument('--from', dest='first_month', metavar='YYYY-MM')
+    approvals.add_argument('--to', dest='last_month', metavar='YYYY-MM')
+
+    history = queries.add_parser('history', help="a service's Document Status log, oldest first")
+    history.add_argument('name')
+
+    person = queries.add_parser('person', help="a person's services by re-certification due date, from the people "
+                                               "index build writes (no catalog needed)")
+    person.add_argument('who', help="email, or name")
+    person.add_argument('--people', default='Governance_Data-people.json',
+                        help="people index written by build (default: Governance_Data-people.json)")
+    due_filter = person.add_mutually_exclusive_group()
+    due_filter.add_argument('--due-within', type=int, metavar='DAYS', help="only services due in the next DAYS days")
+    due_filter.add_argument('--overdue', action='store_true', help="only services past their due date")
+
+
+def add_lint_arguments(parser):
+    parser.add_argument('paths', nargs='*',
+                        help="ADR files, or folders of them (default: the folders given by --root, --folder "
+                             "and --prefix)")
+    add_folder_arguments(parser)
+    parser.add_argument('--type', choices=FILE_TYPES, dest='file_type',
+                        help="check every file as this type (default: from its folder, else its name's prefix)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="processes to lint with (default: one per CPU)")
+    parser.add_argument('--format', choices=['text', 'json'], default='text',
+                        help="text lines (path:line:column: severity [code] message) or one JSON document")
+    parser.add_argument('--strict', action='store_true', help="fail on warnings too")
+
+
+def add_diff_arguments(parser):
+    parser.add_argument('old', help="earlier run: .xlsx, .parquet or .csv report, or a parse cache")
+    parser.add_argument('new', help="later run, in any of the same forms")
+    parser.add_argument('--output', default='report-delta.json.gz',
+                        help="where to write the delta; gzipped if it ends in .gz (default: report-delta.json.gz)")
+    parser.add_argument('--ignore', nargs='+', default=[], metavar='COLUMN',
+                        help="columns to leave out of the comparison, e.g. 'Upcoming Recertification'")
+    parser.add_argument('--show', type=int, default=20,
+                        help="changed rows to print; the delta file has them all (default: 20)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='adr-report', description="Build, check and query the ADR governance report.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add_build_arguments(commands.add_parser('build', help="build the governance report",
+                                            description="Build the ADR governance report."))
+    add_query_arguments(commands.add_parser('query', help="look things up in the catalog written by build --catalog",
+                                            description="Look things up in the ADR catalog written by build --catalog."))
+    add_lint_arguments(commands.add_parser('lint', help="check ADRs against the templates the report reads",
+                                           description="Check ADRs against the templates the report reads, "
+                                                       "without building the report."))
+    add_diff_arguments(commands.add_parser('diff', help="show what changed between two report runs",
+                                           description="Show what changed between two governance report runs."))
+    return parser
+
+
+def check_args(parser, args):
+    """
+    Checks that need more than one option, and works out the folder rules.
+    """
+    if args.command in ('build', 'lint'):
+        args.folder_rules = folder_rules(args.root, dict(args.folder), dict(args.prefix))
+        if args.command == 'build' or not args.paths:
+            missing = [rule.path for rule in args.folder_rules if not os.path.isdir(rule.path)]
+            if missing:
+                parser.error(f"no ADR folder at {', '.join(missing)}; point --root or --folder at them")
+
+    if args.command == 'build':
+        if args.max_memory is not None:
+            if args.max_memory <= 0:
+                parser.error("--max-memory must be a positive number of MB")
+            if args.watch or args.catalog:
+                parser.error("--max-memory doesn't keep the parsed ADRs around, so it can't be combined "
+                             "with --watch or --catalog")
+        if args.since and args.no_cache:
+            parser.error("--since reuses the previous run's parses and can't be combined with --no-cache")
+
+    if args.command == 'query' and args.query == 'person':
+        if not os.path.exists(args.people):
+            parser.error(f"no people index at '{args.people}'; adr-report build writes one next to the report")
+    elif args.command == 'query':
+        if not os.path.exists(args.catalog):
+            parser.error(f"no catalog at '{args.catalog}'; build one with adr-report build --catalog")
+        if args.query == 'capability' and len(args.levels) > 3:
+            parser.error("capability takes at most three levels")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    check_args(parser, args)
+    command = 'person' if args.command == 'query' and args.query == 'person' else args.command
+    module = importlib.import_module(f".{COMMAND_MODULES[command]}", __package__)
+    module.run(args)
@@ -0,0 +1,70 @@
+import os
+from dataclasses import dataclass
+
+# Kinds of ADR, in the order the report has always read their folders
+FILE_TYPES = ('foundational', 'deprecated', 'service')
+
+# Folder of each kind of ADR under a root
+DEFAULT_FOLDERS = {
+    'foundational': 'foundation-adr',
+    'deprecated': 'deprecated-adrs',
+    'service': 'service-adr',
+}
+
+# What the file names of each kind of ADR start with; every markdown file
+# in the folder counts when empty
+DEFAULT_PREFIXES = {
+    'foundational': '',
+    'deprecated': 'do-not-use-adr',
+    'service': 's-adr-',
+}
+
+# Markdown files that sit in the ADR folders without being ADRs
+SKIPPED_FILES = ('readme.md', 'foundational-adr-structure.md')
+
+
+@dataclass(frozen=True)
+class FolderRule:
+    """
+    One folder of ADRs: where it is, the file type of its ADRs and the
+    prefix their file names start with.
+    """
+    path: str
+    file_type: str
+    prefix: str = ''
+
+    def accepts(self, file_name):
+        return (file_name.endswith('.md') and file_name.startswith(self.prefix)
+                and file_name.lower() not in SKIPPED_FILES)
+
+
+def folder_rules(roots=('.',), folders=None, prefixes=None):
+    """
+    The folder rules for ADR trees under each root, with the default folder
+    names and prefixes overridden by folders and prefixes ({file_type:
+    value}). An absolute folder is used as it is, whatever the root.
+    """
+    folders = {**DEFAULT_FOLDERS, **(folders or {})}
+    prefixes = {**DEFAULT_PREFIXES, **(prefixes or {})}
+    rules = []
+    for root in roots:
+        for file_type in FILE_TYPES:
+            path = os.path.join(root, folders[file_type])
+            if path not in (rule.path for rule in rules):
+                rules.append(FolderRule(path, file_type, prefixes[file_type]))
+    return rules
+
+
+def rule_for(file_path, rules):
+    """
+    The rule a file falls under: the one for its folder if there is one,
+    else the one with the longest prefix its name starts with, and the
+    first rule (foundational ADRs) when none fits.
+    """
+    folder = os.path.abspath(os.path.dirname(file_path))
+    for rule in rules:
+        if os.path.abspath(rule.path) == folder:
+            return rule
+    name = os.path.basename(file_path)
+    matching = [rule for rule in rules if name.startswith(rule.prefix)]
+    return max(matching, key=lambda rule: len(rule.prefix)) if matching else rules[0]
@@ -0,0 +1,112 @@
+import re
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from .recert_dates import DATE_FORMAT, DUMMY_DATE
+
+
+class DueDateIndex:
+    """
+    Report rows sorted by re-certification due date, built once per run so
+    any due-date window is two binary searches. Rows showing the dummy date
+    01-01-2000 have no usable date and are left out.
+    """
+
+    def __init__(self, due_dates):
+        """
+        due_dates: the report's 'Re-certify Due Date' column (dd-mm-yyyy).
+        """
+        due_dates = pd.Series(due_dates, dtype=object)
+        # Reports repeat a small set of dates, so each is parsed once
+        codes, distinct = pd.factorize(due_dates)
+        parsed = pd.to_datetime(pd.Series(distinct, dtype=object), format=DATE_FORMAT, errors='coerce')
+        parsed[parsed == DUMMY_DATE] = pd.NaT
+        # A code of -1 (empty cell) picks the NaT appended at the end
+        days = np.append(parsed.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))[codes]
+
+        self.size = len(days)
+        dated = np.flatnonzero(~np.isnat(days))
+        order = np.argsort(days[dated], kind='stable')
+        self.rows = dated[order]
+        self.days = days[self.rows]
+
+    def rows_between(self, first=None, last=None):
+        """
+        Positions of the rows due from first to last (dates, both included;
+        None leaves that end open), in due date order.
+        """
+        start = 0 if first is None else np.searchsorted(self.days, pd.Timestamp(first).to_datetime64(), 'left')
+        end = len(self.days) if last is None else np.searchsorted(self.days, pd.Timestamp(last).to_datetime64(), 'right')
+        return self.rows[start:end]
+
+    def overdue(self, today=None):
+        """
+        Positions of the rows whose due date has passed.
+        """
+        today = today or date.today()
+        return self.rows_between(last=today - timedelta(days=1))
+
+    def flags(self, first=None, last=None):
+        """
+        1 for every row due in the window and 0 for the rest, in row order.
+        """
+        flags = np.zeros(self.size, dtype=int)
+        flags[self.rows_between(first, last)] = 1
+        return flags
+
+
+def due_window(spec, today=None):
+    """
+    Turns a window spec into (column name, first day, last day), with None
+    for an open end:
+
+    overdue                  due before today
+    next-30d, next-3m        from today to 30 days / 3 months ahead
+    2025-Q3, 2025-07         a calendar quarter or month
+    01-07-2025:15-08-2025    an explicit range, both days included
+    """
+    today = today or date.today()
+    if spec == 'overdue':
+        return 'Overdue Recertification', None, today - timedelta(days=1)
+
+    match = re.fullmatch(r'next-(\d+)([dm])', spec)
+    if match:
+        count = int(match.group(1))
+        if match.group(2) == 'd':
+            return f"Due in next {count} days", today, today + timedelta(days=count)
+        return f"Due in next {count} months", today, today + relativedelta(months=count)
+
+    match = re.fullmatch(r'(\d{4})-Q([1-4])', spec)
+    if match:
+        first = date(int(match.group(1)), 3 * int(match.group(2)) - 2, 1)
+        return f"Due in {spec}", first, first + relativedelta(months=3) - timedelta(days=1)
+
+    match = re.fullmatch(r'(\d{4})-(\d{2})', spec)
+    if match and 1 <= int(match.group(2)) <= 12:
+        first = date(int(match.group(1)), int(match.group(2)), 1)
+        return f"Due in {spec}", first, first + relativedelta(months=1) - timedelta(days=1)
+
+    match = re.fullmatch(r'(\d{2}-\d{2}-\d{4}):(\d{2}-\d{2}-\d{4})', spec)
+    if match:
+        first, last = (datetime.strptime(day, DATE_FORMAT).date() for day in match.groups())
+        return f"Due {match.group(1)} to {match.group(2)}", first, last
+
+    raise ValueError(f"unknown due window '{spec}'; use overdue, next-30d, next-3m, 2025-Q3, 2025-07 "
+                     "or dd-mm-yyyy:dd-mm-yyyy")
+
+
+def add_due_windows(df, windows):
+    """
+    Adds a 0/1 column to the report for each (column name, first day, last
+    day) window, all answered from one DueDateIndex. Returns the number of
+    rows in each window.
+    """
+    index = DueDateIndex(df['Re-certify Due Date'])
+    counts = {}
+    for name, first, last in windows:
+        df[name] = index.flags(first, last)
+        counts[name] = int(df[name].sum())
+    return counts
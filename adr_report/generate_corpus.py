@@ -0,0 +1,169 @@
+import argparse
+import os
+import random
+
+from .config import DEFAULT_FOLDERS
+
+# Folder names the report looks for under a root
+FOUNDATION_FOLDER = DEFAULT_FOLDERS['foundational']
+DEPRECATED_FOLDER = DEFAULT_FOLDERS['deprecated']
+SERVICE_FOLDER = DEFAULT_FOLDERS['service']
+
+CAPABILITIES = [
+    ('Data Services', 'Analytics', 'Data Analytics'),
+    ('Data Services', 'Storage', 'Object Storage'),
+    ('Data Services', 'Databases', 'Relational Databases'),
+    ('Infrastructure', 'Compute', 'Virtual Machines'),
+    ('Infrastructure', 'Networking', 'Load Balancing'),
+    ('Security', 'Identity', 'Access Management'),
+    ('Security', 'Keys', 'Key Management'),
+    ('Integration', 'Messaging', 'Event Streaming'),
+]
+CLASSIFICATIONS = ['Public', 'Internal', 'Confidential', 'Strictly Confidential']
+RISK_RATINGS = ['Green', 'Amber', 'Red']
+DOCUMENT_STATUSES = ['Approved', 'Deferred', 'Draft', 'Rejected']
+SERVICE_STATUSES = ['Approved for Prod', 'Approved for Non-Prod', 'Not Approved', 'Retired']
+FORUMS = ['CRM', 'ARB', 'TDA']
+PEOPLE = ['Robin Fernadas', 'Mathew Hike', 'Nicholas R', 'Jane Doe', 'Priya Shah',
+          'Kenji Sato', 'Amara Obi', 'Lucas Moreau', 'Sofia Rossi', 'Omar Haddad']
+
+# Sections a messy foundational ADR may leave out
+OPTIONAL_SECTIONS = ['owner', 'authors', 'status', 'capabilities', 'classification', 'service_status']
+
+
+def email(name):
+    return name.lower().replace(' ', '.') + '@example.com'
+
+
+def random_date(rng, messy):
+    if messy and rng.random() < 0.3:
+        return rng.choice(['TBD', 'dd-mm-yyyy', '31-02-2024', '2024-05-01'])
+    return f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(2020, 2026)}"
+
+
+def comment(rng):
+    return rng.choice([
+        '[comment]: <> (Fill in this section before review)\n',
+        '<!-- Guidance: keep this table up to date -->\n',
+        '<!--\nMulti-line template guidance\nthat spans several lines\n-->\n',
+    ])
+
+
+def foundational_adr(rng, title, messy):
+    """
+    Text of a foundational ADR in the template layout parse_markdown reads.
+    Messy ADRs drop sections, use placeholder dates and carry comments.
+    """
+    missing = set(rng.sample(OPTIONAL_SECTIONS, rng.randint(1, 2))) if messy else set()
+    note = (lambda: comment(rng) if rng.random() < 0.5 else '') if messy else (lambda: '')
+    owners = rng.sample(PEOPLE, rng.randint(1, 2))
+    authors = rng.sample(PEOPLE, rng.randint(1, 4))
+    capabilities = rng.sample(CAPABILITIES, rng.randint(1, 3) if messy else 1)
+    approval_date = random_date(rng, messy)
+
+    parts = [f"---\ntitle: {title}\n---\n\n", note(),
+             "## Document ID\n\n- The necessary document ID reference will be provided by the team.\n\n"]
+    if 'owner' not in missing:
+        parts.append("## Document Owner\n\n" + ''.join(f"- {name} <{email(name)}>\n" for name in owners) + "\n")
+    if 'authors' not in missing:
+        parts.append("## Author/Contributors\n\n" + note() + ''.join(f"- {name} <{email(name)}>\n" for name in authors) + "\n")
+    if 'status' not in missing:
+        parts.append(
+            "## Document Status\n\n"
+            "| Document Status | Forum | Date |\n|:--|:--|:--|\n"
+            f"| {rng.choice(DOCUMENT_STATUSES)} | {rng.choice(FORUMS)} | {approval_date} |\n\n"
+            "### Document Status log\n\n"
+            "|Document Status History| Forum |Approval Date| Change Summary|\n|:--|:--|:--|:--|\n"
+            f"|Approved|{rng.choice(FORUMS)}|{approval_date}| Re-certified |\n"
+            f"|Deferred|{rng.choice(FORUMS)}|{random_date(rng, False)}| First Approval|\n\n"
+        )
+    parts.append("## Component Services\n\n- Backup API\n- Logging API\n\n")
+    if 'service_status' not in missing:
+        parts.append(f"## Service Status\n\n| Service Status |\n|---|\n| {rng.choice(SERVICE_STATUSES)} |\n\n")
+    parts.append("## Summary\n\n- Summary of the service\n- Features of the service\n\n")
+    if 'capabilities' not in missing:
+        parts.append(
+            "## 1. Capability Mapping Hierarchy\n\n" + note() +
+            "|Grouping (Level 0)| Capability Type (Level 1)| Sub Capability (Level 2)|\n|:--|:--|:--|\n" +
+            ''.join(f"|{level0}| {level1} | {level2} |\n" for level0, level1, level2 in capabilities) + "\n"
+        )
+    parts.append("## 2. Component Context\n\n- Some text and wordings\n\n"
+                 "### 2.1 Execution Venue(s)\n\n-[] On-Prem\n-[] Google Cloud\n\n")
+    if 'classification' not in missing:
+        parts.append(
+            "### 2.2 Data Classification\n\n"
+            "| Data Classification | Risk Rating |\n|:-|:-|\n" +
+            ''.join(f"|{name}| {rng.choice(RISK_RATINGS)}|\n" for name in CLASSIFICATIONS) + "\n"
+        )
+    parts.append("### 2.3 Data Residency\n\nRestricted: Japan\n\n"
+                 "## 3. Scope\n\n### 3.1 In Scope\n\n- Something in scope\n\n"
+                 "## 4. Key Functional Capabilities\n\n" + "- Some points about the service.\n" * rng.randint(3, 30))
+    return ''.join(parts)
+
+
+def service_adr(rng, title, messy):
+    """
+    Text of a service ADR: front matter title and the four-column Document
+    Status table, followed by a design document body.
+    """
+    status_table = (
+        "## Document Status\n\n"
+        "| Document Status | Service Status | Forum | Approval Date |\n|:--|:--|:--|:--|\n"
+        f"| {rng.choice(DOCUMENT_STATUSES)} | {rng.choice(SERVICE_STATUSES)} | {rng.choice(FORUMS)} | {random_date(rng, messy)} |\n\n"
+    )
+    if messy and rng.random() < 0.2:
+        status_table = ''
+    body = ''.join(f"## {number}. Design Section\n\n" + "Design detail for the service. " * rng.randint(10, 80) + "\n\n"
+                   for number in range(1, rng.randint(3, 12)))
+    return f"---\ntitle: {title}\n---\n\n" + (comment(rng) if messy else '') + status_table + body
+
+
+def generate(output_dir, files, seed=0, messy_ratio=0.2):
+    """
+    Writes a corpus of roughly the given number of files: 60% foundational,
+    10% deprecated and 30% service ADRs. Most service ADRs share a title
+    with a foundational one; the rest have no F-ADR.
+    """
+    rng = random.Random(seed)
+    foundation_count = max(1, files * 6 // 10)
+    deprecated_count = files // 10
+    service_count = max(0, files - foundation_count - deprecated_count)
+
+    for folder in (FOUNDATION_FOLDER, DEPRECATED_FOLDER, SERVICE_FOLDER):
+        os.makedirs(os.path.join(output_dir, folder), exist_ok=True)
+
+    def write(folder, file_name, text):
+        with open(os.path.join(output_dir, folder, file_name), 'w', encoding='utf-8') as file:
+            file.write(text)
+
+    for number in range(foundation_count):
+        write(FOUNDATION_FOLDER, f"f-adr-{number:06d}.md",
+              foundational_adr(rng, f"Service {number:06d}", rng.random() < messy_ratio))
+    for number in range(deprecated_count):
+        write(DEPRECATED_FOLDER, f"do-not-use-adr-{number:06d}.md",
+              foundational_adr(rng, f"Retired Service {number:06d}", rng.random() < messy_ratio))
+    for number in range(service_count):
+        if rng.random() < 0.9:
+            title = f"Service {rng.randrange(foundation_count):06d}"
+        else:
+            title = f"Standalone Service {number:06d}"
+        write(SERVICE_FOLDER, f"s-adr-{number:06d}.md", service_adr(rng, title, rng.random() < messy_ratio))
+
+    return [os.path.join(output_dir, folder) for folder in (FOUNDATION_FOLDER, DEPRECATED_FOLDER, SERVICE_FOLDER)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic ADR corpus for benchmarking.")
+    parser.add_argument('output_dir', help="directory to create the ADR folders in")
+    parser.add_argument('--files', type=int, default=1000, help="total number of ADR files (default: 1000)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument('--messy', type=float, default=0.2,
+                        help="share of ADRs with comments, missing sections and placeholder dates (default: 0.2)")
+    args = parser.parse_args()
+
+    folders = generate(args.output_dir, args.files, seed=args.seed, messy_ratio=args.messy)
+    print(f"Wrote {args.files} ADRs to {', '.join(folders)}")
+
+
+if __name__ == "__main__":
+    main()
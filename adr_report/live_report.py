@@ -0,0 +1,229 @@
+import threading
+import time
+from datetime import date
+from itertools import chain
+
+import pandas as pd
+
+from .build import build_f_adr_frame, join_report, process_f_adr, save_report, update_catalog, use_person_ids
+from .capability_tree import CapabilityTree
+from .people import PeopleIndex
+from .service_matching import DEFAULT_THRESHOLD, LiveMatcher
+
+# The columns build_f_adr_frame works out from the approval date
+DATE_COLUMNS = ['Re-certify Due Date', 'Re-certify Due Month', 'Upcoming Recertification']
+
+
+class LiveReport:
+    """
+    The report table of an `adr-report build --watch` run, kept between
+    updates. The F-ADR rows are kept with their dates worked out, each
+    file's rows in one span, so an update only shapes the rows of the files
+    that changed and splices them in where the old ones were. S-ADR titles
+    are paired through a LiveMatcher, which only scores again the titles a
+    changed service name could pair with. The S-ADR join, the No f-adr
+    rows, the due windows and (with person_ids) the Person IDs are then
+    added to a copy of the rows, giving the table build_report would.
+    """
+
+    def __init__(self, due_windows=(), match_threshold=DEFAULT_THRESHOLD, person_ids=False):
+        self.due_windows = due_windows
+        self.match_threshold = match_threshold
+        self.person_ids = person_ids
+        self.reset()
+
+    def reset(self):
+        # Upcoming Recertification is relative to the day the rows were made
+        self.today = date.today()
+        self.frame = pd.DataFrame()  # F-ADR rows and their dates, nothing joined
+        self.spans = {}  # F-ADR file path -> (first row, row after its last), in discovery order
+        self.columns = {}  # F-ADR file path -> the columns of its rows
+        self.service_names = {}  # F-ADR file path -> its Service Name
+        self.sadr_rows = {}  # S-ADR file path -> ServiceRecord.to_row
+        self.matcher = LiveMatcher(self.match_threshold)
+        self.people = None
+
+    def update(self, records, changed=None):
+        """
+        Brings the table up to date with records ({file_path: (file_type,
+        record)} in discovery order, None for failed files) after the files
+        in changed were parsed again, added or removed; None (or a new day)
+        builds it from scratch. Returns the table, (file_path, message) for
+        every approval date of a changed file (of every file when built from
+        scratch) that could not be used, and whether any F-ADR changed.
+        """
+        if changed is None or date.today() != self.today:
+            self.reset()
+            changed = records.keys()
+
+        f_adrs = {}
+        sadr_paths = []
+        for file_path, (file_type, record) in records.items():
+            if record is None:
+                continue
+            if file_type == 'service':
+                sadr_paths.append(file_path)
+            else:
+                f_adrs[file_path] = record
+        for file_path in changed:
+            self.sadr_rows.pop(file_path, None)
+        sadr_data = {}
+        for file_path in sadr_paths:
+            row = self.sadr_rows.get(file_path)
+            if row is None:
+                row = self.sadr_rows[file_path] = records[file_path][1].to_row()
+            sadr_data[row['S-ADR Service Name']] = row
+
+        # Shape the rows of the changed F-ADRs together, as f_adr_table does
+        gone = [file_path for file_path in self.spans if file_path not in f_adrs or file_path in changed]
+        changed_names = [self.service_names.pop(file_path) for file_path in gone]
+        for file_path in gone:
+            del self.spans[file_path], self.columns[file_path]
+        rows = []
+        fresh_spans = {}
+        for file_path, record in f_adrs.items():
+            if file_path in self.spans:
+                continue
+            file_rows = process_f_adr(record)
+            fresh_spans[file_path] = (len(rows), len(rows) + len(file_rows))
+            rows.extend(file_rows)
+            self.columns[file_path] = tuple(file_rows[0])
+            self.service_names[file_path] = file_rows[0]['Service Name']
+            changed_names.append(file_rows[0]['Service Name'])
+
+        date_errors = []
+        file_paths = list(f_adrs)
+        if gone or fresh_spans or file_paths != list(self.spans):
+            fresh = None
+            if rows:
+                fresh, errors = build_f_adr_frame(rows)
+                date_errors = [(file_path, errors.iat[start]) for file_path, (start, _) in fresh_spans.items()
+                               if isinstance(errors.iat[start], str)]
+            if not self.splice(file_paths, fresh, fresh_spans):
+                # The folder listing put unchanged files in a new order,
+                # which the matcher's ties depend on
+                table, date_errors, _ = self.update(records)
+                return table, [error for error in date_errors if error[0] in changed], True
+
+        if self.person_ids and (gone or fresh_spans or self.people is None):
+            self.people = PeopleIndex.from_records(records)
+        table = self.frame.copy()
+        if self.person_ids and self.spans:
+            use_person_ids(table, self.people, list(self.spans), [start for start, _ in self.spans.values()])
+        matches = None
+        if sadr_data:
+            service_names = [self.service_names[file_path] for file_path in self.spans]
+            matches = self.matcher.match_all(service_names, changed_names, sadr_data)
+        table, _ = join_report(table, sadr_data, due_windows=self.due_windows,
+                               match_threshold=self.match_threshold, person_ids=self.person_ids, matches=matches)
+        return table, date_errors, bool(gone or fresh_spans)
+
+    def splice(self, file_paths, fresh, fresh_spans):
+        """
+        Rebuilds the F-ADR rows for file_paths (every F-ADR, in order) from
+        the kept spans of the old rows and the fresh_spans of fresh. Returns
+        False, changing nothing, if the kept files are no longer in order.
+        """
+        # Columns in the order a full build first sees them, the dates
+        # after the first file's own
+        columns = list(dict.fromkeys(chain.from_iterable(dict.fromkeys(self.columns[file_path]
+                                                                        for file_path in file_paths))))
+        if columns:
+            position = len(self.columns[file_paths[0]])
+            columns[position:position] = DATE_COLUMNS
+        old = self.frame if list(self.frame.columns) == columns else self.frame.reindex(columns=columns)
+        if fresh is not None:
+            fresh = fresh.reindex(columns=columns)
+
+        # Runs of rows taken from one frame as [frame, start, stop]
+        pieces = []
+        spans = {}
+        row_count = 0
+        kept_stop = 0
+        for file_path in file_paths:
+            if file_path in fresh_spans:
+                source, (start, stop) = fresh, fresh_spans[file_path]
+            else:
+                source, (start, stop) = old, self.spans[file_path]
+                if start < kept_stop:
+                    return False
+                kept_stop = stop
+            if pieces and pieces[-1][0] is source and pieces[-1][2] == start:
+                pieces[-1][2] = stop
+            else:
+                pieces.append([source, start, stop])
+            spans[file_path] = (row_count, row_count + stop - start)
+            row_count += stop - start
+
+        if pieces:
+            self.frame = pd.concat([source.iloc[start:stop] for source, start, stop in pieces], ignore_index=True)
+        else:
+            self.frame = pd.DataFrame()
+        self.spans = spans
+        return True
+
+
+class ReportWriter:
+    """
+    Writes the reports of a --watch run from a background thread, so edits
+    go on being picked up while the last report is written. Only the
+    newest report waiting is written: updates made during a slow write
+    (the workbook of a large corpus) are written once, together.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.condition = threading.Condition()
+        self.pending = None
+        self.closing = False
+        self.capability_tree = None
+        self.people = None
+        self.thread = threading.Thread(target=self.run, name='report-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, table, records, people=None, f_adrs_changed=True):
+        """
+        Queues table to be written in place of any report still waiting.
+        records ({file_path: (file_type, record)}, copied) is what it was
+        built from, for the capability tree, the people index (unless given)
+        and the catalog; the indexes are only rebuilt if an F-ADR changed.
+        """
+        with self.condition:
+            if self.pending is not None:
+                f_adrs_changed = f_adrs_changed or self.pending[3]
+            self.pending = (table, dict(records), people, f_adrs_changed)
+            self.condition.notify()
+
+    def close(self):
+        """
+        Writes the report still waiting, if any, and stops the thread.
+        """
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.thread.join()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closing:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                table, records, people, f_adrs_changed = self.pending
+                self.pending = None
+            try:
+                self.write(table, records, people, f_adrs_changed)
+            except Exception as e:
+                # Keep watching; e.g. the workbook may be open in Excel
+                print(f"Error while writing the report: {e}")
+
+    def write(self, table, records, people, f_adrs_changed):
+        start = time.perf_counter()
+        if f_adrs_changed or self.capability_tree is None:
+            self.capability_tree = CapabilityTree.from_records(records)
+            self.people = people or PeopleIndex.from_records(records)
+        save_report(table, self.args, capability_tree=self.capability_tree, people=self.people)
+        if self.args.catalog:
+            update_catalog(self.args.catalog, records)
+        print(f"Report written in {(time.perf_counter() - start) * 1000:.0f} ms")
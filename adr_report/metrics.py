@@ -0,0 +1,149 @@
+import bisect
+import contextlib
+import json
+import os
+import time
+from collections import Counter
+
+# Upper bounds (seconds) of the per-file latency histogram buckets
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+
+
+class Metrics:
+    """
+    Collects stage timings, per-file latencies and error counts for one
+    report run, and writes them out as JSON or a Prometheus textfile.
+    """
+    enabled = True
+
+    def __init__(self, slowest=10):
+        self.slowest = slowest
+        self.stages = {}
+        self.errors = Counter()
+        self.files = Counter()
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.latencies = []  # (seconds, file path, bytes, bytes read)
+        self.bytes = Counter()  # by file type: size on disk, and read to parse
+        self.bytes_read = Counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def record_file(self, file_path, file_type, seconds, size, bytes_read=0, cached=False):
+        self.files[(file_type, 'cached' if cached else 'parsed')] += 1
+        self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+        self.latencies.append((seconds, file_path, size, bytes_read))
+        if not cached:
+            self.bytes[file_type] += size or 0
+            self.bytes_read[file_type] += bytes_read
+
+    def count_error(self, stage, count=1):
+        self.errors[stage] += count
+
+    def percentile(self, fraction):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(seconds for seconds, *_ in self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self):
+        slowest = sorted(self.latencies, key=lambda latency: latency[0], reverse=True)[:self.slowest]
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(LATENCY_BUCKETS + ['+Inf'], self.latency_counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            'stages': self.stages,
+            'total_seconds': sum(self.stages.values()),
+            'files': {f"{file_type}/{source}": count for (file_type, source), count in sorted(self.files.items())},
+            'errors': dict(self.errors),
+            # Of the files parsed (not cached): their size, and how much of
+            # it the parser had to read
+            'bytes': {file_type: {'size': self.bytes[file_type], 'read': self.bytes_read[file_type]}
+                      for file_type in sorted(self.bytes)},
+            'file_latency': {
+                'count': len(self.latencies),
+                'sum': self.latency_sum,
+                'p50': self.percentile(0.5),
+                'p90': self.percentile(0.9),
+                'p99': self.percentile(0.99),
+                'buckets': buckets,
+                'slowest': [{'file': file_path, 'seconds': seconds, 'bytes': size, 'bytes_read': bytes_read}
+                            for seconds, file_path, size, bytes_read in slowest],
+            },
+        }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def write_prometheus(self, path):
+        """
+        Writes the metrics in the node_exporter textfile format. The file is
+        replaced in one step so the collector never reads half of it.
+        """
+        lines = [
+            '# HELP adr_report_stage_seconds Wall-clock time spent in each report stage.',
+            '# TYPE adr_report_stage_seconds gauge',
+        ]
+        lines += [f'adr_report_stage_seconds{{stage="{name}"}} {seconds:.6f}' for name, seconds in self.stages.items()]
+        lines += [
+            '# HELP adr_report_files Files processed, by type and whether the parse came from the cache.',
+            '# TYPE adr_report_files gauge',
+        ]
+        lines += [f'adr_report_files{{file_type="{file_type}",source="{source}"}} {count}'
+                  for (file_type, source), count in sorted(self.files.items())]
+        lines += [
+            '# HELP adr_report_errors Errors seen in the last run, by stage.',
+            '# TYPE adr_report_errors gauge',
+        ]
+        lines += [f'adr_report_errors{{stage="{name}"}} {count}' for name, count in sorted(self.errors.items())]
+        lines += [
+            '# HELP adr_report_parsed_bytes Size of the files parsed in the last run, by type.',
+            '# TYPE adr_report_parsed_bytes gauge',
+        ]
+        lines += [f'adr_report_parsed_bytes{{file_type="{file_type}"}} {size}' for file_type, size in sorted(self.bytes.items())]
+        lines += [
+            '# HELP adr_report_read_bytes Bytes actually read to parse those files, by type.',
+            '# TYPE adr_report_read_bytes gauge',
+        ]
+        lines += [f'adr_report_read_bytes{{file_type="{file_type}"}} {self.bytes_read[file_type]}' for file_type in sorted(self.bytes)]
+        lines += [
+            '# HELP adr_report_file_seconds Time to parse and shape one ADR file.',
+            '# TYPE adr_report_file_seconds histogram',
+        ]
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ['+Inf'], self.latency_counts):
+            cumulative += count
+            lines.append(f'adr_report_file_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'adr_report_file_seconds_sum {self.latency_sum:.6f}')
+        lines.append(f'adr_report_file_seconds_count {len(self.latencies)}')
+
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, path)
+
+
+class NullMetrics:
+    """
+    Stand-in used when metrics are off, so instrumented code costs nothing.
+    """
+    enabled = False
+
+    def stage(self, name):
+        return contextlib.nullcontext()
+
+    def record_file(self, file_path, file_type, seconds, size, bytes_read=0, cached=False):
+        pass
+
+    def count_error(self, stage, count=1):
+        pass
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from .adr_records import RECORD_TYPES
+
+# Bump whenever parse_markdown starts extracting something different, so
+# records parsed under the old rules are thrown away instead of reused.
+CACHE_SCHEMA_VERSION = 3
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ParseCache:
+    """
+    On-disk store of parse_markdown records, keyed by file path and type.
+    A file whose mtime and size are unchanged is a hit without being read;
+    otherwise its content hash decides, so a touched but unedited file is
+    still a hit. A file with no row (or no hash) is a miss without being
+    read at all: the parse that follows hashes the bytes it reads anyway
+    (see build.read_sections) and hands the hash to store.
+    """
+
+    def __init__(self, cache_dir='.adr-cache'):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(cache_dir, 'parse-cache.sqlite3'))
+        self.hits = 0
+        self.misses = 0
+        self.pending = {}  # (path, file_type) -> (mtime, size, hash) of misses hashed by lookup
+
+        self.connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or row[0] != str(CACHE_SCHEMA_VERSION):
+            # Extraction rules changed (or new cache): start from scratch
+            self.connection.execute('DROP TABLE IF EXISTS parsed')
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(CACHE_SCHEMA_VERSION),))
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS parsed ('
+            'path TEXT, file_type TEXT, mtime INTEGER, size INTEGER, hash TEXT, data TEXT, '
+            'PRIMARY KEY (path, file_type))'
+        )
+        self.connection.commit()
+
+    @property
+    def revision(self):
+        """
+        The git commit every cached tracked file was parsed at, as recorded
+        by the last run, or None if unknown.
+        """
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return row[0] if row else None
+
+    def set_revision(self, revision):
+        """
+        Records the commit the cached files match, or forgets it (None) when
+        they may not match any commit.
+        """
+        if revision is None:
+            self.connection.execute("DELETE FROM meta WHERE key = 'revision'")
+        else:
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('revision', ?)", (revision,))
+
+    def lookup(self, file_path, file_type):
+        """
+        Returns the cached record for a file, or None if it has to be parsed
+        again.
+        """
+        key = (os.path.abspath(file_path), file_type)
+        stat = os.stat(file_path)
+        row = self.connection.execute(
+            'SELECT mtime, size, hash, data FROM parsed WHERE path = ? AND file_type = ?', key
+        ).fetchone()
+        if row is None or (row[2] is None and (row[0], row[1]) != (stat.st_mtime_ns, stat.st_size)):
+            # Nothing to compare the content with
+            self.misses += 1
+            return None
+        if row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            self.hits += 1
+            return RECORD_TYPES[file_type].from_json(json.loads(row[3]))
+
+        with open(file_path, 'rb') as file:
+            digest = content_hash(file.read())
+        if row[2] == digest:
+            # Same content under a new mtime; remember the new stat
+            self.connection.execute(
+                'UPDATE parsed SET mtime = ?, size = ? WHERE path = ? AND file_type = ?',
+                (stat.st_mtime_ns, stat.st_size) + key
+            )
+            self.hits += 1
+            return RECORD_TYPES[file_type].from_json(json.loads(row[3]))
+
+        self.misses += 1
+        self.pending[key] = (stat.st_mtime_ns, stat.st_size, digest)
+        return None
+
+    def load(self, file_path, file_type):
+        """
+        Returns the stored record for a file without checking it against
+        the file on disk, or None if there is none. For callers that already
+        know the file is unchanged since the cache's revision.
+        """
+        row = self.connection.execute(
+            'SELECT data FROM parsed WHERE path = ? AND file_type = ?', (os.path.abspath(file_path), file_type)
+        ).fetchone()
+        if row is None:
+            return None
+        self.hits += 1
+        return RECORD_TYPES[file_type].from_json(json.loads(row[0]))
+
+    def forget(self, file_path):
+        """
+        Drops whatever is stored for a file that no longer exists.
+        """
+        self.connection.execute('DELETE FROM parsed WHERE path = ?', (os.path.abspath(file_path),))
+
+    def retain(self, file_paths):
+        """
+        Drops whatever is stored for files not among file_paths, so the cache
+        holds exactly the last run's files.
+        """
+        keep = {os.path.abspath(file_path) for file_path in file_paths}
+        stale = [(path,) for (path,) in self.connection.execute('SELECT DISTINCT path FROM parsed') if path not in keep]
+        self.connection.executemany('DELETE FROM parsed WHERE path = ?', stale)
+
+    def store(self, file_path, file_type, record, fingerprint=None):
+        """
+        Saves a freshly parsed file under the (mtime, size, hash) fingerprint
+        of the bytes it was parsed from, or the stat and hash lookup saw if
+        there is none. A fingerprint without a hash (a service ADR read only
+        part way) takes lookup's if the stat matches, else is stored without
+        one and is only a hit while the stat stays the same.
+        """
+        key = (os.path.abspath(file_path), file_type)
+        seen = self.pending.pop(key, None)
+        mtime, size, digest = fingerprint or seen
+        if digest is None and seen is not None and seen[:2] == (mtime, size):
+            digest = seen[2]
+        self.connection.execute(
+            'INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?, ?)',
+            key + (mtime, size, digest, json.dumps(record.to_json()))
+        )
+
+    def flush(self):
+        """
+        Commits stored parses, for callers that keep the cache open.
+        """
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
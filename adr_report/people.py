@@ -0,0 +1,291 @@
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from .adr_records import MISSING_VALUE
+from .adr_template import OWNER_ENTRY
+
+DATE_FORMAT = '%d-%m-%Y'
+
+# Roles a person can have on a service, in the order they are listed
+ROLES = ('owner', 'author')
+
+PEOPLE_COLUMNS = ['Person ID', 'Name', 'Email', 'Services Owned', 'Services Authored', 'Overdue Services',
+                  'Next Re-certify Due Date']
+
+
+def normalize_email(email):
+    """
+    The identity key of an email address: trimmed, without angle brackets
+    or a mailto: prefix, and case-folded.
+    """
+    email = email.strip().strip('<>').strip()
+    if email.lower().startswith('mailto:'):
+        email = email[len('mailto:'):]
+    return email.casefold()
+
+
+def normalize_name(name):
+    return ' '.join(name.split())
+
+
+def due_days(due_dates):
+    """
+    The dd-mm-yyyy due dates as dates (None for ''), parsing each distinct
+    one once.
+    """
+    parsed = {'': None}
+    for due_date in due_dates:
+        if due_date not in parsed:
+            parsed[due_date] = datetime.strptime(due_date, DATE_FORMAT).date()
+    return [parsed[due_date] for due_date in due_dates]
+
+
+def split_entry(entry):
+    """
+    (name, email) of an Author/Contributors entry, written like an owner
+    ('Name <email>'), as a bare email, or as a name alone (email '').
+    """
+    entry = entry.strip()
+    match = OWNER_ENTRY.match(entry)
+    if match:
+        return normalize_name(match.group(1)), normalize_email(match.group(2))
+    if '@' in entry and ' ' not in entry:
+        return '', normalize_email(entry)
+    return normalize_name(entry), ''
+
+
+@dataclass(slots=True)
+class Person:
+    """
+    One person across every ADR: the email they are known by (normalized,
+    '' for someone only ever named), the name first written for them, and
+    their roles on each service, by service id.
+    """
+    name: str
+    email: str
+    services: dict = field(default_factory=dict)
+
+
+class PeopleIndex:
+    """
+    Identity index of the owners and authors of the foundational (and
+    deprecated) ADRs. People are keyed by normalized email, so every
+    spelling of one address is one person with one integer id (their
+    position in people). An entry without an email goes to the only person
+    of that name if there is one, else to a person known by name alone, who
+    takes the email once an entry gives one. Each service keeps the ids of
+    its owners and authors, and each person the roles they have on each
+    service, so a person's services or due re-certifications are a lookup
+    instead of a scan of the report's joined strings. Every ADR is a
+    service of its own, keyed by its file path, with its name only shown:
+    two ADRs with the same title, or with none, are two services with their
+    own people, status and due date.
+    """
+
+    def __init__(self):
+        self.people = []
+        self.by_email = {}
+        self.by_name = {}  # case-folded name -> ids of the people with it
+        self.services = []  # (file path, service name, status, approval date) by id
+        self.service_ids = {}  # file path -> id
+        self.service_people = []  # (owner ids, author ids) by service id
+        self.due_dates = []  # dd-mm-yyyy, or '' without one, by service id
+        self.due_days = []  # the same as dates, or None
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds the index from a {file_path: (file_type, record)} dict;
+        service ADRs and failed files are skipped.
+        """
+        index = cls()
+        for file_path, (file_type, record) in records.items():
+            if record is not None and file_type != 'service':
+                index.add(file_path, record)
+        return index
+
+    def new_person(self, name, email):
+        person_id = len(self.people)
+        self.people.append(Person(name, email))
+        self.by_name.setdefault(name.casefold(), []).append(person_id)
+        if email:
+            self.by_email[email] = person_id
+        return person_id
+
+    def person_id(self, name, email):
+        """
+        The id of the person a (normalized) name and email refer to, added
+        if new.
+        """
+        key = name.casefold()
+        named = self.by_name.get(key, []) if key else []
+        if email:
+            person_id = self.by_email.get(email)
+            if person_id is not None:
+                return person_id
+            nameless = [person_id for person_id in named if not self.people[person_id].email]
+            if len(nameless) == 1:
+                # Met before by name only
+                person_id = nameless[0]
+                self.people[person_id].email = email
+                self.by_email[email] = person_id
+                return person_id
+            return self.new_person(name, email)
+        if len(named) == 1:
+            return named[0]
+        nameless = [person_id for person_id in named if not self.people[person_id].email]
+        return nameless[0] if nameless else self.new_person(name, '')
+
+    def add(self, file_path, record):
+        service_id = self.service_ids.get(file_path)
+        if service_id is None:
+            service_id = self.service_ids[file_path] = len(self.services)
+            self.services.append((file_path, record.service_name or MISSING_VALUE,
+                                  record.service_status or MISSING_VALUE, record.approval_date))
+            self.service_people.append(((), ()))
+
+        owners = [(normalize_name(name), normalize_email(email)) for name, email in zip(record.owners, record.owner_ids)]
+        authors = [split_entry(author) for author in record.authors]
+        people = []
+        for entries, known in zip((owners, authors), self.service_people[service_id]):
+            ids = [self.person_id(name, email) for name, email in entries if name or email]
+            people.append(tuple(dict.fromkeys(known + tuple(ids))))
+        self.service_people[service_id] = tuple(people)
+        for role, ids in zip(ROLES, people):
+            for person_id in ids:
+                roles = self.people[person_id].services.setdefault(service_id, [])
+                if role not in roles:
+                    roles.append(role)
+
+    def work_out_due_dates(self):
+        """
+        Each service's re-certification due date, worked out the way the
+        report does it; needs pandas, so only done once there are services
+        without one.
+        """
+        if len(self.due_dates) == len(self.services):
+            return
+        from .recert_dates import DUMMY_DATE, recertification_columns
+        columns, _ = recertification_columns([approval_date for _, _, _, approval_date in self.services])
+        no_date = DUMMY_DATE.strftime(DATE_FORMAT)
+        self.due_dates = ['' if due_date == no_date else due_date for due_date in columns['Re-certify Due Date']]
+        self.due_days = due_days(self.due_dates)
+
+    def find(self, who):
+        """
+        Ids of the people an email or name (any case) refers to.
+        """
+        person_id = self.by_email.get(normalize_email(who))
+        if person_id is not None:
+            return [person_id]
+        return list(self.by_name.get(normalize_name(who).casefold(), []))
+
+    def services_of(self, person_id, role=None):
+        """
+        (service name, roles) for every service a person has a role on, or
+        only the given role, in the order the services were added.
+        """
+        return [(self.services[service_id][1], roles)
+                for service_id, roles in sorted(self.people[person_id].services.items())
+                if role is None or role in roles]
+
+    def recertifications(self, person_id, within=None, overdue=False, today=None):
+        """
+        (due date, service name, service status, roles, file path) for every
+        service a person has a role on that has a due date, soonest first:
+        all of them, those due in the next within days, or those overdue.
+        """
+        self.work_out_due_dates()
+        today = today or date.today()
+        due = []
+        for service_id, roles in self.people[person_id].services.items():
+            due_date = self.due_days[service_id]
+            if due_date is None:
+                continue
+            if overdue and due_date >= today:
+                continue
+            if within is not None and not today <= due_date <= today + timedelta(days=within):
+                continue
+            file_path, service_name, status, _ = self.services[service_id]
+            due.append((due_date, service_name, status, roles, file_path))
+        return sorted(due, key=lambda entry: (entry[0], entry[1], entry[4]))
+
+    def to_json(self):
+        self.work_out_due_dates()
+        return {
+            'people': [{'name': person.name, 'email': person.email} for person in self.people],
+            'services': [{'path': file_path, 'name': name, 'status': status, 'approval_date': approval_date,
+                          'due_date': due_date, 'owners': list(owners), 'authors': list(authors)}
+                         for (file_path, name, status, approval_date), due_date, (owners, authors)
+                         in zip(self.services, self.due_dates, self.service_people)],
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Loads an index saved with write_json, for lookups without the ADRs
+        (or pandas).
+        """
+        index = cls()
+        for person in data['people']:
+            index.new_person(person['name'], person['email'])
+        for service_id, service in enumerate(data['services']):
+            index.services.append((service['path'], service['name'], service['status'], service['approval_date']))
+            index.service_ids[service['path']] = service_id
+            index.due_dates.append(service['due_date'])
+            index.service_people.append((tuple(service['owners']), tuple(service['authors'])))
+            for role in ROLES:
+                for person_id in service[role + 's']:
+                    index.people[person_id].services.setdefault(service_id, []).append(role)
+        index.due_days = due_days(index.due_dates)
+        return index
+
+    @classmethod
+    def read_json(cls, path):
+        with open(path, encoding='utf-8') as file:
+            return cls.from_json(json.load(file))
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            # dumps is several times faster than dump, which encodes piece by piece
+            file.write(json.dumps(self.to_json(), separators=(',', ':'), ensure_ascii=False))
+
+    def to_frame(self, today=None):
+        """
+        The people sheet: one row per person with their id, name and email,
+        how many services they own and author, how many of those are overdue
+        and the next due date among the rest.
+        """
+        import pandas as pd
+        self.work_out_due_dates()
+        today = today or date.today()
+        rows = []
+        for person_id, person in enumerate(self.people):
+            due_days = [self.due_days[service_id] for service_id in person.services]
+            upcoming = min((day for day in due_days if day is not None and day >= today), default=None)
+            rows.append([
+                person_id, person.name or MISSING_VALUE, person.email,
+                sum('owner' in roles for roles in person.services.values()),
+                sum('author' in roles for roles in person.services.values()),
+                sum(1 for day in due_days if day is not None and day < today),
+                upcoming.strftime(DATE_FORMAT) if upcoming else '',
+            ])
+        return pd.DataFrame(rows, columns=PEOPLE_COLUMNS)
+
+
+def run(args):
+    """
+    Prints a person's re-certifications for `adr-report query person`.
+    """
+    from .adr_catalog import print_table
+    index = PeopleIndex.read_json(args.people)
+    columns = ['Due Date', 'Service Name', 'Service Status', 'Roles', 'Name', 'Email', 'File']
+    rows = []
+    for person_id in index.find(args.who):
+        person = index.people[person_id]
+        rows += [(due_date.strftime(DATE_FORMAT), service_name, status, ', '.join(roles), person.name, person.email,
+                  file_path)
+                 for due_date, service_name, status, roles, file_path
+                 in index.recertifications(person_id, within=args.due_within, overdue=args.overdue)]
+    print_table(columns, rows)
@@ -0,0 +1,89 @@
+import pandas as pd
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+
+DATE_FORMAT = '%d-%m-%Y'
+DUMMY_DATE = datetime(2000, 1, 1)
+
+# Approval dates the templates use to mean "not approved yet"
+PLACEHOLDER_DATES = ["TBD", "dd-mm-yyyy", ""]
+
+RECERTIFY_AFTER = pd.DateOffset(months=10)
+UPCOMING_WINDOW = relativedelta(months=3)
+
+# Shifting later approvals by RECERTIFY_AFTER could run past the dates pandas
+# can hold, so those few go through the per-date path instead
+LATEST_SHIFTABLE = pd.Timestamp(2261, 6, 1)
+
+
+def recertify_due_dates(approval_dates):
+    """
+    Works out the re-certification due date for a column of dd-mm-yyyy
+    approval date strings. Returns (approved, due, errors): the parsed
+    approval and due dates, NaT where there is none, and the error message
+    for every non-empty approval date that could not be used (None
+    elsewhere).
+    """
+    approval_dates = pd.Series(approval_dates, dtype=object)
+    approved = pd.to_datetime(approval_dates, format=DATE_FORMAT, errors='coerce')
+    due = pd.Series(pd.NaT, index=approval_dates.index, dtype='datetime64[ns]')
+    errors = pd.Series([None] * len(approval_dates), index=approval_dates.index, dtype=object)
+
+    shiftable = approved < LATEST_SHIFTABLE
+    due[shiftable] = approved[shiftable] + RECERTIFY_AFTER
+
+    # Everything else is rare (placeholders, typos, far-off years) and is
+    # checked one distinct value at a time, the way dates used to be
+    # worked out
+    rest = approval_dates[~shiftable & (approval_dates != "")]
+    rest_due = {}
+    rest_errors = {}
+    for approval_date in rest.unique():
+        try:
+            if approval_date in PLACEHOLDER_DATES:
+                datetime.strptime("00-00-0000", DATE_FORMAT)
+            due_date = datetime.strptime(approval_date, DATE_FORMAT) + relativedelta(months=10)
+        except Exception as e:
+            rest_errors[approval_date] = f"Error while calculating Re-certify Due Date: {e}"
+            continue
+        rest_due[approval_date] = pd.to_datetime(due_date.strftime(DATE_FORMAT), format=DATE_FORMAT, errors='coerce')
+    if rest_due:
+        due[rest.index] = rest.map(rest_due).astype('datetime64[ns]')
+    if rest_errors:
+        # Not map, which gives NaN for the far-off dates that worked
+        errors[rest.index] = [rest_errors.get(approval_date) for approval_date in rest]
+
+    return approved, due, errors
+
+
+def recertification_columns(approval_dates, today=None):
+    """
+    Builds the report's date columns from a column of approval date strings.
+    Missing or unusable dates show up as the dummy date 01-01-2000. Returns
+    (columns, errors) where errors is as for recertify_due_dates.
+    """
+    approval_dates = pd.Series(approval_dates, dtype=object)
+
+    # Every column depends on the approval date string alone, and reports
+    # repeat a small set of dates, so the work is done per distinct string
+    codes, distinct = pd.factorize(approval_dates)
+    approved, due, errors = recertify_due_dates(distinct)
+    approved = approved.fillna(DUMMY_DATE)
+    due = due.fillna(DUMMY_DATE)
+
+    # Flag re-certifications due in the next 3 months
+    if today is None:
+        today = datetime.today()
+    upcoming = ((due >= today) & (due <= today + UPCOMING_WINDOW)).astype(int)
+
+    distinct_columns = pd.DataFrame({
+        'Latest Approval date': approved.dt.strftime(DATE_FORMAT),
+        'Re-certify Due Date': due.dt.strftime(DATE_FORMAT),
+        'Re-certify Due Month': due.dt.strftime('%b'),
+        'Upcoming Recertification': upcoming,
+    })
+    columns = distinct_columns.take(codes)
+    columns.index = approval_dates.index
+    errors = errors.take(codes)
+    errors.index = approval_dates.index
+    return columns, errors
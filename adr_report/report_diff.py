@@ -0,0 +1,200 @@
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+
+from .adr_records import RECORD_TYPES
+from .parse_cache import CACHE_SCHEMA_VERSION
+
+# A report row is one capability mapping of one service
+KEY_COLUMNS = ['Service Name', 'Cap-Map Level 0', 'Cap-Map Level 1', 'Cap-Map Level 2']
+OCCURRENCE = 'Occurrence'
+
+
+def cached_records(cache_path):
+    """
+    (file_path, file_type, record) for every file in a parse cache, read
+    without touching (or validating against) the ADRs themselves.
+    """
+    connection = sqlite3.connect(f"file:{cache_path}?mode=ro", uri=True)
+    try:
+        row = connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or row[0] != str(CACHE_SCHEMA_VERSION):
+            raise ValueError(f"'{cache_path}' was written by a different version of the report; rerun it first")
+        return [(file_path, file_type, RECORD_TYPES[file_type].from_json(json.loads(data)))
+                for file_path, file_type, data in connection.execute('SELECT path, file_type, data FROM parsed ORDER BY rowid')]
+    finally:
+        connection.close()
+
+
+def load_run(path):
+    """
+    Reads one run's report table from an xlsx, Parquet or CSV report, or
+    rebuilds it from a parse cache (the .sqlite3 file or its directory).
+    Every cell comes back as a string, with '' for empty cells.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, 'parse-cache.sqlite3')
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xlsx':
+        try:
+            import python_calamine  # noqa: F401  much faster than openpyxl on big sheets
+            engine = 'calamine'
+        except ImportError:
+            engine = None
+        df = pd.read_excel(path, sheet_name='F-ADR', index_col=0, dtype=str, keep_default_na=False, engine=engine)
+    elif extension == '.parquet':
+        df = pd.read_parquet(path)
+    elif extension == '.csv':
+        df = pd.read_csv(path, index_col=0, dtype=str, keep_default_na=False)
+    elif extension in ('.sqlite3', '.sqlite', '.db'):
+        from .build import build_report
+        df, _, _ = build_report(cached_records(path))
+    else:
+        raise ValueError(f"don't know how to read '{path}'; expected .xlsx, .parquet, .csv or a parse cache")
+
+    df = df.reset_index(drop=True)
+    for column in KEY_COLUMNS:
+        if column not in df.columns:
+            df[column] = ''
+    return normalize_numbers(df.fillna('').astype(str))
+
+
+def format_number(value):
+    # 1, 1.0 and 1.000 all come out as '1'; repr keeps every digit of the rest
+    if value != value:
+        return ''
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def normalize_numbers(df):
+    """
+    Writes every cell of the all-numeric columns the same way whatever the
+    report was saved as: xlsx gives back 1 where CSV, Parquet and the
+    cache give 1.0 (e.g. S-ADR Match Confidence). Columns with any text in
+    them, dates included, are left as they are.
+    """
+    for column in df.columns:
+        if column in KEY_COLUMNS:
+            continue
+        values = df[column]
+        filled = values != ''
+        if not filled.any():
+            continue
+        try:
+            float(values[filled].iloc[0])  # most columns are text; don't convert them all to find out
+        except ValueError:
+            continue
+        numbers = pd.to_numeric(values.where(filled), errors='coerce')
+        if numbers[filled].isna().any():
+            continue
+        df[column] = [format_number(value) for value in numbers.astype(float).tolist()]
+    return df
+
+
+def keyed(df, columns):
+    """
+    The table indexed by Service Name and capability, plus a running number
+    for the (rare) rows that share both, holding only the given columns.
+    """
+    occurrence = df.groupby(KEY_COLUMNS, sort=False).cumcount()
+    return df.reindex(columns=columns, fill_value='').set_index(
+        pd.MultiIndex.from_arrays([df[column] for column in KEY_COLUMNS] + [occurrence],
+                                  names=KEY_COLUMNS + [OCCURRENCE]))
+
+
+def row_key(key):
+    # The occurrence number only matters when a row isn't the first of its key
+    return list(key[:-1]) + ([int(key[-1])] if key[-1] else [])
+
+
+def diff_runs(old, new, ignore=()):
+    """
+    Compares two report tables row by row on Service Name plus capability.
+    Rows are hashed first, so only rows whose hash differs are compared
+    field by field. Returns the delta as a JSON-ready dict.
+    """
+    columns = [column for column in dict.fromkeys(list(old.columns) + list(new.columns))
+               if column not in KEY_COLUMNS and column not in ignore]
+    old = keyed(old, columns)
+    new = keyed(new, columns)
+
+    removed = old.index.difference(new.index, sort=False)
+    added = new.index.difference(old.index, sort=False)
+    common = old.index.intersection(new.index, sort=False)
+
+    old_common = old.loc[common]
+    new_common = new.loc[common]
+    old_hashes = pd.util.hash_pandas_object(old_common, index=False).to_numpy()
+    new_hashes = pd.util.hash_pandas_object(new_common, index=False).to_numpy()
+    differs = old_hashes != new_hashes
+
+    changed_rows = []
+    old_values = old_common[differs]
+    new_values = new_common[differs]
+    for key, old_row, new_row in zip(old_values.index, old_values.itertuples(index=False), new_values.itertuples(index=False)):
+        fields = {column: [before, after] for column, before, after in zip(columns, old_row, new_row) if before != after}
+        changed_rows.append({'change': 'changed', 'key': row_key(key), 'fields': fields})
+
+    added_rows = [{'change': 'added', 'key': row_key(key),
+                   'values': {column: value for column, value in zip(columns, values) if value != ''}}
+                  for key, values in zip(added, new.loc[added].itertuples(index=False))]
+    removed_rows = [{'change': 'removed', 'key': row_key(key)} for key in removed]
+
+    old_services = set(old.index.get_level_values(0))
+    new_services = set(new.index.get_level_values(0))
+    added_services = sorted(new_services - old_services)
+    removed_services = sorted(old_services - new_services)
+    changed_services = sorted({row['key'][0] for row in added_rows + removed_rows + changed_rows}
+                              - set(added_services) - set(removed_services))
+
+    return {
+        'key': KEY_COLUMNS,
+        'summary': {
+            'rows': {'added': len(added_rows), 'removed': len(removed_rows), 'changed': len(changed_rows),
+                     'unchanged': int((~differs).sum())},
+            'services': {'added': len(added_services), 'removed': len(removed_services),
+                         'changed': len(changed_services)},
+        },
+        'added_services': added_services,
+        'removed_services': removed_services,
+        'changed_services': changed_services,
+        'rows': added_rows + removed_rows + changed_rows,
+    }
+
+
+def write_delta(delta, path):
+    """
+    Writes the delta as JSON, gzipped when the path ends in .gz.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as file:
+        json.dump(delta, file, separators=(',', ':'), ensure_ascii=False)
+
+
+def run(args):
+    """
+    Diffs two runs for the parsed command line of `adr-report diff`.
+    """
+    start = time.perf_counter()
+    delta = diff_runs(load_run(args.old), load_run(args.new), ignore=args.ignore)
+    delta['old'] = args.old
+    delta['new'] = args.new
+    write_delta(delta, args.output)
+
+    rows = delta['summary']['rows']
+    services = delta['summary']['services']
+    print(f"Services: {services['added']} added, {services['removed']} removed, {services['changed']} changed")
+    print(f"Rows: {rows['added']} added, {rows['removed']} removed, {rows['changed']} changed, "
+          f"{rows['unchanged']} unchanged")
+    changed_rows = [row for row in delta['rows'] if row['change'] == 'changed']
+    for row in changed_rows[:args.show]:
+        print(f"  {' / '.join(filter(None, map(str, row['key'])))}: " + ', '.join(
+            f"{column} '{before}' -> '{after}'" for column, (before, after) in row['fields'].items()))
+    if len(changed_rows) > args.show:
+        print(f"  ... and {len(changed_rows) - args.show} more")
+    print(f"Delta saved to '{args.output}' in {time.perf_counter() - start:.2f}s", file=sys.stderr)
@@ -0,0 +1,256 @@
+import contextlib
+import math
+from datetime import datetime
+
+# Same look pandas gives header and index cells in to_excel
+HEADER_FORMAT = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+INDEX_FORMAT = {'bold': True, 'border': 1, 'valign': 'top'}
+
+WORKBOOK_OPTIONS = {
+    'constant_memory': True,
+    # ADR text is data, never formulas or links
+    'strings_to_formulas': False,
+    'strings_to_urls': False,
+}
+
+# Stamped on every workbook instead of the time it was written, so the
+# same report gives the same bytes whenever (and however) it is built
+WORKBOOK_CREATED = datetime(2000, 1, 1)
+
+
+def is_blank(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def sheet_file_suffix(sheet_name):
+    # 'By Due Month' -> 'by-due-month', for formats without sheets
+    return '-'.join(sheet_name.lower().split())
+
+
+def write_header(workbook, worksheet, columns, index_name=None):
+    # index_name is None for tables written without their index
+    header_format = workbook.add_format(HEADER_FORMAT)
+    first_column = 0 if index_name is None else 1
+    if index_name is not None:
+        worksheet.write_string(0, 0, index_name, header_format)
+    for column_number, column in enumerate(columns, start=first_column):
+        worksheet.write_string(0, column_number, str(column), header_format)
+
+
+def write_rows(worksheet, df, first_row, index_format=None):
+    # Rows go from first_row down; index_format None leaves out the index.
+    # constant_memory needs each row finished before the next one starts
+    index = index_format is not None
+    first_column = 1 if index else 0
+    for row_number, row in enumerate(df.itertuples(index=index, name=None), start=first_row):
+        if index:
+            worksheet.write(row_number, 0, row[0].item() if hasattr(row[0], 'item') else row[0], index_format)
+        for column_number, value in enumerate(row[first_column:], start=first_column):
+            if is_blank(value):
+                continue
+            if hasattr(value, 'item'):
+                value = value.item()  # numpy scalar
+            worksheet.write(row_number, column_number, value)
+
+
+def new_workbook(path):
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(path, WORKBOOK_OPTIONS)
+    workbook.set_properties({'created': WORKBOOK_CREATED})
+    return workbook
+
+
+def write_sheet(workbook, df, sheet_name, index=True):
+    worksheet = workbook.add_worksheet(sheet_name)
+    write_header(workbook, worksheet, df.columns, (df.index.name or '') if index else None)
+    write_rows(worksheet, df, 1, workbook.add_format(INDEX_FORMAT) if index else None)
+
+
+def write_xlsx(df, path, sheet_name='F-ADR', extra_sheets=None):
+    """
+    Streams the table into an xlsx file row by row with xlsxwriter's
+    constant_memory mode, so the workbook is never held in memory. Tables in
+    extra_sheets ({sheet name: table}) follow as sheets of their own,
+    without an index. Falls back to pandas' default engine when xlsxwriter
+    isn't installed.
+    """
+    extra_sheets = extra_sheets or {}
+    try:
+        import xlsxwriter  # noqa: F401
+    except ImportError:
+        import pandas as pd
+        with pd.ExcelWriter(path) as writer:
+            df.to_excel(writer, sheet_name=sheet_name, index=True)
+            for extra_name, extra_df in extra_sheets.items():
+                extra_df.to_excel(writer, sheet_name=extra_name, index=False)
+        return
+
+    workbook = new_workbook(path)
+    try:
+        write_sheet(workbook, df, sheet_name)
+        for extra_name, extra_df in extra_sheets.items():
+            write_sheet(workbook, extra_df, extra_name, index=False)
+    finally:
+        workbook.close()
+
+
+def write_csv(df, path, sheet_name='F-ADR', extra_sheets=None):
+    df.to_csv(path, index=True)
+    for extra_name, extra_df in (extra_sheets or {}).items():
+        extra_df.to_csv(path[:-len('.csv')] + f"-{sheet_file_suffix(extra_name)}.csv", index=False)
+
+
+def write_parquet(df, path, sheet_name='F-ADR', extra_sheets=None):
+    # Needs pyarrow (or fastparquet); pandas raises a clear ImportError if
+    # neither is installed
+    df.to_parquet(path, index=True)
+    for extra_name, extra_df in (extra_sheets or {}).items():
+        extra_df.to_parquet(path[:-len('.parquet')] + f"-{sheet_file_suffix(extra_name)}.parquet", index=False)
+
+
+WRITERS = {
+    'xlsx': write_xlsx,
+    'csv': write_csv,
+    'parquet': write_parquet,
+}
+
+
+def write_report(df, output_base, formats, sheet_name='F-ADR', metrics=None, extra_sheets=None):
+    """
+    Writes one in-memory report table in each requested format, to
+    output_base plus the format's extension. extra_sheets become further
+    sheets of the xlsx, and files named after them (output_base-by-owner.csv
+    and so on) for the other formats. Returns the report paths written.
+    """
+    paths = []
+    for output_format in formats:
+        path = f"{output_base}.{output_format}"
+        timer = metrics.stage(f'write_{output_format}') if metrics is not None else contextlib.nullcontext()
+        with timer:
+            WRITERS[output_format](df, path, sheet_name=sheet_name, extra_sheets=extra_sheets)
+        paths.append(path)
+    return paths
+
+
+def empty_table(columns, index_name=None):
+    # What a stream with no batches writes, so the file still has its header
+    import pandas as pd
+    return pd.DataFrame(columns=columns, index=pd.Index([], name=index_name))
+
+
+class XlsxStream:
+    """
+    Writes a report table batch by batch into one xlsx sheet, each batch
+    streamed out by xlsxwriter's constant_memory mode as it arrives.
+    """
+
+    def __init__(self, path, columns, sheet_name='F-ADR', index_name=None):
+        # Unlike write_xlsx there is no fallback: pandas' engines need the
+        # whole table at once
+        self.workbook = new_workbook(path)
+        self.worksheet = self.workbook.add_worksheet(sheet_name)
+        self.index_format = self.workbook.add_format(INDEX_FORMAT)
+        write_header(self.workbook, self.worksheet, columns, index_name or '')
+        self.next_row = 1
+
+    def write(self, df):
+        write_rows(self.worksheet, df, self.next_row, self.index_format)
+        self.next_row += len(df)
+
+    def write_extra(self, df, sheet_name):
+        write_sheet(self.workbook, df, sheet_name, index=False)
+
+    def close(self):
+        self.workbook.close()
+
+
+class CsvStream:
+    """
+    Appends a report table to one CSV file batch by batch, header first.
+    """
+
+    def __init__(self, path, columns, sheet_name='F-ADR', index_name=None):
+        self.path = path
+        self.columns = columns
+        self.index_name = index_name
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.file, index=True, header=self.header)
+        self.header = False
+
+    def write_extra(self, df, sheet_name):
+        df.to_csv(self.path[:-len('.csv')] + f"-{sheet_file_suffix(sheet_name)}.csv", index=False)
+
+    def close(self):
+        if self.header:
+            self.write(empty_table(self.columns, self.index_name))
+        self.file.close()
+
+
+class ParquetStream:
+    """
+    Writes a report table to one Parquet file, a row group per batch. Every
+    batch must have the same columns and dtypes; the file's schema comes
+    from the first, with all-empty columns typed as strings.
+    """
+
+    def __init__(self, path, columns, sheet_name='F-ADR', index_name=None):
+        self.path = path
+        self.columns = columns
+        self.index_name = index_name
+        self.writer = None
+        self.schema = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is None:
+            schema = pa.Schema.from_pandas(df, preserve_index=True)
+            self.schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                     for field in schema], metadata=schema.metadata)
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=True))
+
+    def write_extra(self, df, sheet_name):
+        df.to_parquet(self.path[:-len('.parquet')] + f"-{sheet_file_suffix(sheet_name)}.parquet", index=False)
+
+    def close(self):
+        if self.writer is None:
+            self.write(empty_table(self.columns, self.index_name))
+        self.writer.close()
+
+
+STREAM_WRITERS = {
+    'xlsx': XlsxStream,
+    'csv': CsvStream,
+    'parquet': ParquetStream,
+}
+
+
+def stream_report(batches, output_base, formats, columns, sheet_name='F-ADR', index_name=None, metrics=None,
+                  extra_sheets=None):
+    """
+    Writes a report table that arrives in batches, each with exactly the
+    given columns, in each requested format, so the whole table is never
+    in memory. extra_sheets are written after the last batch, as in
+    write_report. Returns the report paths written.
+    """
+    paths = [f"{output_base}.{output_format}" for output_format in formats]
+    streams = [STREAM_WRITERS[output_format](path, columns, sheet_name=sheet_name, index_name=index_name)
+               for output_format, path in zip(formats, paths)]
+    try:
+        for df in batches:
+            for output_format, stream in zip(formats, streams):
+                timer = metrics.stage(f'write_{output_format}') if metrics is not None else contextlib.nullcontext()
+                with timer:
+                    stream.write(df)
+        for extra_name, extra_df in (extra_sheets or {}).items():
+            for stream in streams:
+                stream.write_extra(extra_df, extra_name)
+    finally:
+        for stream in streams:
+            stream.close()
+    return paths
@@ -0,0 +1,94 @@
+import pandas as pd
+
+from .adr_template import RISK_RATINGS
+from .recert_dates import DATE_FORMAT, DUMMY_DATE
+
+CAPABILITY_LEVELS = ['Cap-Map Level 0', 'Cap-Map Level 1', 'Cap-Map Level 2']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+NOT_RATED = 'Not rated'
+NO_DUE_DATE = 'No date'
+
+
+def counts(df, by):
+    """
+    Rows and distinct services per value of the by column(s), in one
+    group-by; empty cells are counted under their own blank key.
+    """
+    grouped = df.groupby(by, dropna=False, sort=True)['Service Name']
+    return pd.DataFrame({'Rows': grouped.size(), 'Services': grouped.nunique()}).reset_index()
+
+
+def by_capability(df):
+    levels = [level for level in CAPABILITY_LEVELS if level in df.columns]
+    return counts(df, levels) if levels else None
+
+
+def by_service_status(df):
+    return counts(df, 'Service Status')
+
+
+def by_due_month(df):
+    # The dummy date stands for "no usable date", not January
+    dummy = df['Re-certify Due Date'] == DUMMY_DATE.strftime(DATE_FORMAT)
+    month = pd.Categorical(df['Re-certify Due Month'].mask(dummy, NO_DUE_DATE), categories=MONTHS + [NO_DUE_DATE])
+    grouped = df.groupby(month, observed=True)
+    result = pd.DataFrame({
+        'Rows': grouped.size(),
+        'Services': grouped['Service Name'].nunique(),
+        'Upcoming Recertification': grouped['Upcoming Recertification'].sum(),
+    })
+    result.index.name = 'Re-certify Due Month'
+    return result.reset_index()
+
+
+def by_owner(df):
+    # Co-owned services count once for each owner; by Person ID when the
+    # report gives owners that way (--person-ids)
+    owner = 'Service Owner' if 'Service Owner' in df.columns else 'Owner IDs'
+    owners = df[['Service Name', owner]].assign(**{owner: df[owner].str.split(', ')})
+    return counts(owners.explode(owner), owner)
+
+
+def by_risk_rating(df):
+    """
+    Services by the highest rating among their DC-* columns. The ratings sit
+    on a service's first row, so each service is rated by its highest row.
+    """
+    ratings = [column for column in df.columns if column.startswith('DC-')]
+    rank = {rating.lower(): number for number, rating in enumerate(RISK_RATINGS, start=1)}
+    if ratings:
+        row_rank = (df[ratings].apply(lambda column: column.str.strip().str.lower().map(rank))
+                    .max(axis=1).fillna(0).astype(int))
+    else:
+        row_rank = pd.Series(0, index=df.index)
+    service_rank = row_rank.groupby(df['Service Name']).max()
+    labels = pd.Categorical.from_codes(service_rank.to_numpy(), categories=[NOT_RATED] + RISK_RATINGS)
+    result = pd.Series(labels).value_counts(sort=False).rename('Services')
+    result.index.name = 'Highest Risk Rating'
+    return result.reset_index()
+
+
+ROLLUPS = {
+    'By Capability': by_capability,
+    'By Service Status': by_service_status,
+    'By Due Month': by_due_month,
+    'By Owner': by_owner,
+    'By Risk Rating': by_risk_rating,
+}
+
+
+def build_rollups(df):
+    """
+    The summary tables the governance team used to pivot by hand, keyed by
+    sheet name, each from one group-by over the final report table. An
+    empty table (no ADRs at all) has nothing to summarise.
+    """
+    rollups = {}
+    if df.empty:
+        return rollups
+    for sheet_name, rollup in ROLLUPS.items():
+        table = rollup(df)
+        if table is not None:
+            rollups[sheet_name] = table
+    return rollups
@@ -0,0 +1,219 @@
+import heapq
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+
+# Vendor words some S-ADR titles carry in front of the service name
+IGNORED_PREFIXES = ('google', 'cloud')
+
+# Titles scoring below this stay unmatched ("No f-adr")
+DEFAULT_THRESHOLD = 0.9
+
+# Tokens and n-grams shared by more names than this (like "service" or
+# "api") narrow nothing down and are not used for blocking
+MAX_BLOCK = 64
+MAX_CANDIDATES = 8
+NGRAM = 3
+
+# Match methods, strongest first
+METHODS = ('exact', 'normalized', 'fuzzy')
+
+
+def normalize_name(name):
+    """
+    The matching key of a service name: case-folded, punctuation and
+    repeated whitespace collapsed to single spaces, and vendor prefixes
+    dropped, so 'Google Cloud  Pub/Sub' and 'pub sub' share a key.
+    """
+    words = re.sub(r'[\W_]+', ' ', str(name).casefold()).split()
+    while len(words) > 1 and words[0] in IGNORED_PREFIXES:
+        words = words[1:]
+    return ' '.join(words)
+
+
+def ngrams(key):
+    compact = key.replace(' ', '')
+    return {compact[i:i + NGRAM] for i in range(max(len(compact) - NGRAM + 1, 1))}
+
+
+def numbers(key):
+    # Numbers identify a service ("Service 11" is not "Service 12"), so
+    # names whose numbers differ never match, however close they look
+    return {int(number) for number in re.findall(r'\d+', key)}
+
+
+# Kinds of block a name is in: its whole normalized key, and its words,
+# numbers and character n-grams
+BLOCK_KINDS = ('key', 'word', 'number', 'ngram')
+
+
+def blocks_of(key):
+    """
+    (kind, values) of the blocks a normalized key is in, for each kind.
+    """
+    return zip(BLOCK_KINDS, ((key,), set(key.split()), numbers(key), ngrams(key)))
+
+
+def similarity(key, other):
+    if numbers(key) != numbers(other):
+        return 0.0
+    return SequenceMatcher(None, key, other, autojunk=False).ratio()
+
+
+class ServiceMatcher:
+    """
+    Blocking index over F-ADR service names for pairing S-ADR titles with
+    them. Names are grouped by normalized key, by word, by number and by
+    character n-gram; a title is only scored against the few names it shares
+    the most (small) blocks with, so matching stays close to linear in the
+    number of services. The index can be brought up to date with update
+    after a few names change, for LiveMatcher.
+    """
+
+    def __init__(self, names):
+        self.names = list(dict.fromkeys(names))
+        self.positions = {name: position for position, name in enumerate(self.names)}
+        self.keys = {}
+        # kind -> value -> the names in that block
+        self.blocks = {kind: {} for kind in BLOCK_KINDS}
+        for name in self.names:
+            key = self.keys[name] = normalize_name(name)
+            for kind, values in blocks_of(key):
+                blocks = self.blocks[kind]
+                for value in values:
+                    blocks.setdefault(value, set()).add(name)
+
+    def update(self, names, changed):
+        """
+        Takes names (every name, in order) after the names in changed were
+        added, removed or moved. Returns the (kind, value) blocks whose
+        names may now give different proposals: the key blocks of the
+        changed names and their other blocks that were small before or
+        after.
+        """
+        self.names = list(dict.fromkeys(names))
+        self.positions = {name: position for position, name in enumerate(self.names)}
+        sizes = {}
+        for name in dict.fromkeys(changed):
+            key = self.keys.get(name) or normalize_name(name)
+            for kind, values in blocks_of(key):
+                for value in values:
+                    block = self.blocks[kind].setdefault(value, set())
+                    sizes.setdefault((kind, value), len(block))
+                    if name in self.positions:
+                        block.add(name)
+                    else:
+                        block.discard(name)
+            if name in self.positions:
+                self.keys[name] = key
+            else:
+                self.keys.pop(name, None)
+        return {(kind, value) for (kind, value), size in sizes.items()
+                if kind == 'key' or min(size, len(self.blocks[kind][value])) <= MAX_BLOCK}
+
+    def candidates(self, key):
+        """
+        The names sharing the most blocks with key, best first; ties go to
+        the name listed first.
+        """
+        shared = Counter()
+        for kind, values in blocks_of(key):
+            if kind == 'key':
+                continue
+            blocks = self.blocks[kind]
+            for value in values:
+                names = blocks.get(value, ())
+                if len(names) <= MAX_BLOCK:
+                    shared.update(names)
+        return heapq.nsmallest(MAX_CANDIDATES, shared, key=lambda name: (-shared[name], self.positions[name]))
+
+    def proposals(self, title, threshold):
+        """
+        (confidence, method, name) of every name title could be paired with,
+        short of an exact match.
+        """
+        key = normalize_name(title)
+        same_key = self.blocks['key'].get(key)
+        if same_key:
+            return [(1.0, 'normalized', name) for name in same_key]
+        scored = ((similarity(key, self.keys[name]), name) for name in self.candidates(key))
+        return [(score, 'fuzzy', name) for score, name in scored if score >= threshold]
+
+    def match_all(self, titles, threshold=DEFAULT_THRESHOLD):
+        """
+        Pairs titles with names, each at most once on either side: exact
+        matches first, then the rest from the highest confidence down.
+        Returns {title: (name, confidence, method)} for the titles paired.
+        """
+        return self.assign(titles, lambda title: self.proposals(title, threshold))
+
+    def assign(self, titles, proposals):
+        """
+        match_all with each title's proposals taken from proposals(title).
+        """
+        titles = list(titles)
+        matches = {}
+        taken = set()
+        for title in titles:
+            if title in self.positions and title not in taken:
+                matches[title] = (title, 1.0, 'exact')
+                taken.add(title)
+
+        ranked = []
+        for order, title in enumerate(titles):
+            if title not in matches:
+                ranked.extend((-confidence, METHODS.index(method), order, self.positions[name], name, title)
+                              for confidence, method, name in proposals(title))
+        ranked.sort(key=lambda proposal: proposal[:4])
+        for confidence, method, _, _, name, title in ranked:
+            if title not in matches and name not in taken:
+                matches[title] = (name, -confidence, METHODS[method])
+                taken.add(name)
+        return matches
+
+
+class LiveMatcher:
+    """
+    ServiceMatcher results kept between --watch updates. Every title's
+    proposals are kept with the blocks they were read from, so after an
+    edit only the titles looking at a block a changed name is in are
+    scored again; pairing the proposals up is redone in full, as a title
+    taking a name can leave another title without one.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.matcher = None
+        self.proposals = {}  # title -> ServiceMatcher.proposals
+        self.titles = {kind: {} for kind in BLOCK_KINDS}  # kind -> value -> titles reading that block
+
+    def index(self, title, add):
+        for kind, values in blocks_of(normalize_name(title)):
+            blocks = self.titles[kind]
+            for value in values:
+                if add:
+                    blocks.setdefault(value, set()).add(title)
+                else:
+                    blocks[value].discard(title)
+
+    def match_all(self, names, changed, titles):
+        """
+        ServiceMatcher(names).match_all(titles) after the names in changed
+        were added, removed or moved since the last call.
+        """
+        titles = list(titles)
+        if self.matcher is None:
+            self.matcher = ServiceMatcher(names)
+        else:
+            stale = set()
+            for kind, value in self.matcher.update(names, changed):
+                stale |= self.titles[kind].get(value, set())
+            stale |= self.proposals.keys() - set(titles)
+            for title in stale:
+                self.index(title, add=False)
+                del self.proposals[title]
+        for title in titles:
+            if title not in self.proposals:
+                self.proposals[title] = self.matcher.proposals(title, self.threshold)
+                self.index(title, add=True)
+        return self.matcher.assign(titles, self.proposals.__getitem__)
@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+import pandas as pd
+
+
+class SpillDir:
+    """
+    Report batches parked on disk as Arrow IPC (Feather) files until the
+    final pass, so only one batch at a time is held in memory. Keeps the
+    union of the batches' columns in the order they first appear; the files
+    are removed on close.
+    """
+
+    def __init__(self, parent=None):
+        # Needs pyarrow; pandas raises a clear ImportError without it
+        self.directory = tempfile.TemporaryDirectory(prefix='adr-report-', dir=parent)
+        self.paths = []
+        self.columns = {}
+        self.rows = 0
+
+    def write(self, df):
+        path = os.path.join(self.directory.name, f"batch-{len(self.paths):06d}.arrow")
+        df.reset_index(drop=True).to_feather(path)
+        self.paths.append(path)
+        self.columns.update(dict.fromkeys(df.columns))
+        self.rows += len(df)
+
+    def batches(self):
+        """
+        The spilled batches, read back one at a time in the order written.
+        """
+        for path in self.paths:
+            yield pd.read_feather(path)
+
+    def close(self):
+        self.directory.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,90 @@
+import bisect
+from collections import Counter
+from datetime import datetime
+
+DATE_FORMAT = '%d-%m-%Y'
+
+# Log statuses that count as an approval
+APPROVED_STATUSES = {'approved'}
+
+
+class StatusTimeline:
+    """
+    Date-sorted Document Status log of every service, built once from the
+    parsed records (or the catalog) so questions about the past need no
+    rescan. Each service keeps parallel lists of day numbers and log
+    entries, searched with bisect; approvals per forum and month are
+    counted up front. Log rows whose date can't be read are left out and
+    counted in skipped.
+    """
+
+    def __init__(self, entries):
+        """
+        entries: (service name, status, forum, approval date, change
+        summary) tuples, each service's in the order its log lists them
+        (newest first in the template).
+        """
+        by_service = {}
+        self.skipped = 0
+        self.approvals = Counter()  # (forum, 'yyyy-mm') -> approvals
+        for position, (service_name, status, forum, approval_date, change_summary) in enumerate(entries):
+            try:
+                day = datetime.strptime(approval_date, DATE_FORMAT).date()
+            except ValueError:
+                self.skipped += 1
+                continue
+            # Rows dated the same day sort with the one listed first (the
+            # newer one) last, so it is the one in effect from that day
+            by_service.setdefault(service_name, []).append(
+                (day.toordinal(), -position, (status, forum, day, change_summary)))
+            if status.lower() in APPROVED_STATUSES:
+                self.approvals[(forum, day.strftime('%Y-%m'))] += 1
+
+        self.days = {}
+        self.entries = {}
+        for service_name, rows in by_service.items():
+            rows.sort()
+            self.days[service_name] = [day for day, _, _ in rows]
+            self.entries[service_name] = [entry for _, _, entry in rows]
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds the timeline from (file_type, record) pairs; service ADRs
+        have no log and are skipped.
+        """
+        return cls((record.service_name,) + entry
+                   for file_type, record in records
+                   if record is not None and file_type != 'service'
+                   for entry in record.status_log)
+
+    def status_as_of(self, day):
+        """
+        {service name: (status, forum, date, change summary)} of the latest
+        log entry on or before day, for every service with one.
+        """
+        ordinal = day.toordinal()
+        statuses = {}
+        for service_name, days in self.days.items():
+            index = bisect.bisect_right(days, ordinal)
+            if index:
+                statuses[service_name] = self.entries[service_name][index - 1]
+        return statuses
+
+    def history(self, service_name):
+        """
+        A service's log entries, oldest first.
+        """
+        return list(self.entries.get(service_name, []))
+
+    def approvals_per_forum_month(self, forum=None, first_month=None, last_month=None):
+        """
+        [(forum, 'yyyy-mm', approvals)] sorted by forum and month, optionally
+        for one forum and an inclusive range of 'yyyy-mm' months.
+        """
+        return sorted(
+            (entry_forum, month, count) for (entry_forum, month), count in self.approvals.items()
+            if (forum is None or entry_forum.lower() == forum.lower())
+            and (first_month is None or month >= first_month)
+            and (last_month is None or month <= last_month)
+        )
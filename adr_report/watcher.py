@@ -0,0 +1,147 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+# inotify event bits (see inotify(7))
+IN_MODIFY = 0x0002
+IN_CLOSE_WRITE = 0x0008
+IN_MOVED_FROM = 0x0040
+IN_MOVED_TO = 0x0080
+IN_CREATE = 0x0100
+IN_DELETE = 0x0200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event header: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def markdown_files(folder_paths):
+    """
+    Snapshot of the markdown files in the folders: {path: (mtime_ns, size)}.
+    """
+    snapshot = {}
+    for folder_path in folder_paths:
+        try:
+            entries = os.scandir(folder_path)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith('.md'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # removed while listing
+                snapshot[os.path.join(folder_path, entry.name)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class PollingWatcher:
+    """
+    Finds changed markdown files by comparing os.scandir snapshots of the
+    folders every poll_interval seconds. Works everywhere.
+    """
+    name = 'polling'
+
+    def __init__(self, folder_paths, poll_interval=1.0):
+        self.folder_paths = folder_paths
+        self.poll_interval = poll_interval
+        self.snapshot = markdown_files(folder_paths)
+
+    def wait(self, timeout=None):
+        """
+        Returns the paths added, changed or removed since the last call, or an
+        empty set if nothing changed within timeout seconds (None waits for
+        as long as it takes).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = markdown_files(self.folder_paths)
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed:
+                return changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Gets changed markdown files from the Linux kernel through inotify, so
+    nothing is rescanned between changes. Raises OSError where inotify
+    isn't available.
+    """
+    name = 'inotify'
+
+    def __init__(self, folder_paths):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("this C library has no inotify support")
+        self.folder_paths = folder_paths
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folders = {}  # watch descriptor -> folder path
+        try:
+            for folder_path in folder_paths:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(folder_path), WATCH_MASK)
+                if wd < 0:
+                    error = ctypes.get_errno()
+                    raise OSError(error, os.strerror(error), folder_path)
+                self.folders[wd] = folder_path
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def wait(self, timeout=None):
+        """
+        Same contract as PollingWatcher.wait.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; treat every file as changed
+                    changed.update(markdown_files(self.folder_paths))
+                elif name.endswith(b'.md') and wd in self.folders:
+                    changed.add(os.path.join(self.folders[wd], os.fsdecode(name)))
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(folder_paths, poll_interval=1.0):
+    """
+    Watches the folders with inotify when the platform has it, and by polling
+    otherwise.
+    """
+    try:
+        return InotifyWatcher(folder_paths)
+    except OSError:
+        return PollingWatcher(folder_paths, poll_interval)
@@ -0,0 +1,113 @@
+"""
+parse_markdown as it was before the single-pass parser, unchanged apart
+from this docstring and the imports: the reference test_parser holds the
+current parser to.
+"""
+import re
+
+
+def remove_comments(content):
+    """
+    Removes markdown comments of the format:
+    [comment]: <> (This is a comment)
+    <!-- This is a comment -->
+    """
+    content = re.sub(r'\[comment\]: <> \(.*?\)', '', content, flags=re.IGNORECASE)  # Remove inline comments
+    content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)  # Remove HTML comments
+    return content
+
+def parse_markdown(file_path, file_type='foundational'):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+    
+    # Remove comments before processing
+    content = remove_comments(content)
+    
+    parsed_data = {
+        'Service Name': '',
+        'Service Owner': [],
+        'Service Owner Id': [],
+        'Service Status': '',
+        'ADR Authors': [],
+        'ADR Document Status': '',
+        'Latest Approval date': '',
+        'Capability Mapping Hierarchy': [],
+        'Data Classification': {},
+        'S-ADR Service Name': '',
+        'S-ADR Document Status': '',
+        'S-ADR Service Status': '',
+        'S-ADR Approval Date': ''
+    }
+
+    if file_type == 'foundational' or file_type == 'deprecated':
+        # Extract title
+        title_match = re.search(r'^---\ntitle:\s*(.*?)\n---', content, re.DOTALL)
+        if title_match:
+            parsed_data['Service Name'] = title_match.group(1).strip()
+
+        # Extract document owner and contributors
+        document_owner_match = re.search(r'## Document Owner\s*\n([\s\S]*?)(?=##|$)', content)
+        if document_owner_match:
+            owners = document_owner_match.group(1).strip().split('\n')
+            for owner in owners:
+                owner = owner.lstrip('-').strip()
+                match = re.match(r'(.+?)\s<(.+?)>', owner)
+                if match:
+                    parsed_data['Service Owner'].append(match.group(1))
+                    parsed_data['Service Owner Id'].append(match.group(2))
+        
+        authors_match = re.search(r'## Author/Contributors\s*\n([\s\S]*?)(?=##|$)', content)
+        if authors_match:
+            authors = authors_match.group(1).strip().split('\n')
+            for author in authors:
+                author = author.lstrip('-').strip()
+                parsed_data['ADR Authors'].append(author)
+        
+        # Extract document status and approval date
+        doc_status_match = re.search(r'## Document Status\s*\n\| Document Status \| Forum \| Date \|\s*\n\|:--\|:--\|:--\|\s*\n\|([^\|]+)\|([^\|]+)\|([^\|]+)\|', content)
+        if doc_status_match:
+            parsed_data['ADR Document Status'] = doc_status_match.group(1).strip()
+            parsed_data['Latest Approval date'] = doc_status_match.group(3).strip()
+        
+        # Extract capability mapping hierarchy
+        capability_mapping_section = re.search(r'## 1\. Capability Mapping Hierarchy\s*\n([\s\S]*?)(?=##|$)', content)
+        if capability_mapping_section:
+            capability_table_rows = re.findall(r'\|([^\|]+)\|([^\|]+)\|([^\|]+)\|', capability_mapping_section.group(1))
+            capability_table_rows = capability_table_rows[1:]  # Skip the header row
+            capability_table_rows = [row for row in capability_table_rows if not any(":--" in col for col in row)]
+            for row in capability_table_rows:
+                parsed_data['Capability Mapping Hierarchy'].append({
+                    "Cap-Map Level 0": row[0].strip(),
+                    "Cap-Map Level 1": row[1].strip(),
+                    "Cap-Map Level 2": row[2].strip()
+                })
+        
+        # Extract data classification
+        data_classification_section = re.search(r'### 2\.2 Data Classification\s*\n\| Data Classification \| Risk Rating \|\s*\n\|:-\|:-\|\s*\n([\s\S]*?)(?=###|$)', content)
+        if data_classification_section:
+            data_classification_rows = re.findall(r'\|([^\|]+)\|([^\|]+)\|', data_classification_section.group(1))
+            for row in data_classification_rows:
+                classification = row[0].strip()
+                risk_rating = row[1].strip()
+                parsed_data['Data Classification'][f"DC-{classification}"] = risk_rating
+        
+        # Extract service status
+        service_status_section = re.search(r'## Service Status\s*\n\| Service Status \|\s*\n\|---\|\s*\n\|([^\|]+)\|', content)
+
+        if service_status_section:
+            parsed_data['Service Status'] = service_status_section.group(1).strip()
+    
+    elif file_type == 'service':
+        # For service-adr files, extract title and Document Status section
+        title_match = re.search(r'^---\ntitle:\s*(.*?)\n---', content, re.DOTALL)
+        if title_match:
+            parsed_data['S-ADR Service Name'] = title_match.group(1).strip()
+
+        # Extract Document Status Table
+        doc_status_match = re.search(r'## Document Status\s*\n\| Document Status \| Service Status \| Forum \| Approval Date \|\s*\n\|:--\|:--\|:--\|:--\|\s*\n\|([^\|]+)\|([^\|]+)\|([^\|]+)\|([^\|]+)\|', content)
+        if doc_status_match:
+            parsed_data['S-ADR Document Status'] = doc_status_match.group(1).strip()
+            parsed_data['S-ADR Service Status'] = doc_status_match.group(2).strip()
+            parsed_data['S-ADR Approval Date'] = doc_status_match.group(4).strip()
+        
+    return parsed_data
@@ -0,0 +1,59 @@
+"""
+The date columns of process_f_adr as they were before recert_dates: the
+code from "Add dummy date" on, unchanged apart from this docstring, the
+imports, the one-column frame it starts from and today being passed in.
+"""
+from datetime import datetime
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+
+def process_f_adr_dates(parsed_data, today):
+
+    df = pd.DataFrame({'Latest Approval date': [parsed_data['Latest Approval date']]})
+
+    # Add dummy date and check for missing values
+    if parsed_data['Latest Approval date']:
+        try:
+            if parsed_data['Latest Approval date'] in ["TBD", "dd-mm-yyyy", ""]:
+                parsed_data['Latest Approval date'] = "00-00-0000"
+            
+            latest_approved_date = datetime.strptime(parsed_data['Latest Approval date'], '%d-%m-%Y')
+            recertify_due_date = latest_approved_date + relativedelta(months=10)
+            recertify_due_date_str = recertify_due_date.strftime('%d-%m-%Y')
+        except Exception as e:
+            print(f"Error while calculating Re-certify Due Date: {e}")
+            parsed_data['Latest Approval date'] = "00-00-0000"
+            recertify_due_date_str = "00-00-0000"
+        
+        # Update the DataFrame with dummy date if necessary
+        df['Re-certify Due Date'] = recertify_due_date_str
+    else:
+        parsed_data['Latest Approval date'] = "00-00-0000"
+        recertify_due_date_str = "00-00-0000"
+        df['Re-certify Due Date'] = recertify_due_date_str
+    
+    # Check for empty columns and fill them with "Check with CPA team"
+    df = df.applymap(lambda x: x if pd.notnull(x) and x != "" else "Check with CPA team")
+
+    # Convert date columns to datetime format before saving
+    df['Latest Approval date'] = pd.to_datetime(df['Latest Approval date'], format='%d-%m-%Y', errors='coerce')
+    df['Re-certify Due Date'] = pd.to_datetime(df['Re-certify Due Date'], format='%d-%m-%Y', errors='coerce')
+    
+    # Replace invalid dates with dummy date
+    df['Latest Approval date'] = df['Latest Approval date'].apply(lambda x: datetime(2000, 1, 1) if pd.isnull(x) or str(x) in ["Check with CPA team", "00-00-0000"] else x)
+    df['Re-certify Due Date'] = df['Re-certify Due Date'].apply(lambda x: datetime(2000, 1, 1) if pd.isnull(x) or str(x) in ["Check with CPA team", "00-00-0000"] else x)
+    
+    # Convert back to string in required format
+    df['Latest Approval date'] = df['Latest Approval date'].dt.strftime('%d-%m-%Y')
+    df['Re-certify Due Date'] = df['Re-certify Due Date'].dt.strftime('%d-%m-%Y')
+
+    # Add new columns
+    df['Re-certify Due Month'] = pd.to_datetime(df['Re-certify Due Date'], format='%d-%m-%Y', errors='coerce').dt.strftime('%b')
+    
+    # Calculate upcoming recertifications in the next 3 months
+    three_months_later = today + relativedelta(months=3)
+    df['Upcoming Recertification'] = df['Re-certify Due Date'].apply(lambda x: 1 if today <= pd.to_datetime(x, format='%d-%m-%Y', errors='coerce') <= three_months_later else 0)
+
+    return df
@@ -0,0 +1,23 @@
+import pytest
+
+from adr_report.cli import main
+from adr_report.generate_corpus import generate
+
+
+@pytest.fixture(scope='session')
+def corpus(tmp_path_factory):
+    """
+    A small synthetic ADR tree (see generate_corpus), shared by every test
+    that only reads it.
+    """
+    root = tmp_path_factory.mktemp('corpus')
+    generate(str(root), 300, seed=1)
+    return root
+
+
+def build(root, output, *options):
+    """
+    Runs adr-report build over root, writing the report to output (without
+    extension).
+    """
+    main(['build', '--root', str(root), '--output', str(output), *options])
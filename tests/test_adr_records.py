@@ -0,0 +1,76 @@
+import json
+import pickle
+
+import pytest
+
+from adr_report import adr_records
+from adr_report.adr_records import (MISSING_VALUE, DeprecatedRecord, FoundationalRecord, ServiceRecord,
+                                     forget_shared_tuples)
+from adr_report.build import parse_markdown
+
+
+def sample_records():
+    return [
+        FoundationalRecord(service_name='Reports', owners=['Jane Doe'], owner_ids=['jane@example.com'],
+                           service_status='Retired', authors=['Raj Patel'], document_status='Approved',
+                           approval_date='01-06-2023',
+                           capabilities=[('Data Services', 'Analytics', ''), ('Data Services', 'Storage', 'Backup')],
+                           data_classification=[('DC-Internal', 'Green'), ('DC-Public', '')],
+                           status_log=[('Approved', 'CRM', '01-06-2023', 'First approval')]),
+        DeprecatedRecord(service_name='Old Reports'),
+        ServiceRecord('Reports', 'Approved', 'Approved for Prod', '01-06-2023'),
+        ServiceRecord(),
+    ]
+
+
+@pytest.mark.parametrize('record', sample_records(), ids=lambda record: type(record).__name__)
+def test_json_and_pickle_round_trips(record):
+    # The cache stores records as JSON; worker processes send them pickled
+    assert type(record).from_json(json.loads(json.dumps(record.to_json()))) == record
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy == record and type(copy) is type(record)
+
+
+def test_round_trips_over_the_corpus(corpus):
+    for folder, file_type in (('foundation-adr', 'foundational'), ('deprecated-adrs', 'deprecated'),
+                              ('service-adr', 'service')):
+        for path in sorted((corpus / folder).iterdir())[:50]:
+            record = parse_markdown(str(path), file_type)
+            assert type(record).from_json(json.loads(json.dumps(record.to_json()))) == record
+
+
+def test_repeated_values_are_shared():
+    first, second = (FoundationalRecord(service_status=''.join(['Re', 'tired']),
+                                        capabilities=[('Data Services', 'Analytics', 'Reporting')],
+                                        status_log=[('Approved', 'CRM', '01-06-2023', '')])
+                     for _ in range(2))
+    assert first.service_status is second.service_status
+    assert first.capabilities[0] is second.capabilities[0]
+    # Log rows are unique to their file; only their strings are shared
+    assert first.status_log[0] is not second.status_log[0]
+    assert first.status_log[0][1] is second.status_log[0][1]
+
+
+def test_forget_shared_tuples():
+    FoundationalRecord(capabilities=[('Data Services', 'Analytics', 'Forgotten')])
+    assert ('Data Services', 'Analytics', 'Forgotten') in adr_records._shared_tuples
+    forget_shared_tuples()
+    assert not adr_records._shared_tuples
+    first, second = (FoundationalRecord(capabilities=[('Data Services', 'Analytics', 'Forgotten')]) for _ in range(2))
+    assert first.capabilities[0] is second.capabilities[0]
+
+
+def test_to_rows():
+    rows = sample_records()[0].to_rows()
+    assert [(row['Cap-Map Level 1'], row['Cap-Map Level 2']) for row in rows] == [
+        ('Analytics', MISSING_VALUE), ('Storage', 'Backup')]
+    # Ratings on the first row only; empty cells get the placeholder
+    assert (rows[0]['DC-Internal'], rows[0]['DC-Public']) == ('Green', MISSING_VALUE)
+    assert (rows[1]['DC-Internal'], rows[1]['DC-Public']) == (MISSING_VALUE, MISSING_VALUE)
+    assert rows[0]['Service Owner Id'] == 'jane@example.com'
+
+    row, = DeprecatedRecord().to_rows()
+    assert row['Service Name'] == MISSING_VALUE and row['Latest Approval date'] == ''
+    assert ServiceRecord('Reports', 'Approved', 'Retired', '01-06-2023').to_row() == {
+        'S-ADR Service Name': 'Reports', 'S-ADR Document Status': 'Approved',
+        'S-ADR Service Status': 'Retired', 'S-ADR Approval Date': '01-06-2023'}
@@ -0,0 +1,14 @@
+import pathlib
+
+from adr_report.benchmark import record_memory
+from adr_report.build import parse_markdown
+from adr_report.config import folder_rules
+
+
+def test_records_take_less_memory_than_parsed_data(corpus):
+    parsed = [(rule.file_type, parse_markdown(str(path), rule.file_type))
+              for rule in folder_rules([str(corpus)])
+              for path in sorted(pathlib.Path(rule.path).iterdir()) if rule.accepts(path.name)]
+    memory = record_memory(parsed)
+    assert memory['record_bytes'] < memory['parsed_data_bytes']
+    assert memory['reduction'] > 0
@@ -0,0 +1,26 @@
+import shutil
+
+import pytest
+
+from conftest import build
+
+
+@pytest.fixture(params=['service only', 'empty'])
+def no_f_adr_root(request, corpus, tmp_path):
+    root = tmp_path / 'adrs'
+    for folder in ('foundation-adr', 'deprecated-adrs', 'service-adr'):
+        (root / folder).mkdir(parents=True)
+    if request.param == 'service only':
+        shutil.copytree(corpus / 'service-adr', root / 'service-adr', dirs_exist_ok=True)
+    return root
+
+
+def test_no_f_adrs_in_memory_and_in_batches(no_f_adr_root, tmp_path):
+    build(no_f_adr_root, tmp_path / 'memory', '--format', 'csv', '--no-cache')
+    build(no_f_adr_root, tmp_path / 'batches', '--format', 'csv', '--no-cache', '--max-memory', '1')
+
+    report = (tmp_path / 'memory.csv').read_text(encoding='utf-8')
+    assert report == (tmp_path / 'batches.csv').read_text(encoding='utf-8')
+    rows = report.splitlines()[1:]
+    assert all(',No f-adr,' in row for row in rows)
+    assert bool(rows) == any((no_f_adr_root / 'service-adr').iterdir())
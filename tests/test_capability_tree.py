@@ -0,0 +1,49 @@
+from adr_report.adr_records import MISSING_VALUE, FoundationalRecord, ServiceRecord
+from adr_report.capability_tree import CapabilityTree
+
+ANALYTICS = ('Data Services', 'Analytics', 'Reporting')
+STORAGE = ('Data Services', 'Storage', 'Backup')
+
+
+def record(name, status, *capabilities, rating='Green'):
+    return FoundationalRecord(service_name=name, service_status=status, capabilities=capabilities,
+                              data_classification=[('DC-Internal', rating)])
+
+
+def tree():
+    return CapabilityTree.from_records({
+        'f/a.md': ('foundational', record('Reports', 'Approved for Prod', ANALYTICS, rating='Red')),
+        'f/b.md': ('foundational', record('Reports', 'Retired', ANALYTICS, STORAGE)),
+        'f/c.md': ('foundational', record('', 'Not Approved', STORAGE)),
+        'f/d.md': ('foundational', record('', 'Approved for Prod', STORAGE, STORAGE)),
+        'f/e.md': ('foundational', None),
+        's/a.md': ('service', ServiceRecord('Reports')),
+    })
+
+
+def test_one_service_per_adr_whatever_its_name():
+    capability_tree = tree()
+    assert len(capability_tree.services) == 4
+    assert capability_tree.services_under('Data Services', 'Analytics') == ['Reports', 'Reports']
+    assert capability_tree.services_under('Data Services', 'Storage') == [MISSING_VALUE, MISSING_VALUE, 'Reports']
+
+    storage = capability_tree.node('Data Services', 'Storage')
+    assert storage.statuses == {'Retired': 1, 'Not Approved': 1, 'Approved for Prod': 1}
+    analytics = capability_tree.node('Data Services', 'Analytics')
+    assert analytics.risk_ratings == {'Red': 1, 'Green': 1}
+    assert len(capability_tree.node('Data Services').service_ids) == 4
+
+
+def test_leaves_without_a_status():
+    assert tree().leaves_without('approved for prod') == []
+    assert tree().leaves_without('Retired') == []
+    assert tree().leaves_without('Not Approved') == [ANALYTICS]
+
+
+def test_json_round_trip(tmp_path):
+    capability_tree = tree()
+    capability_tree.write_json(tmp_path / 'tree.json')
+    loaded = CapabilityTree.read_json(tmp_path / 'tree.json')
+    assert loaded.services == capability_tree.services
+    assert loaded.to_json() == capability_tree.to_json()
+    assert loaded.to_frame().equals(capability_tree.to_frame())
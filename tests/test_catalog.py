@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+from adr_report import adr_catalog
+from adr_report.cli import main
+from conftest import build
+
+
+def service_count(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute('SELECT COUNT(*) FROM services').fetchone()[0]
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def catalog(tmp_path, corpus):
+    path = tmp_path / 'catalog.sqlite3'
+    build(corpus, tmp_path / 'report', '--format', 'csv', '--no-cache', '--catalog', str(path))
+    return path
+
+
+def test_query(catalog, capsys):
+    main(['query', '--catalog', str(catalog), 'capability', 'Data Services'])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith('Service Name\tType\t') and len(lines) > 1
+
+
+def test_query_leaves_another_version_alone(catalog, tmp_path, corpus, monkeypatch):
+    services = service_count(catalog)
+    assert services
+    monkeypatch.setattr(adr_catalog, 'CATALOG_SCHEMA_VERSION', adr_catalog.CATALOG_SCHEMA_VERSION + 1)
+    with pytest.raises(ValueError, match='rebuild it'):
+        main(['query', '--catalog', str(catalog), 'due', '--within', '90'])
+    assert service_count(catalog) == services
+
+    # build --catalog is what migrates it
+    build(corpus, tmp_path / 'report', '--format', 'csv', '--no-cache', '--catalog', str(catalog))
+    assert service_count(catalog) == services
+    main(['query', '--catalog', str(catalog), 'due', '--within', '90'])
+
+
+def test_query_refuses_other_databases(tmp_path):
+    path = tmp_path / 'other.sqlite3'
+    sqlite3.connect(path).close()
+    with pytest.raises(ValueError, match='rebuild it'):
+        adr_catalog.Catalog(str(path), read_only=True)
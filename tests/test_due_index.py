@@ -0,0 +1,73 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from adr_report.due_index import DueDateIndex, add_due_windows, due_window
+from conftest import build
+
+DUE_DATES = ['15-03-2025', '01-01-2000', '31-03-2025', '', '01-04-2025', 'not a date', '15-03-2025', '28-02-2025']
+
+
+def test_rows_between_includes_both_ends():
+    index = DueDateIndex(DUE_DATES)
+    assert index.rows_between(date(2025, 3, 15), date(2025, 3, 31)).tolist() == [0, 6, 2]
+    assert index.rows_between(date(2025, 3, 16), date(2025, 3, 30)).tolist() == []
+    assert index.rows_between(last=date(2025, 3, 15)).tolist() == [7, 0, 6]
+    assert index.rows_between(first=date(2025, 4, 1)).tolist() == [4]
+    # The dummy date, empty cells and unreadable dates are in no window
+    assert sorted(index.rows_between().tolist()) == [0, 2, 4, 6, 7]
+
+
+def test_overdue_and_flags():
+    index = DueDateIndex(DUE_DATES)
+    assert index.overdue(today=date(2025, 3, 15)).tolist() == [7]
+    assert index.overdue(today=date(2025, 3, 16)).tolist() == [7, 0, 6]
+    assert index.flags(date(2025, 3, 31), date(2025, 4, 30)).tolist() == [0, 0, 1, 0, 1, 0, 0, 0]
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('overdue', ('Overdue Recertification', None, date(2024, 11, 29))),
+    ('next-30d', ('Due in next 30 days', date(2024, 11, 30), date(2024, 12, 30))),
+    # A month ahead of the 30th of November ends on the last of February
+    ('next-3m', ('Due in next 3 months', date(2024, 11, 30), date(2025, 2, 28))),
+    ('2025-Q3', ('Due in 2025-Q3', date(2025, 7, 1), date(2025, 9, 30))),
+    ('2024-02', ('Due in 2024-02', date(2024, 2, 1), date(2024, 2, 29))),
+    ('01-07-2025:15-08-2025', ('Due 01-07-2025 to 15-08-2025', date(2025, 7, 1), date(2025, 8, 15))),
+])
+def test_due_window(spec, expected):
+    assert due_window(spec, today=date(2024, 11, 30)) == expected
+
+
+@pytest.mark.parametrize('spec', ['2025-13', '2025-Q5', 'next-3w', 'soon', '2025-07-01:2025-08-01'])
+def test_unknown_due_window(spec):
+    with pytest.raises(ValueError, match='unknown due window'):
+        due_window(spec)
+
+
+def test_add_due_windows():
+    df = pd.DataFrame({'Re-certify Due Date': DUE_DATES})
+    counts = add_due_windows(df, [due_window('2025-03'), due_window('overdue', today=date(2025, 3, 1))])
+    assert counts == {'Due in 2025-03': 3, 'Overdue Recertification': 1}
+    assert df['Due in 2025-03'].tolist() == [1, 0, 1, 0, 0, 0, 1, 0]
+    assert df['Overdue Recertification'].tolist() == [0, 0, 0, 0, 0, 0, 0, 1]
+
+
+def test_due_window_columns_on_the_report(corpus, tmp_path, capsys):
+    build(corpus, tmp_path / 'report', '--format', 'csv', '--no-cache', '--no-rollups',
+          '--due-window', 'overdue', 'next-3m', '2026-Q1')
+    printed = capsys.readouterr().out
+    df = pd.read_csv(tmp_path / 'report.csv', dtype={'Re-certify Due Date': str}, keep_default_na=False)
+
+    today = date.today()
+    for spec in ('overdue', 'next-3m', '2026-Q1'):
+        name, first, last = due_window(spec, today)
+        # The same window checked row by row
+        expected = [int(due != '01-01-2000' and (first is None or first <= day) and day <= last)
+                    for due in df['Re-certify Due Date']
+                    for day in [datetime.strptime(due, '%d-%m-%Y').date()]]
+        assert df[name].tolist() == expected
+        assert f"{name}: {sum(expected)} rows" in printed
+    # S-ADR-only rows are dated by their S-ADR approval, so they can be due too
+    no_f_adr = df[df['ADR Document Status'] == 'No f-adr']
+    assert (no_f_adr['Re-certify Due Date'] != '01-01-2000').any()
@@ -0,0 +1,38 @@
+import re
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from conftest import build
+
+
+def read_sheets(path):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    sheets = {sheet.title: [list(row) for row in sheet.iter_rows(values_only=True)] for sheet in workbook}
+    workbook.close()
+    return sheets
+
+
+@pytest.mark.parametrize('options', [(), ('--due-window', 'overdue', 'next-3m'), ('--person-ids',)],
+                         ids=['plain', 'due-windows', 'person-ids'])
+def test_batches_give_the_in_memory_report(corpus, tmp_path, capsys, options):
+    pytest.importorskip('pyarrow')
+    formats = ('--format', 'xlsx', 'csv', 'parquet')
+    build(corpus, tmp_path / 'memory', *formats, '--no-cache', *options)
+    capsys.readouterr()
+    build(corpus, tmp_path / 'batches', *formats, '--no-cache', '--max-memory', '1', *options)
+    batches = int(re.search(r'Report built in (\d+) batches', capsys.readouterr().out).group(1))
+    assert batches > 1
+
+    assert (tmp_path / 'batches.csv').read_bytes() == (tmp_path / 'memory.csv').read_bytes()
+    assert_frame_equal(pd.read_parquet(tmp_path / 'batches.parquet'), pd.read_parquet(tmp_path / 'memory.parquet'))
+    for index in ('capability-tree.json', 'people.json'):
+        assert (tmp_path / f'batches-{index}').read_bytes() == (tmp_path / f'memory-{index}').read_bytes()
+
+    memory, batched = read_sheets(tmp_path / 'memory.xlsx'), read_sheets(tmp_path / 'batches.xlsx')
+    # The other rollups need the whole table, so batches leave them out
+    assert list(batched) == ['F-ADR', 'Capability Tree', 'People']
+    for sheet_name in batched:
+        assert batched[sheet_name] == memory[sheet_name]
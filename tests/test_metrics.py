@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+from adr_report.metrics import LATENCY_BUCKETS, Metrics
+from conftest import build
+
+
+def read_prometheus(path):
+    # 'name{labels}' -> value, without the HELP and TYPE lines
+    samples = {}
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                samples[name] = float(value)
+    return samples
+
+
+def test_metrics_files(corpus, tmp_path, capsys):
+    build(corpus, tmp_path / 'report', '--format', 'csv', '--no-cache', '--slowest', '3',
+          '--metrics', str(tmp_path / 'metrics.json'), '--prometheus', str(tmp_path / 'metrics.prom'))
+    date_errors = sum(line.startswith('Error while calculating Re-certify Due Date')
+                      for line in capsys.readouterr().out.splitlines())
+    metrics = json.loads((tmp_path / 'metrics.json').read_text(encoding='utf-8'))
+    file_count = sum(name.endswith('.md') for _, _, names in os.walk(corpus) for name in names)
+
+    assert {'discovery', 'parse_and_shape', 'build_table', 'sadr_merge', 'rollups', 'write_csv'} <= metrics['stages'].keys()
+    assert metrics['total_seconds'] == sum(metrics['stages'].values())
+    assert metrics['files'] == {'deprecated/parsed': 30, 'foundational/parsed': 180, 'service/parsed': 90}
+    assert sum(metrics['files'].values()) == file_count
+    assert metrics['errors'] == {'dates': date_errors}
+
+    latency = metrics['file_latency']
+    assert latency['count'] == file_count
+    buckets = list(latency['buckets'].values())
+    assert list(latency['buckets']) == [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf']
+    assert buckets == sorted(buckets) and buckets[-1] == file_count
+    assert latency['p50'] <= latency['p90'] <= latency['p99']
+    slowest = latency['slowest']
+    assert len(slowest) == 3
+    assert [entry['seconds'] for entry in slowest] == sorted((entry['seconds'] for entry in slowest), reverse=True)
+    assert slowest[0]['seconds'] >= latency['p99']
+    assert all(entry['bytes'] == os.path.getsize(entry['file']) for entry in slowest)
+
+    # F-ADRs are read whole; S-ADRs only up to the sections the report uses
+    sizes = metrics['bytes']
+    assert sizes['foundational']['read'] == sizes['foundational']['size']
+    assert 0 < sizes['service']['read'] < sizes['service']['size']
+
+    samples = read_prometheus(tmp_path / 'metrics.prom')
+    for stage, seconds in metrics['stages'].items():
+        assert samples[f'adr_report_stage_seconds{{stage="{stage}"}}'] == round(seconds, 6)
+    assert samples['adr_report_files{file_type="foundational",source="parsed"}'] == 180
+    assert samples['adr_report_errors{stage="dates"}'] == date_errors
+    assert samples['adr_report_read_bytes{file_type="service"}'] == sizes['service']['read']
+    assert samples['adr_report_file_seconds_bucket{le="+Inf"}'] == samples['adr_report_file_seconds_count'] == file_count
+    assert not os.path.exists(tmp_path / 'metrics.prom.tmp')
+
+
+def test_cached_files_are_counted_as_cached(corpus, tmp_path):
+    options = ('--format', 'csv', '--no-rollups', '--cache-dir', str(tmp_path / 'cache'),
+               '--metrics', str(tmp_path / 'metrics.json'))
+    build(corpus, tmp_path / 'report', *options)
+    build(corpus, tmp_path / 'report', *options)
+    metrics = json.loads((tmp_path / 'metrics.json').read_text(encoding='utf-8'))
+    assert metrics['files'] == {'deprecated/cached': 30, 'foundational/cached': 180, 'service/cached': 90}
+    # Nothing was parsed, so nothing was read
+    assert metrics['bytes'] == {}
+
+
+def test_latency_buckets_and_percentiles():
+    metrics = Metrics(slowest=2)
+    for seconds in (0.0001, 0.002, 0.002, 0.3, 5.0):
+        metrics.record_file(f'{seconds}.md', 'foundational', seconds, 100, bytes_read=100)
+    latency = metrics.to_dict()['file_latency']
+    assert latency['buckets']['0.0005'] == 1
+    assert latency['buckets']['0.0025'] == 3
+    assert latency['buckets']['0.25'] == 3 and latency['buckets']['0.5'] == 4
+    assert latency['buckets']['1.0'] == 4 and latency['buckets']['+Inf'] == 5
+    assert latency['p50'] == 0.002 and latency['p99'] == 5.0
+    assert [entry['file'] for entry in latency['slowest']] == ['5.0.md', '0.3.md']
+    assert latency['count'] == 5 and latency['sum'] == pytest.approx(5.3041)
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+
+import pytest
+
+from adr_report import parse_cache
+from adr_report.build import parse_markdown
+from adr_report.parse_cache import ParseCache
+from conftest import build
+
+ADR = "---\ntitle: {title}\n---\n## Service Status\n| Service Status |\n|---|\n| Retired |\n"
+
+
+@pytest.fixture
+def adr(tmp_path):
+    path = tmp_path / 'adr.md'
+    path.write_text(ADR.format(title='First'), encoding='utf-8')
+    return str(path)
+
+
+def cache_run(cache_dir, file_path, file_type='foundational'):
+    """
+    What a build does with one file: the cached record, or a fresh parse
+    that is stored. Returns the record and whether it was a hit.
+    """
+    cache = ParseCache(cache_dir)
+    try:
+        record = cache.lookup(file_path, file_type)
+        if record is not None:
+            return record, True
+        io_stats = {}
+        record = parse_markdown(file_path, file_type, io_stats=io_stats, hashed=True)
+        cache.store(file_path, file_type, record, io_stats['fingerprint'])
+        return record, False
+    finally:
+        cache.close()
+
+
+def test_unchanged_file_is_a_hit(tmp_path, adr):
+    first, hit = cache_run(tmp_path / 'cache', adr)
+    assert not hit
+    second, hit = cache_run(tmp_path / 'cache', adr)
+    assert hit and second == first
+
+
+def test_new_file_is_a_miss_without_being_read(tmp_path, adr, monkeypatch):
+    def read(data):
+        raise AssertionError("lookup hashed a file it has no row for")
+    monkeypatch.setattr(parse_cache, 'content_hash', read)
+    cache = ParseCache(tmp_path / 'cache')
+    assert cache.lookup(adr, 'foundational') is None
+    cache.close()
+
+
+def test_touched_but_unedited_file_is_a_hit(tmp_path, adr):
+    cache_run(tmp_path / 'cache', adr)
+    stat = os.stat(adr)
+    os.utime(adr, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache_run(tmp_path / 'cache', adr)[1]
+
+
+def test_edited_file_is_parsed_again(tmp_path, adr):
+    cache_run(tmp_path / 'cache', adr)
+    stat = os.stat(adr)
+    # Same size and mtime, different content: only the hash can tell
+    with open(adr, 'w', encoding='utf-8') as file:
+        file.write(ADR.format(title='Other'))
+    os.utime(adr, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    # Stat unchanged, so the cache isn't asked to hash it
+    assert cache_run(tmp_path / 'cache', adr)[0].service_name == 'First'
+    with open(adr, 'a', encoding='utf-8') as file:
+        file.write('\n')
+    record, hit = cache_run(tmp_path / 'cache', adr)
+    assert not hit and record.service_name == 'Other'
+
+
+def test_file_type_is_part_of_the_key(tmp_path, adr):
+    cache_run(tmp_path / 'cache', adr)
+    record, hit = cache_run(tmp_path / 'cache', adr, 'deprecated')
+    assert not hit and type(record).__name__ == 'DeprecatedRecord'
+
+
+def test_new_schema_version_drops_the_cache(tmp_path, adr, monkeypatch):
+    cache_run(tmp_path / 'cache', adr)
+    monkeypatch.setattr(parse_cache, 'CACHE_SCHEMA_VERSION', parse_cache.CACHE_SCHEMA_VERSION + 1)
+    assert not cache_run(tmp_path / 'cache', adr)[1]
+    connection = sqlite3.connect(tmp_path / 'cache' / 'parse-cache.sqlite3')
+    assert connection.execute('SELECT COUNT(*) FROM parsed').fetchone() == (1,)
+
+
+def test_retain_forget_and_revision(tmp_path, adr):
+    other = tmp_path / 'other.md'
+    other.write_text(ADR.format(title='Other'), encoding='utf-8')
+    cache_run(tmp_path / 'cache', adr)
+    cache_run(tmp_path / 'cache', str(other))
+
+    cache = ParseCache(tmp_path / 'cache')
+    assert cache.load(adr, 'foundational').service_name == 'First'
+    cache.retain([adr])
+    assert cache.load(str(other), 'foundational') is None
+    cache.forget(adr)
+    assert cache.load(adr, 'foundational') is None
+
+    assert cache.revision is None
+    cache.set_revision('abc123')
+    cache.close()
+    cache = ParseCache(tmp_path / 'cache')
+    assert cache.revision == 'abc123'
+    cache.set_revision(None)
+    assert cache.revision is None
+    cache.close()
+
+
+def test_service_adr_read_part_way(tmp_path, monkeypatch):
+    path = tmp_path / 's-adr-reports.md'
+    path.write_text("---\ntitle: Reports\n---\n\n## Document Status\n\n"
+                    "| Document Status | Service Status | Forum | Approval Date |\n|:--|:--|:--|:--|\n"
+                    "| Approved | Retired | TDA | 01-02-2024 |\n\n## Notes\n\n" + 'Long notes.\n' * 500,
+                    encoding='utf-8')
+    record, hit = cache_run(tmp_path / 'cache', str(path), 'service')
+    assert not hit and record.service_status == 'Retired'
+    # Stored without a hash, as only the top of the file was read; still a
+    # hit while the stat is the same, and a miss without a read once not
+    assert cache_run(tmp_path / 'cache', str(path), 'service')[1]
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    monkeypatch.setattr(parse_cache, 'content_hash', lambda data: pytest.fail("lookup read the file"))
+    cache = ParseCache(tmp_path / 'cache')
+    assert cache.lookup(str(path), 'service') is None
+    cache.close()
+
+
+def test_build_stores_what_the_workers_parsed(tmp_path, corpus):
+    build(corpus, tmp_path / 'first', '--format', 'csv', '--workers', '2', '--cache-dir', str(tmp_path / 'cache'))
+    cache = ParseCache(tmp_path / 'cache')
+    hashes = dict(cache.connection.execute('SELECT file_type, COUNT(hash) FROM parsed GROUP BY file_type').fetchall())
+    files = dict(cache.connection.execute('SELECT file_type, COUNT(*) FROM parsed GROUP BY file_type').fetchall())
+    cache.close()
+    # F-ADRs are read whole, so every one has its hash
+    assert hashes['foundational'] == files['foundational']
+
+    build(corpus, tmp_path / 'second', '--format', 'csv', '--cache-dir', str(tmp_path / 'cache'))
+    cache = ParseCache(tmp_path / 'cache')
+    assert [cache.lookup(str(path), 'foundational') is not None
+            for path in sorted((corpus / 'foundation-adr').iterdir())] == [True] * files['foundational']
+    cache.close()
+    assert (tmp_path / 'first.csv').read_bytes() == (tmp_path / 'second.csv').read_bytes()
@@ -0,0 +1,87 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from adr_report.adr_records import MISSING_VALUE, FoundationalRecord, ServiceRecord
+from adr_report.build import PERSON_ID_COLUMNS
+from adr_report.people import PeopleIndex, normalize_email, split_entry
+from conftest import build
+
+TODAY = date(2024, 1, 1)
+
+
+def record(name, status, approval_date, owners=(), authors=()):
+    return FoundationalRecord(service_name=name, service_status=status, approval_date=approval_date,
+                              owners=[owner for owner, _ in owners], owner_ids=[email for _, email in owners],
+                              authors=authors)
+
+
+def index():
+    jane = ('Jane Doe', 'Jane.Doe@Example.com')
+    return PeopleIndex.from_records({
+        'f/a.md': ('foundational', record('Reports', 'Approved for Prod', '01-06-2023', [jane])),
+        'f/b.md': ('foundational', record('Reports', 'Retired', '01-01-2023', [jane], ['Raj Patel'])),
+        'f/c.md': ('foundational', record('', 'Not Approved', '15-02-2023', authors=['<jane.doe@example.com>'])),
+        'f/d.md': ('foundational', record('', 'Draft', 'TBD', [('Raj Patel', 'raj@example.com')])),
+        's/a.md': ('service', ServiceRecord('Reports')),
+    })
+
+
+def test_people_are_keyed_by_normalized_email():
+    assert normalize_email(' <MAILTO:Jane.Doe@Example.COM> ') == 'jane.doe@example.com'
+    assert split_entry('Jane Doe <jane@example.com>') == ('Jane Doe', 'jane@example.com')
+    assert split_entry('jane@example.com') == ('', 'jane@example.com')
+
+    people = index()
+    assert [(person.name, person.email) for person in people.people] == [
+        ('Jane Doe', 'jane.doe@example.com'), ('Raj Patel', 'raj@example.com')]
+    assert people.find('JANE.DOE@example.com') == people.find('jane doe') == [0]
+
+
+def test_one_service_per_adr_whatever_its_name():
+    people = index()
+    assert len(people.services) == 4
+    jane, raj = people.find('jane doe')[0], people.find('Raj Patel')[0]
+    assert people.services_of(jane) == [('Reports', ['owner']), ('Reports', ['owner']), (MISSING_VALUE, ['author'])]
+    assert people.services_of(raj) == [('Reports', ['author']), (MISSING_VALUE, ['owner'])]
+
+    due = people.recertifications(jane, today=TODAY)
+    assert [(day.isoformat(), name, status, path) for day, name, status, _, path in due] == [
+        ('2023-11-01', 'Reports', 'Retired', 'f/b.md'),
+        ('2023-12-15', MISSING_VALUE, 'Not Approved', 'f/c.md'),
+        ('2024-04-01', 'Reports', 'Approved for Prod', 'f/a.md'),
+    ]
+    assert len(people.recertifications(jane, overdue=True, today=TODAY)) == 2
+    # TBD has no due date
+    assert people.recertifications(raj, today=TODAY)[0][4] == 'f/b.md'
+
+
+def test_json_round_trip(tmp_path):
+    people = index()
+    people.write_json(tmp_path / 'people.json')
+    loaded = PeopleIndex.read_json(tmp_path / 'people.json')
+    assert loaded.to_json() == people.to_json()
+    assert loaded.to_frame(today=TODAY).equals(people.to_frame(today=TODAY))
+    jane = loaded.find('jane.doe@example.com')[0]
+    assert loaded.recertifications(jane, today=TODAY) == people.recertifications(jane, today=TODAY)
+
+
+@pytest.mark.parametrize('options', [(), ('--max-memory', '1')], ids=['in-memory', 'max-memory'])
+def test_person_ids_on_the_report(tmp_path, corpus, options):
+    build(corpus, tmp_path / 'names', '--format', 'csv', '--no-cache', *options)
+    build(corpus, tmp_path / 'ids', '--format', 'csv', '--no-cache', '--person-ids', *options)
+    names = pd.read_csv(tmp_path / 'names.csv', index_col=0, dtype=str, keep_default_na=False)
+    ids = pd.read_csv(tmp_path / 'ids.csv', index_col=0, dtype=str, keep_default_na=False)
+    people = PeopleIndex.read_json(tmp_path / 'ids-people.json').people
+
+    assert list(ids.columns) == [PERSON_ID_COLUMNS.get(column, column) for column in names.columns
+                                 if column != 'Service Owner Id']
+    assert ids.drop(columns=['Owner IDs', 'Author IDs']).equals(
+        names.drop(columns=['Service Owner', 'Service Owner Id', 'ADR Authors']))
+    for owner_ids, owner_names in zip(ids['Owner IDs'], names['Service Owner']):
+        if owner_ids not in ('NA', MISSING_VALUE):
+            # Names as first written for each person, so compare case-blind
+            assert ', '.join(people[int(person_id)].name for person_id in owner_ids.split(', ')).casefold() \
+                == ' '.join(owner_names.split()).casefold()
+    assert (tmp_path / 'ids.csv').stat().st_size < (tmp_path / 'names.csv').stat().st_size
@@ -0,0 +1,74 @@
+import contextlib
+import io
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from adr_report.recert_dates import recertification_columns
+
+import baseline_recert
+
+TODAY = datetime(2026, 10, 17, 9, 30)
+
+ODD_DATES = [
+    '', 'TBD', 'dd-mm-yyyy', '00-00-0000', 'N/A', '2024-01-31', '31/01/2024', '31-1-2024', '1-2-2024',
+    ' 01-02-2024', '01-02-2024 ', '32-01-2024', '29-02-2023', '29-02-2024', '31-04-2024', '00-01-2024',
+    '01-13-2024', '01-01-0001', '01-01-2261', '31-05-2261', '01-06-2261', '01-01-2262', '11-04-2262',
+    '31-12-9999', '01-01-10000',
+]
+
+
+def approval_dates(count, seed=0):
+    """
+    count approval date strings: mostly valid dates around today, with
+    month ends (where adding 10 months has to clamp), placeholders and
+    malformed strings mixed in.
+    """
+    rng = random.Random(seed)
+    month_ends = [(date(year, month % 12 + 1, 1) - timedelta(days=1)).strftime('%d-%m-%Y')
+                  for year in range(2015, 2030) for month in range(1, 13)]
+    dates = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            day = date(2015, 1, 1) + timedelta(days=rng.randrange(15 * 365))
+            dates.append(day.strftime('%d-%m-%Y'))
+        elif kind < 0.8:
+            dates.append(rng.choice(month_ends))
+        else:
+            dates.append(rng.choice(ODD_DATES))
+    return dates
+
+
+def baseline_columns(dates):
+    rows = []
+    messages = []
+    for approval_date in dates:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            row = baseline_recert.process_f_adr_dates({'Latest Approval date': approval_date}, TODAY)
+        rows.append(row.iloc[0].tolist())
+        messages.append(output.getvalue().rstrip('\n') or None)
+    return rows, messages
+
+
+@pytest.mark.filterwarnings('ignore::FutureWarning')  # the old code's applymap
+def test_same_as_the_per_row_code():
+    dates = approval_dates(3000) + ODD_DATES
+    expected_rows, expected_messages = baseline_columns(dates)
+
+    columns, errors = recertification_columns(dates, today=TODAY)
+    rows = columns[['Latest Approval date', 'Re-certify Due Date', 'Re-certify Due Month',
+                    'Upcoming Recertification']].values.tolist()
+    assert rows == expected_rows
+    assert errors.tolist() == expected_messages
+    # The sample has to hit every path
+    assert {row[-1] for row in rows} == {0, 1}
+    assert sum(message is not None for message in expected_messages) > 100
+
+
+def test_month_end_due_dates():
+    columns, errors = recertification_columns(['31-03-2024', '30-04-2023', '31-12-2024'], today=TODAY)
+    assert columns['Re-certify Due Date'].tolist() == ['31-01-2025', '29-02-2024', '31-10-2025']
+    assert errors.isna().all()
@@ -0,0 +1,55 @@
+import shutil
+
+import pytest
+
+from adr_report.report_diff import diff_runs, load_run
+
+from conftest import build
+
+
+@pytest.fixture(scope='module')
+def reports(corpus, tmp_path_factory):
+    output = tmp_path_factory.mktemp('reports') / 'report'
+    build(corpus, output, '--format', 'xlsx', 'csv', 'parquet', '--due-window', 'next-3m',
+          '--cache-dir', str(output.parent / 'cache'))
+    return output
+
+
+@pytest.mark.parametrize('old, new', [('.xlsx', '.csv'), ('.xlsx', '.parquet'), ('.csv', '.parquet'),
+                                      ('.csv', 'cache'), ('.xlsx', 'cache')])
+def test_one_run_in_two_formats_has_no_changes(reports, old, new):
+    def path(form):
+        return str(reports.parent / 'cache') if form == 'cache' else f"{reports}{form}"
+
+    # The parse cache knows nothing of the run's --due-window columns
+    old_df = load_run(path(old))
+    delta = diff_runs(old_df, load_run(path(new)), ignore=['Due in next 3 months'] if new == 'cache' else ())
+    assert delta['summary']['rows'] == {'added': 0, 'removed': 0, 'changed': 0, 'unchanged': len(old_df)}
+    assert delta['rows'] == []
+
+
+def test_edits_show_up_as_changed_added_and_removed_rows(corpus, tmp_path):
+    root = tmp_path / 'corpus'
+    shutil.copytree(corpus, root)
+    build(root, tmp_path / 'old', '--format', 'csv', '--no-cache', '--no-rollups')
+
+    edited = root / 'foundation-adr' / 'f-adr-000000.md'
+    text = edited.read_text(encoding='utf-8')
+    edited.write_text(text.replace('title: Service 000000', 'title: Service 999999'), encoding='utf-8')
+    build(root, tmp_path / 'new', '--format', 'csv', '--no-cache', '--no-rollups')
+
+    delta = diff_runs(load_run(f"{tmp_path / 'old'}.csv"), load_run(f"{tmp_path / 'new'}.csv"))
+    assert 'Service 999999' in delta['added_services']
+    assert 'Service 000000' in delta['removed_services']
+    assert delta['summary']['rows']['changed'] == 0
+
+
+def test_numbers_compare_by_value():
+    import pandas as pd
+    from adr_report.report_diff import normalize_numbers
+
+    df = normalize_numbers(pd.DataFrame({'Service Name': ['a', 'b', 'c'], 'Score': ['1', '0.25', ''],
+                                         'Date': ['01-02-2024', '1', '']}))
+    assert list(df['Score']) == ['1', '0.25', '']
+    assert list(df['Date']) == ['01-02-2024', '1', '']
+    assert list(normalize_numbers(pd.DataFrame({'Score': ['1.0', '0.250']}))['Score']) == ['1', '0.25']
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from adr_report.report_writers import stream_report, write_report
+
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({
+        'Service Name': ['Billing', '=SUM(A1:A2)', 'Reports'],
+        'Service Owner': ['Ann <ann@example.com>', 'https://example.com/owner', np.nan],
+        'Upcoming Recertification': [1, 0, 1],
+    }, index=pd.RangeIndex(1, 4, name='SL No.'))
+
+
+@pytest.fixture
+def rollups():
+    return {'By Owner': pd.DataFrame({'Service Owner': ['Ann'], 'Services': [2]})}
+
+
+def read_sheets(path):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    sheets = {sheet.title: [list(row) for row in sheet.iter_rows(values_only=True)] for sheet in workbook}
+    workbook.close()
+    return sheets
+
+
+def test_every_format_holds_the_table(table, rollups, tmp_path):
+    pytest.importorskip('pyarrow')
+    pytest.importorskip('xlsxwriter')
+    paths = write_report(table, str(tmp_path / 'report'), ['xlsx', 'csv', 'parquet'], extra_sheets=rollups)
+    assert paths == [str(tmp_path / f'report.{extension}') for extension in ('xlsx', 'csv', 'parquet')]
+
+    parquet = pd.read_parquet(tmp_path / 'report.parquet')
+    assert_frame_equal(parquet.drop(columns='Service Owner'), table.drop(columns='Service Owner'))
+    # Strings come back from Parquet with None for the empty cells
+    assert parquet['Service Owner'].tolist() == ['Ann <ann@example.com>', 'https://example.com/owner', None]
+    assert_frame_equal(pd.read_csv(tmp_path / 'report.csv', index_col='SL No.'), table)
+    assert_frame_equal(pd.read_csv(tmp_path / 'report-by-owner.csv'), rollups['By Owner'])
+    assert_frame_equal(pd.read_parquet(tmp_path / 'report-by-owner.parquet'), rollups['By Owner'])
+
+    sheets = read_sheets(tmp_path / 'report.xlsx')
+    assert list(sheets) == ['F-ADR', 'By Owner']
+    assert sheets['F-ADR'] == [
+        ['SL No.', 'Service Name', 'Service Owner', 'Upcoming Recertification'],
+        [1, 'Billing', 'Ann <ann@example.com>', 1],
+        # Written as text, not as a formula or a link; empty cells stay empty
+        [2, '=SUM(A1:A2)', 'https://example.com/owner', 0],
+        [3, 'Reports', None, 1],
+    ]
+    assert sheets['By Owner'] == [['Service Owner', 'Services'], ['Ann', 2]]
+
+
+def test_streamed_report_equals_the_in_memory_one(table, rollups, tmp_path):
+    pytest.importorskip('pyarrow')
+    pytest.importorskip('xlsxwriter')
+    formats = ['xlsx', 'csv', 'parquet']
+    write_report(table, str(tmp_path / 'memory'), formats, extra_sheets=rollups)
+    stream_report([table.iloc[:2], table.iloc[2:]], str(tmp_path / 'stream'), formats, list(table.columns),
+                  index_name='SL No.', extra_sheets=rollups)
+
+    assert (tmp_path / 'stream.csv').read_bytes() == (tmp_path / 'memory.csv').read_bytes()
+    assert (tmp_path / 'stream-by-owner.csv').read_bytes() == (tmp_path / 'memory-by-owner.csv').read_bytes()
+    assert_frame_equal(pd.read_parquet(tmp_path / 'stream.parquet'), pd.read_parquet(tmp_path / 'memory.parquet'))
+    assert read_sheets(tmp_path / 'stream.xlsx') == read_sheets(tmp_path / 'memory.xlsx')
+
+
+def test_stream_without_batches_writes_the_header(table, tmp_path):
+    pytest.importorskip('pyarrow')
+    pytest.importorskip('xlsxwriter')
+    stream_report([], str(tmp_path / 'empty'), ['xlsx', 'csv', 'parquet'], list(table.columns), index_name='SL No.')
+    assert (tmp_path / 'empty.csv').read_text(encoding='utf-8').splitlines() == [
+        'SL No.,Service Name,Service Owner,Upcoming Recertification']
+    assert read_sheets(tmp_path / 'empty.xlsx') == {'F-ADR': [['SL No.', *table.columns]]}
+    empty = pd.read_parquet(tmp_path / 'empty.parquet')
+    assert list(empty.columns) == list(table.columns) and empty.empty
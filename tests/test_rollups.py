@@ -0,0 +1,99 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from adr_report.rollups import build_rollups
+from conftest import build
+
+
+@pytest.fixture
+def report():
+    nan = np.nan
+    return pd.DataFrame({
+        'Service Name': ['Billing', 'Billing', 'Reports', 'Search'],
+        'Service Owner': ['Ann, Bob', 'Ann, Bob', 'Bob', 'NA'],
+        'Service Status': ['Active', 'Active', 'Retired', 'Active'],
+        'Cap-Map Level 0': ['Data', 'Data', nan, nan],
+        'Cap-Map Level 1': ['Store', 'Query', nan, nan],
+        'Cap-Map Level 2': ['SQL', 'SQL', nan, nan],
+        'DC-PII': ['amber ', 'Check with CPA team', 'Red', nan],
+        'DC-PCI': ['Green', 'Check with CPA team', nan, nan],
+        'Re-certify Due Date': ['15-03-2025', '15-03-2025', '01-01-2000', '20-01-2025'],
+        'Re-certify Due Month': ['Mar', 'Mar', 'Jan', 'Jan'],
+        'Upcoming Recertification': [1, 1, 0, 0],
+    })
+
+
+def records(df):
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def test_rollup_counts(report):
+    rollups = build_rollups(report)
+    assert list(rollups) == ['By Capability', 'By Service Status', 'By Due Month', 'By Owner', 'By Risk Rating']
+    assert records(rollups['By Capability']) == [
+        {'Cap-Map Level 0': 'Data', 'Cap-Map Level 1': 'Query', 'Cap-Map Level 2': 'SQL', 'Rows': 1, 'Services': 1},
+        {'Cap-Map Level 0': 'Data', 'Cap-Map Level 1': 'Store', 'Cap-Map Level 2': 'SQL', 'Rows': 1, 'Services': 1},
+        # Rows without a capability are counted too
+        {'Cap-Map Level 0': None, 'Cap-Map Level 1': None, 'Cap-Map Level 2': None, 'Rows': 2, 'Services': 2},
+    ]
+    assert records(rollups['By Service Status']) == [
+        {'Service Status': 'Active', 'Rows': 3, 'Services': 2},
+        {'Service Status': 'Retired', 'Rows': 1, 'Services': 1},
+    ]
+    # The dummy due date is not January; months come in calendar order
+    assert records(rollups['By Due Month']) == [
+        {'Re-certify Due Month': 'Jan', 'Rows': 1, 'Services': 1, 'Upcoming Recertification': 0},
+        {'Re-certify Due Month': 'Mar', 'Rows': 2, 'Services': 1, 'Upcoming Recertification': 2},
+        {'Re-certify Due Month': 'No date', 'Rows': 1, 'Services': 1, 'Upcoming Recertification': 0},
+    ]
+    # Co-owners count once each
+    assert records(rollups['By Owner']) == [
+        {'Service Owner': 'Ann', 'Rows': 2, 'Services': 1},
+        {'Service Owner': 'Bob', 'Rows': 3, 'Services': 2},
+        {'Service Owner': 'NA', 'Rows': 1, 'Services': 1},
+    ]
+    # Ratings are matched case- and space-insensitively; the highest wins
+    assert records(rollups['By Risk Rating']) == [
+        {'Highest Risk Rating': 'Not rated', 'Services': 1},
+        {'Highest Risk Rating': 'Green', 'Services': 0},
+        {'Highest Risk Rating': 'Amber', 'Services': 1},
+        {'Highest Risk Rating': 'Red', 'Services': 1},
+    ]
+
+
+def test_rollups_by_person_id(report):
+    by_ids = report.rename(columns={'Service Owner': 'Owner IDs'})
+    by_ids['Owner IDs'] = ['0, 1', '0, 1', '1', 'NA']
+    assert records(build_rollups(by_ids)['By Owner']) == [
+        {'Owner IDs': '0', 'Rows': 2, 'Services': 1},
+        {'Owner IDs': '1', 'Rows': 3, 'Services': 2},
+        {'Owner IDs': 'NA', 'Rows': 1, 'Services': 1},
+    ]
+
+
+def test_no_rollups_for_an_empty_report():
+    assert build_rollups(pd.DataFrame()) == {}
+
+
+def test_rollup_files_add_up_to_the_report(corpus, tmp_path):
+    build(corpus, tmp_path / 'report', '--format', 'csv', '--no-cache')
+    df = pd.read_csv(tmp_path / 'report.csv', keep_default_na=False)
+
+    def rollup(name):
+        return pd.read_csv(tmp_path / f'report-{name}.csv', keep_default_na=False)
+
+    by_status = rollup('by-service-status')
+    assert dict(zip(by_status['Service Status'], by_status['Rows'])) == Counter(df['Service Status'])
+    assert rollup('by-due-month')['Rows'].sum() == len(df)
+    assert rollup('by-capability')['Rows'].sum() == len(df)
+    owner_rows = Counter(owner for owners in df['Service Owner'] for owner in owners.split(', '))
+    by_owner = rollup('by-owner')
+    assert dict(zip(by_owner['Service Owner'], by_owner['Rows'])) == owner_rows
+    assert rollup('by-risk-rating')['Services'].sum() == df['Service Name'].nunique()
+
+    build(corpus, tmp_path / 'plain', '--format', 'csv', '--no-cache', '--no-rollups')
+    assert sorted(path.name for path in tmp_path.glob('plain*')) == [
+        'plain-capability-tree.json', 'plain-people.json', 'plain.csv']
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pandas as pd
+
+from adr_report.adr_records import ServiceRecord
+from adr_report.build import merge_sadr_data
+
+
+def sadr_data(*records):
+    return {record.service_name: record.to_row() for record in records}
+
+
+def f_adr_table():
+    # Service1 is mapped to two capabilities, so it has two rows
+    return pd.DataFrame({
+        'Service Name': ['Service1', 'Service1', 'Service3'],
+        'Service Owner': ['Owner1', 'Owner1', 'Owner2'],
+        'Service Status': ['Active', 'Active', 'Inactive'],
+        'ADR Document Status': ['Approved', 'Approved', 'Pending'],
+        'Latest Approval date': ['15-05-2022', '15-05-2022', '01-01-2020'],
+        'Re-certify Due Date': ['15-03-2023', '15-03-2023', '01-11-2020'],
+        'Re-certify Due Month': ['Mar', 'Mar', 'Nov'],
+        'Upcoming Recertification': [0, 0, 0],
+    })
+
+
+def test_every_row_of_a_matching_service_gets_its_s_adr():
+    df = merge_sadr_data(f_adr_table(), sadr_data(ServiceRecord('Service1', 'Approved', 'Active', '15-05-2022')))
+
+    assert len(df) == 3
+    assert list(df['S-ADR Document Status'].iloc[:2]) == ['Approved', 'Approved']
+    assert list(df['S-ADR Match'])[:2] == ['exact', 'exact']
+    assert pd.isna(df['S-ADR Document Status'].iloc[2])
+
+
+def test_s_adrs_without_an_f_adr_are_added_once_each():
+    df = merge_sadr_data(f_adr_table(), sadr_data(ServiceRecord('Service1', 'Approved', 'Active', '15-05-2022'),
+                                                  ServiceRecord('Service2', 'Not Approved', 'Inactive', '20-07-2021'),
+                                                  ServiceRecord('Service4', 'Draft', 'Inactive', 'TBD')),
+                         today=datetime(2022, 4, 1))
+
+    added = df.iloc[3:].set_index('Service Name')
+    assert list(added.index) == ['Service2', 'Service4']
+    assert set(added['ADR Document Status']) == {'No f-adr'}
+    assert added.loc['Service2', 'Service Status'] == 'Inactive'
+    assert added.loc['Service2', 'S-ADR Approval Date'] == '20-07-2021'
+    assert added.loc['Service2', 'Re-certify Due Date'] == '20-05-2022'
+    assert added.loc['Service2', 'Re-certify Due Month'] == 'May'
+    assert added.loc['Service2', 'Upcoming Recertification'] == 1
+    # No usable date: the dummy date, like an F-ADR without one
+    assert added.loc['Service4', 'Re-certify Due Date'] == '01-01-2000'
+
+
+def test_nothing_to_join():
+    assert merge_sadr_data(f_adr_table(), {}).equals(f_adr_table())
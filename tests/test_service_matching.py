@@ -0,0 +1,58 @@
+from adr_report.service_matching import LiveMatcher, ServiceMatcher, normalize_name, similarity
+
+
+def test_normalize_name():
+    assert normalize_name('Google Cloud  Pub/Sub') == normalize_name('pub-sub') == 'pub sub'
+    # A name that is only a vendor word keeps it
+    assert normalize_name('Cloud') == 'cloud'
+
+
+def test_numbers_must_agree():
+    assert similarity('service 11', 'service 12') == 0.0
+    assert similarity('data catalogue 2', 'data catalog 2') > 0.9
+
+
+def test_exact_then_normalized_then_fuzzy():
+    matcher = ServiceMatcher(['BigQuery', 'Pub/Sub', 'Data Catalogue', 'Cloud Storage'])
+    matches = matcher.match_all(['BigQuery', 'Google Cloud Pub Sub', 'Data Catalog', 'Dataflow'])
+    assert matches['BigQuery'] == ('BigQuery', 1.0, 'exact')
+    assert matches['Google Cloud Pub Sub'] == ('Pub/Sub', 1.0, 'normalized')
+    name, confidence, method = matches['Data Catalog']
+    assert (name, method) == ('Data Catalogue', 'fuzzy') and 0.9 <= confidence < 1
+    assert 'Dataflow' not in matches
+
+
+def test_threshold():
+    matcher = ServiceMatcher(['Data Catalogue'])
+    assert 'Data Catalog' not in matcher.match_all(['Data Catalog'], threshold=0.99)
+    # Above 1 only case and punctuation may differ
+    assert matcher.match_all(['data-catalogue'], threshold=1.1)['data-catalogue'][2] == 'normalized'
+
+
+def test_each_name_is_matched_once():
+    matcher = ServiceMatcher(['Reports', 'Billing'])
+    matches = matcher.match_all(['reports', 'Reports', 'REPORTS!', 'Billing'])
+    assert matches['Reports'] == ('Reports', 1.0, 'exact')
+    assert matches['Billing'] == ('Billing', 1.0, 'exact')
+    # The exact title wins; the other spellings have no name left
+    assert set(matches) == {'Reports', 'Billing'}
+
+
+def test_best_confidence_wins():
+    matcher = ServiceMatcher(['Data Catalogue'])
+    matches = matcher.match_all(['Data Catalogues', 'data catalogue'])
+    assert matches == {'data catalogue': ('Data Catalogue', 1.0, 'normalized')}
+
+
+def test_live_matcher_follows_renames():
+    names = ['Reports', 'Billing', 'Data Catalogue', 'Pub/Sub']
+    titles = ['reports', 'Data Catalog', 'Google Cloud Pub Sub', 'Billing v2']
+    live = LiveMatcher()
+    assert live.match_all(names, names, titles) == ServiceMatcher(names).match_all(titles)
+
+    renamed = ['Reports', 'Billing v2', 'Data Catalog', 'Pub/Sub', 'Data Catalogue']
+    matches = live.match_all(renamed, ['Billing', 'Billing v2', 'Data Catalogue', 'Data Catalog'], titles)
+    assert matches == ServiceMatcher(renamed).match_all(titles)
+    assert matches['Data Catalog'] == ('Data Catalog', 1.0, 'exact')
+    # Titles no longer listed are forgotten
+    assert live.match_all(renamed, [], titles[:3]) == ServiceMatcher(renamed).match_all(titles[:3])
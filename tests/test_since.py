@@ -0,0 +1,64 @@
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import build
+
+
+def git(root, *args):
+    subprocess.run(['git', '-C', str(root), *args], check=True, capture_output=True)
+
+
+def commit(root, message):
+    git(root, 'add', '-A', '.')
+    git(root, '-c', 'user.name=ADR', '-c', 'user.email=adr@example.com', 'commit', '-q', '-m', message)
+
+
+def retitle(path, title):
+    text = path.read_text(encoding='utf-8').split('\n')
+    text[1] = f"title: {title}"
+    path.write_text('\n'.join(text), encoding='utf-8')
+
+
+@pytest.fixture
+def repo(corpus, tmp_path):
+    if shutil.which('git') is None:
+        pytest.skip("git is not installed")
+    root = tmp_path / 'adrs'
+    shutil.copytree(corpus, root)
+    (root / '.gitignore').write_text('report*\n.adr-cache/\n')
+    git(root, 'init', '-q')
+    commit(root, 'first')
+    return root
+
+
+def since_report(root, rev, *options):
+    build(root, root / 'report', '--format', 'csv', '--no-rollups', '--cache-dir', str(root / '.adr-cache'),
+          '--since', rev, *options)
+    build(root, root / 'reference', '--format', 'csv', '--no-rollups', '--no-cache')
+    return (root / 'report.csv').read_text(encoding='utf-8'), (root / 'reference.csv').read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('options', [(), ('--max-memory', '1')])
+def test_cache_from_another_commit_is_checked(repo, options):
+    build(repo, repo / 'report', '--format', 'csv', '--no-rollups', '--cache-dir', str(repo / '.adr-cache'))
+    retitle(repo / 'foundation-adr' / 'f-adr-000001.md', 'Renamed Service')
+    commit(repo, 'second')
+
+    # The edit is older than HEAD, so git doesn't list it; the cache, from
+    # the first commit, still has the old title
+    report, reference = since_report(repo, 'HEAD', *options)
+    assert report == reference
+    assert 'Renamed Service' in report
+
+
+def test_untracked_files_are_reparsed(repo):
+    new = repo / 'foundation-adr' / 'f-adr-untracked.md'
+    shutil.copy(repo / 'foundation-adr' / 'f-adr-000002.md', new)
+    since_report(repo, 'HEAD')
+    retitle(new, 'Untracked Edit')
+
+    report, reference = since_report(repo, 'HEAD')
+    assert report == reference
+    assert 'Untracked Edit' in report
@@ -0,0 +1,78 @@
+from datetime import date, datetime
+
+import pytest
+
+from adr_report import build as report
+from adr_report.adr_records import FoundationalRecord, ServiceRecord
+from adr_report.config import folder_rules
+from adr_report.status_timeline import StatusTimeline
+
+
+@pytest.fixture
+def timeline():
+    # Each service's log newest first, as the template lists it
+    return StatusTimeline([
+        ('Billing', 'Approved', 'CRM', '01-03-2024', 'Re-certified'),
+        ('Billing', 'Deferred', 'TDA', '01-03-2024', 'Sent back'),
+        ('Billing', 'Approved', 'crm', '15-01-2023', 'First approval'),
+        ('Billing', 'Draft', 'TDA', 'TBD', 'Not dated'),
+        ('Reports', 'Approved', 'TDA', '20-01-2023', 'First approval'),
+    ])
+
+
+def test_status_as_of(timeline):
+    assert timeline.status_as_of(date(2023, 1, 14)) == {}
+    assert timeline.status_as_of(date(2023, 1, 15)) == {
+        'Billing': ('Approved', 'crm', date(2023, 1, 15), 'First approval')}
+    assert timeline.status_as_of(date(2024, 2, 29))['Reports'][0] == 'Approved'
+    # Of two rows on one day, the one listed first is the newer
+    assert timeline.status_as_of(date(2024, 3, 1))['Billing'] == ('Approved', 'CRM', date(2024, 3, 1), 'Re-certified')
+    assert timeline.skipped == 1
+
+
+def test_history_is_oldest_first(timeline):
+    assert [change_summary for *_, change_summary in timeline.history('Billing')] == [
+        'First approval', 'Sent back', 'Re-certified']
+    assert timeline.history('Unknown') == []
+
+
+def test_approvals_per_forum_month(timeline):
+    assert timeline.approvals_per_forum_month() == [
+        ('CRM', '2024-03', 1), ('TDA', '2023-01', 1), ('crm', '2023-01', 1)]
+    assert timeline.approvals_per_forum_month('CRM') == [('CRM', '2024-03', 1), ('crm', '2023-01', 1)]
+    assert timeline.approvals_per_forum_month(first_month='2023-02', last_month='2024-03') == [('CRM', '2024-03', 1)]
+
+
+def test_from_records_skips_service_adrs():
+    records = [
+        ('foundational', FoundationalRecord('Billing', status_log=[('Approved', 'CRM', '01-06-2023', '')])),
+        ('service', ServiceRecord('Billing', 'Approved', 'Active', '01-07-2023')),
+        ('foundational', None),
+    ]
+    timeline = StatusTimeline.from_records(records)
+    assert timeline.history('Billing') == [('Approved', 'CRM', date(2023, 6, 1), '')]
+
+
+def test_status_as_of_matches_a_scan_of_the_logs(corpus):
+    files = [(file_name, file_path, file_type, None)
+             for file_name, file_path, file_type in report.discover_files(folder_rules([str(corpus)]))]
+    records = [(file_type, record) for _, _, file_type, record, _, _, _ in report.process_chunk(files)]
+    timeline = StatusTimeline.from_records(records)
+
+    for day in (date(2019, 6, 1), date(2022, 1, 1), date(2025, 12, 31)):
+        # The log row in effect for each service, by scanning every log
+        expected = {}
+        for file_type, record in records:
+            if record is None or file_type == 'service':
+                continue
+            for status, forum, approval_date, change_summary in record.status_log:
+                try:
+                    entry_day = datetime.strptime(approval_date, '%d-%m-%Y').date()
+                except ValueError:
+                    continue
+                current = expected.get(record.service_name)
+                # Newest first, so a later row on the same day is older
+                if entry_day <= day and (current is None or entry_day > current[2]):
+                    expected[record.service_name] = (status, forum, entry_day, change_summary)
+        assert timeline.status_as_of(day) == expected
+    assert expected
@@ -0,0 +1,127 @@
+import dataclasses
+import shutil
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from adr_report import build as report
+from adr_report.adr_records import ServiceRecord
+from adr_report.config import folder_rules
+from adr_report.due_index import due_window
+from adr_report.live_report import LiveReport
+from adr_report.people import PeopleIndex
+from adr_report.watcher import PollingWatcher
+from conftest import build
+
+
+class OneEdit(PollingWatcher):
+    """
+    Polls as usual, making edit first; once that is handled, stops watch()
+    the way Ctrl+C does.
+    """
+
+    def __init__(self, folder_paths, edit):
+        super().__init__(folder_paths, poll_interval=0.01)
+        self.edit = edit
+
+    def wait(self, timeout=None):
+        if timeout is None:
+            if self.edit is None:
+                raise KeyboardInterrupt
+            self.edit()
+            self.edit = None
+        return super().wait(timeout)
+
+
+def read_report(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def test_watch_rewrites_the_edited_rows(corpus, tmp_path, monkeypatch):
+    root = tmp_path / 'adrs'
+    shutil.copytree(corpus, root)
+    edited = root / 'foundation-adr' / 'f-adr-000003.md'
+
+    def edit():
+        text = edited.read_text(encoding='utf-8').split('\n')
+        status = text.index('| Service Status |') + 2
+        text[status] = '| Edited Status |'
+        edited.write_text('\n'.join(text), encoding='utf-8')
+
+    monkeypatch.setattr(report, 'open_watcher', lambda folder_paths, poll_interval: OneEdit(folder_paths, edit))
+    build(root, tmp_path / 'before', '--format', 'csv', '--no-cache')
+    shutil.copy(tmp_path / 'before.csv', tmp_path / 'watched.csv')
+    build(root, tmp_path / 'watched', '--format', 'csv', '--no-cache', '--watch', '--debounce', '0.05')
+    build(root, tmp_path / 'after', '--format', 'csv', '--no-cache')
+
+    before, watched = read_report(tmp_path / 'before.csv'), read_report(tmp_path / 'watched.csv')
+    assert_frame_equal(watched, read_report(tmp_path / 'after.csv'))
+    changed = (before != watched).any(axis=1)
+    assert changed.any()
+    assert (watched.loc[changed, 'Service Status'] == 'Edited Status').all()
+    assert (before != watched).loc[changed].sum().to_dict() == {
+        column: int(changed.sum()) if column == 'Service Status' else 0 for column in before.columns}
+
+
+@pytest.fixture
+def records(corpus):
+    files = [(file_name, file_path, file_type, None)
+             for file_name, file_path, file_type in report.discover_files(folder_rules([str(corpus)]))]
+    return {file_path: (file_type, record)
+            for _, file_path, file_type, record, _, _, _ in report.process_chunk(files)}
+
+
+def edit(records, file_path, **changes):
+    file_type, record = records[file_path]
+    records[file_path] = (file_type, dataclasses.replace(record, **changes))
+
+
+def insert(records, position, file_path, file_type, record):
+    items = list(records.items())
+    items.insert(position, (file_path, (file_type, record)))
+    records.clear()
+    records.update(items)
+
+
+@pytest.mark.parametrize('person_ids', [False, True])
+def test_live_report_equals_a_full_build(records, person_ids):
+    windows = [due_window('overdue'), due_window('next-3m')]
+    live = LiveReport(windows, person_ids=person_ids)
+    f_adrs = [file_path for file_path, (file_type, _) in records.items() if file_type == 'foundational']
+    s_adrs = [file_path for file_path, (file_type, _) in records.items() if file_type == 'service']
+    f_adr_name = records[f_adrs[7]][1].service_name
+    s_adr_title = records[s_adrs[3]][1].service_name
+
+    def check(changed):
+        table, date_errors, _ = live.update(records, changed)
+        people = PeopleIndex.from_records(records) if person_ids else None
+        expected, expected_errors, _ = report.build_report(
+            ((file_path, file_type, record) for file_path, (file_type, record) in records.items()),
+            due_windows=windows, people=people)
+        assert_frame_equal(table, expected)
+        assert date_errors == [error for error in expected_errors if changed is None or error[0] in changed]
+
+    check(None)
+    edit(records, f_adrs[0], service_status='Edited')
+    check({f_adrs[0]})
+    # Renames that take an S-ADR from one service to another
+    edit(records, f_adrs[1], service_name=s_adr_title.upper())
+    edit(records, f_adrs[2], service_name=f_adr_name)
+    check({f_adrs[1], f_adrs[2]})
+    edit(records, s_adrs[0], service_name=f_adr_name + 's')
+    check({s_adrs[0]})
+    # A new column, a date that can't be used and a failed parse
+    edit(records, f_adrs[3], data_classification=(('DC-New', 'Red'),), approval_date='31-02-2024')
+    records[f_adrs[4]] = (records[f_adrs[4]][0], None)
+    check({f_adrs[3], f_adrs[4]})
+    insert(records, 5, 'new/f-adr.md', 'foundational', dataclasses.replace(records[f_adrs[5]][1], capabilities=()))
+    insert(records, 9, 'new/s-adr.md', 'service', ServiceRecord(f_adr_name, 'Approved', 'Active', '01-02-2024'))
+    del records[f_adrs[6]], records[s_adrs[1]]
+    check({'new/f-adr.md', 'new/s-adr.md', f_adrs[6], s_adrs[1]})
+    # The listing puts unchanged files in a new order
+    items = list(records.items())
+    items[10], items[20] = items[20], items[10]
+    records.clear()
+    records.update(items)
+    check(set())
@@ -0,0 +1,17 @@
+import zipfile
+
+import pytest
+
+from conftest import build
+
+
+@pytest.mark.parametrize('options', [(), ('--max-memory', '1')], ids=['in-memory', 'max-memory'])
+def test_same_report_whatever_the_workers(tmp_path, corpus, options):
+    for workers in ('1', '4'):
+        build(corpus, tmp_path / f"workers-{workers}", '--format', 'xlsx', 'csv', '--no-cache',
+              '--workers', workers, *options)
+    for extension in ('xlsx', 'csv'):
+        assert (tmp_path / f"workers-1.{extension}").read_bytes() == (tmp_path / f"workers-4.{extension}").read_bytes()
+    # Builds a second apart would otherwise differ in the creation time
+    with zipfile.ZipFile(tmp_path / 'workers-1.xlsx') as workbook:
+        assert b'>2000-01-01T00:00:00Z<' in workbook.read('docProps/core.xml')